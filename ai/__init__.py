@@ -1 +1,7 @@
-from .groq_service import GroqService
+def __getattr__(name):
+    # groq is slow to import, so the service loads only when it is asked
+    # for, not whenever an ai submodule is imported
+    if name == "GroqService":
+        from .groq_service import GroqService
+        return GroqService
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
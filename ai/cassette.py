@@ -0,0 +1,61 @@
+import hashlib
+import json
+import os
+import threading
+
+
+class Cassette:
+    """Record/replay store for LLM responses, kept as a JSON lines file.
+
+    In ``record`` mode every successful response is appended to the file. In
+    ``replay`` mode responses are served from the file and the API is never
+    called, so tests and load runs work offline and deterministically.
+    """
+
+    def __init__(self, path, mode="replay"):
+        """Load an existing cassette file if there is one."""
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+
+        self.path = path
+        self.mode = mode
+        self.entries = {}
+        self.lock = threading.Lock()
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[entry["key"]] = entry["response"]
+
+    @staticmethod
+    def key(model, messages):
+        """Derive a stable key from the model and prompt."""
+        payload = json.dumps({"model": model, "messages": messages}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+
+    def lookup(self, key):
+        """Return the recorded response for a key, or None."""
+        return self.entries.get(key)
+
+    def record(self, key, response):
+        """Store a response and append it to the cassette file."""
+        if self.mode != "record":
+            return
+        with self.lock:
+            self.entries[key] = response
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, "response": response}) + "\n")
+
+
+def cassette_from_env():
+    """Build a Cassette from GROQ_CASSETTE / GROQ_CASSETTE_MODE, if set."""
+    path = os.getenv("GROQ_CASSETTE")
+    if not path:
+        return None
+    return Cassette(path, os.getenv("GROQ_CASSETTE_MODE", "replay"))
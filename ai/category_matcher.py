@@ -0,0 +1,151 @@
+import re
+
+# Default keyword weights per category ID. Longer, more specific phrases carry
+# more weight so that e.g. "gas station" outranks the generic "gas".
+DEFAULT_CATEGORY_KEYWORDS = {
+    1: {"rent": 2.0, "mortgage": 2.0, "housing": 1.5, "apartment": 1.5, "home": 1.0, "hoa": 1.5},
+    2: {"utility": 2.0, "utilities": 2.0, "electric": 2.0, "electricity": 2.0, "water": 1.5,
+        "gas": 1.0, "gas bill": 2.5, "power": 1.0, "energy": 1.5, "internet": 1.5,
+        "wifi": 1.5, "broadband": 1.5, "sewer": 1.5},
+    3: {"car": 1.5, "auto": 1.0, "vehicle": 1.5, "transportation": 2.0, "fuel": 2.0,
+        "gas station": 2.5, "petrol": 2.0, "diesel": 2.0, "parking": 2.0, "toll": 1.5},
+    4: {"grocery": 2.0, "groceries": 2.0, "food": 1.0, "supermarket": 2.0, "market": 1.0},
+    5: {"entertainment": 2.0, "movie": 1.5, "movies": 1.5, "theater": 1.5, "game": 1.0,
+        "games": 1.0, "gym": 1.0, "subscription": 0.5},
+    6: {"restaurant": 2.0, "dining": 2.0, "cafe": 1.5, "food delivery": 2.5},
+    7: {"health": 1.5, "medical": 2.0, "doctor": 2.0, "hospital": 2.0, "clinic": 2.0,
+        "pharmacy": 2.0, "prescription": 2.0},
+    8: {"insurance": 2.5, "coverage": 1.0, "policy": 1.0, "protection": 1.0, "premium": 1.0},
+    9: {"subscription": 1.5, "membership": 1.5, "streaming": 2.0, "netflix": 2.5,
+        "spotify": 2.5, "amazon prime": 2.5},
+}
+
+# Category returned when nothing matches
+DEFAULT_CATEGORY_ID = 10
+
+
+class CategoryMatcher:
+    """Keyword-based category matcher compiled into a single regex."""
+
+    def __init__(self, category_keywords=None, default_category=DEFAULT_CATEGORY_ID):
+        """Initialize the matcher with a {category_id: {keyword: weight}} mapping."""
+        self.default_category = default_category
+        self._weights = {}
+
+        for category_id, keywords in (category_keywords or DEFAULT_CATEGORY_KEYWORDS).items():
+            self.add_keywords(category_id, keywords)
+
+        self._pattern = None
+
+    def add_keywords(self, category_id, keywords, weight=1.0):
+        """Add user-defined keywords for a category.
+
+        ``keywords`` may be a list (all using ``weight``) or a {keyword: weight} dict.
+        """
+        if not isinstance(keywords, dict):
+            keywords = {keyword: weight for keyword in keywords}
+
+        for keyword, keyword_weight in keywords.items():
+            keyword = " ".join(keyword.lower().split())
+            if not keyword:
+                continue
+            self._weights.setdefault(keyword, {})[category_id] = keyword_weight
+
+        # Force a recompile on the next match
+        self._pattern = None
+
+    def remove_keyword(self, keyword, category_id=None):
+        """Remove a keyword from one category, or from all categories."""
+        keyword = " ".join(keyword.lower().split())
+        if keyword not in self._weights:
+            return
+
+        if category_id is None:
+            del self._weights[keyword]
+        else:
+            self._weights[keyword].pop(category_id, None)
+            if not self._weights[keyword]:
+                del self._weights[keyword]
+
+        self._pattern = None
+
+    def _compile(self):
+        """Compile all keywords into one word-bounded alternation."""
+        # Longest first so multi-word phrases win over their prefixes
+        keywords = sorted(self._weights, key=lambda k: (-len(k), k))
+        if not keywords:
+            self._pattern = re.compile(r"(?!x)x")
+        else:
+            alternation = "|".join(re.escape(k).replace(r"\ ", r"\s+") for k in keywords)
+            self._pattern = re.compile(rf"\b(?:{alternation})\b")
+        return self._pattern
+
+    def score(self, text):
+        """Return a {category_id: score} dict for a piece of text."""
+        pattern = self._pattern or self._compile()
+        scores = {}
+
+        for match in pattern.finditer(text.lower()):
+            keyword = " ".join(match.group(0).split())
+            for category_id, weight in self._weights[keyword].items():
+                scores[category_id] = scores.get(category_id, 0) + weight
+
+        return scores
+
+    def match_text(self, text):
+        """Return the best matching category ID for a piece of text."""
+        scores = self.score(text)
+        if not scores:
+            return self.default_category
+
+        # Highest score wins, ties go to the lowest category ID
+        return min(scores, key=lambda category_id: (-scores[category_id], category_id))
+
+    def categorize(self, bill_data):
+        """Return the category ID for a bill or subscription dict."""
+        return self.match_text(bill_text(bill_data))
+
+    def categorize_many(self, items):
+        """Return category IDs for many bills (dicts) or titles (strings).
+
+        Results are memoized per distinct text, so bulk recategorization of
+        bills that share titles only scans each title once.
+        """
+        pattern = self._pattern or self._compile()
+        weights = self._weights
+        default_category = self.default_category
+        seen = {}
+        results = []
+
+        for item in items:
+            text = (item if isinstance(item, str) else bill_text(item)).lower()
+            category_id = seen.get(text)
+
+            if category_id is None:
+                scores = {}
+                for keyword in pattern.findall(text):
+                    keyword_weights = weights.get(keyword) or weights[" ".join(keyword.split())]
+                    for match_id, weight in keyword_weights.items():
+                        scores[match_id] = scores.get(match_id, 0) + weight
+
+                if scores:
+                    category_id = min(scores, key=lambda c: (-scores[c], c))
+                else:
+                    category_id = default_category
+                seen[text] = category_id
+
+            results.append(category_id)
+
+        return results
+
+
+def bill_text(bill_data):
+    """Combine the searchable fields of a bill into one string."""
+    return " ".join(
+        bill_data.get(field) or ""
+        for field in ("title", "merchantName", "description")
+    )
+
+
+# Shared matcher, compiled once per process
+default_matcher = CategoryMatcher()
@@ -0,0 +1,137 @@
+import json
+from datetime import datetime
+
+from utils.date_utils import to_monthly_amount, parse_date, render_today
+from utils.currency import DEFAULT_CURRENCY, convert_records
+
+# A subscription unused for this many days is considered stale
+STALE_DAYS = 30
+
+# Relative change between consecutive bills that counts as a price change
+PRICE_CHANGE_THRESHOLD = 0.05
+
+
+def monthly_cost(subscription):
+    """Normalize a subscription amount to a monthly cost."""
+    return to_monthly_amount(subscription["amount"], subscription.get("frequency"))
+
+
+def estimate_tokens(text):
+    """Rough token count for a prompt (about four characters per token)."""
+    return len(text) // 4
+
+
+def _as_date(value):
+    """Get a date from a date, datetime or "%Y-%m-%d..." string, or None if there is none."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        try:
+            return parse_date(value[:10])
+        except ValueError:
+            return None
+    return value
+
+
+def summarize_user_data(user_data, top_n=5, months=3, today=None):
+    """Reduce a user's bills and subscriptions to a fixed-size feature summary.
+
+    The summary size depends on ``top_n``, ``months`` and the number of
+    categories, not on how many bills or subscriptions the user has.
+    """
+    today = today or render_today()
+    # Amounts are summed and compared, so bring them into one currency first
+    currency = user_data.get("currency", DEFAULT_CURRENCY)
+    bills = convert_records(user_data.get("bills", []), currency, "dueDate")
+    subscriptions = convert_records(user_data.get("subscriptions", []), currency)
+    category_names = {c["id"]: c["name"] for c in user_data.get("categories", [])}
+
+    # Per-category totals for the last few calendar months
+    month_keys = []
+    year, month = today.year, today.month
+    for _ in range(months):
+        month_keys.append(f"{year:04d}-{month:02d}")
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+
+    category_totals = {}
+    overdue = []
+    by_payee = {}
+    for bill in bills:
+        # Bills saved from SMS could lack a due date; they can't be placed in time
+        due_date = _as_date(bill.get("dueDate"))
+        if due_date is None:
+            continue
+        month_key = due_date.strftime("%Y-%m")
+        category = category_names.get(bill.get("categoryId"), bill.get("categoryId"))
+        if month_key in month_keys:
+            totals = category_totals.setdefault(str(category), {})
+            totals[month_key] = round(totals.get(month_key, 0) + bill["amount"], 2)
+
+        if not bill.get("paid") and due_date < today:
+            overdue.append(bill)
+
+        payee = (bill.get("merchantName") or bill.get("title") or "").lower()
+        by_payee.setdefault(payee, []).append((due_date, bill))
+
+    # Subscriptions ranked by monthly cost, with lastUsed staleness
+    active = [sub for sub in subscriptions if sub.get("active", True)]
+    ranked = sorted(active, key=monthly_cost, reverse=True)
+    top_subscriptions = []
+    stale_count = 0
+    for sub in ranked:
+        last_used = _as_date(sub.get("lastUsed"))
+        days_unused = (today - last_used).days if last_used else None
+        if days_unused is not None and days_unused >= STALE_DAYS:
+            stale_count += 1
+        if len(top_subscriptions) < top_n:
+            top_subscriptions.append({
+                "subscriptionId": sub.get("id"),
+                "title": sub.get("title"),
+                "monthlyCost": round(monthly_cost(sub), 2),
+                "frequency": sub.get("frequency"),
+                "daysSinceUsed": days_unused
+            })
+
+    # Consecutive bills from the same payee whose amount changed
+    price_changes = []
+    for history in by_payee.values():
+        if len(history) < 2:
+            continue
+        history.sort(key=lambda item: item[0])
+        previous, current = history[-2][1], history[-1][1]
+        if previous["amount"] and abs(current["amount"] - previous["amount"]) / previous["amount"] >= PRICE_CHANGE_THRESHOLD:
+            price_changes.append({
+                "billId": current.get("id"),
+                "title": current.get("title"),
+                "previousAmount": previous["amount"],
+                "currentAmount": current["amount"]
+            })
+    price_changes.sort(key=lambda c: abs(c["currentAmount"] - c["previousAmount"]), reverse=True)
+
+    overdue.sort(key=lambda b: b["amount"], reverse=True)
+
+    return {
+        "today": today.strftime("%Y-%m-%d"),
+        "currency": currency,
+        "categoryMonthlyTotals": category_totals,
+        "monthlySubscriptionCost": round(sum(monthly_cost(sub) for sub in active), 2),
+        "activeSubscriptionCount": len(active),
+        "staleSubscriptionCount": stale_count,
+        "topSubscriptions": top_subscriptions,
+        "overdueCount": len(overdue),
+        "overdueTotal": round(sum(b["amount"] for b in overdue), 2),
+        "topOverdueBills": [
+            {"billId": b.get("id"), "title": b.get("title"), "amount": b["amount"], "dueDate": str(b["dueDate"])}
+            for b in overdue[:top_n]
+        ],
+        "priceChanges": price_changes[:top_n],
+    }
+
+
+def prompt_size(user_data, summary):
+    """Return estimated (raw, summarized) prompt token counts."""
+    raw = estimate_tokens(json.dumps(user_data, default=str))
+    compact = estimate_tokens(json.dumps(summary, default=str))
+    return raw, compact
@@ -1,30 +1,294 @@
 import os
 import json
+import threading
+import time
 import groq
-from datetime import datetime
+import httpx
+
+from ai.category_matcher import default_matcher
+from ai.resilience import RateLimiter, CircuitBreaker, Metrics, backoff_delay, parse_retry_after
+from ai.sms_parser import parse_bill_sms, finalize_sms_bill, extract_currency
+from ai.json_stream import iter_json_values, extract_json, unwrap_list
+from ai.cassette import cassette_from_env
+from ai.features import summarize_user_data, estimate_tokens
+from ai.schemas import SMS_BILL_SCHEMA, SUGGESTION_SCHEMA, FORECAST_MONTH_SCHEMA, validate_record, validate_records
+
+# HTTP client tuning, overridable through the environment
+DEFAULT_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "30"))
+DEFAULT_CONNECT_TIMEOUT = float(os.getenv("GROQ_CONNECT_TIMEOUT", "5"))
+DEFAULT_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "10"))
+DEFAULT_KEEPALIVE_EXPIRY = float(os.getenv("GROQ_KEEPALIVE_EXPIRY", "60"))
+
+# API quotas and retry policy
+REQUESTS_PER_MINUTE = int(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+TOKENS_PER_MINUTE = int(os.getenv("GROQ_TOKENS_PER_MINUTE", "6000"))
+MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "4"))
+MAX_TOKENS = 1024
+
+# Ask the API for a JSON object response (set to 0 for endpoints without it)
+JSON_MODE = os.getenv("GROQ_JSON_MODE", "1") != "0"
+
+_service = None
+_service_lock = threading.Lock()
+
+def build_http_client(timeout=None, connect_timeout=None, max_connections=None, keepalive_expiry=None):
+    """Build a pooled keep-alive HTTP client, using HTTP/2 when h2 is installed."""
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+    
+    max_connections = max_connections or DEFAULT_MAX_CONNECTIONS
+    
+    return httpx.Client(
+        http2=http2,
+        timeout=httpx.Timeout(
+            timeout or DEFAULT_TIMEOUT,
+            connect=connect_timeout or DEFAULT_CONNECT_TIMEOUT
+        ),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry or DEFAULT_KEEPALIVE_EXPIRY
+        )
+    )
+
+def get_groq_service():
+    """Get the process-wide GroqService, creating it on first use."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = GroqService()
+    return _service
 
 class GroqService:
-    """Service class for Groq API interaction."""
+    """Service class for Groq API interaction.
     
-    def __init__(self):
+    Creating a service builds a connection pool, so pages should share one
+    through get_groq_service() instead of constructing it on every rerun.
+    The underlying httpx client is thread-safe.
+    """
+    
+    def __init__(self, api_key=None, base_url=None, timeout=None, http_client=None, cassette=None):
         """Initialize the Groq client."""
-        api_key = os.getenv("GROQ_API_KEY")
-        self.client = groq.Client(api_key=api_key)
+        api_key = api_key or os.getenv("GROQ_API_KEY")
+        base_url = base_url or os.getenv("GROQ_BASE_URL")
+        self.http_client = http_client or build_http_client(timeout=timeout)
+        # Retries are handled by send_request so they share the rate limiter
+        self.client = groq.Client(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=self.http_client,
+            max_retries=0
+        )
         self.model = "llama3-70b-8192"  # Default model
+        self.category_matcher = default_matcher
+        self.rate_limiter = RateLimiter(REQUESTS_PER_MINUTE, TOKENS_PER_MINUTE)
+        self.circuit_breaker = CircuitBreaker()
+        self.metrics = Metrics()
+        self.max_retries = MAX_RETRIES
+        self.cassette = cassette or cassette_from_env()
+        self.json_mode = JSON_MODE
+    
+    def close(self):
+        """Close the underlying connection pool."""
+        self.http_client.close()
+    
+    def get_metrics(self):
+        """Get request counters and the circuit breaker state."""
+        metrics = self.metrics.snapshot()
+        metrics["circuitState"] = self.circuit_breaker.state
+        attempts = metrics.get("parseAttempts", 0)
+        metrics["parseFailureRate"] = metrics.get("parseFailures", 0) / attempts if attempts else 0.0
+        return metrics
     
-    def send_request(self, messages):
-        """Send a request to the Groq API."""
+    def send_request(self, messages, json_mode=False):
+        """Send a request to the Groq API.
+        
+        Requests are throttled to the RPM/TPM quotas, retried with jittered
+        exponential backoff on 429, 5xx and connection errors, and rejected
+        immediately while the circuit breaker is open. Returns None on failure.
+        With a replay cassette, recorded responses are returned without any
+        network call. With ``json_mode`` the API is asked for a JSON object.
+        """
+        if self.cassette:
+            key = self.cassette.key(self.model, messages)
+            if self.cassette.replaying:
+                recorded = self.cassette.lookup(key)
+                self.metrics.incr("cassetteHits" if recorded is not None else "cassetteMisses")
+                return recorded
+        
+        if not self.circuit_breaker.allow():
+            self.metrics.incr("circuitRejected")
+            return None
+        
+        # Reserve the prompt plus the full completion budget
+        estimated_tokens = sum(estimate_tokens(m["content"]) for m in messages) + MAX_TOKENS
+        options = {"response_format": {"type": "json_object"}} if json_mode else {}
+        
+        # Every exit settles the breaker, or a half-open trial would stay in
+        # flight and the breaker would reject every later call
+        settled = False
         try:
-            response = self.client.chat.completions.create(
+            for attempt in range(self.max_retries + 1):
+                # Each attempt, retries included, counts against the quotas
+                waited = self.rate_limiter.acquire(estimated_tokens)
+                if waited:
+                    self.metrics.incr("throttled")
+                    self.metrics.incr("throttledSeconds", waited)
+                
+                self.metrics.incr("requests")
+                retry_after = None
+                try:
+                    response = self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        temperature=0.5,
+                        max_tokens=MAX_TOKENS,
+                        **options
+                    )
+                    self.circuit_breaker.record_success()
+                    settled = True
+                    self.metrics.incr("successes")
+                    content = response.choices[0].message.content
+                    if self.cassette:
+                        self.cassette.record(key, content)
+                    return content
+                except groq.RateLimitError as e:
+                    self.metrics.incr("rateLimited")
+                    retry_after = parse_retry_after(e.response.headers)
+                    error = e
+                except groq.APIStatusError as e:
+                    failed_generation = self._failed_generation(e) if json_mode else None
+                    if failed_generation:
+                        # JSON mode rejected the output; the tolerant parser can
+                        # usually still recover it without another round-trip
+                        self.circuit_breaker.record_success()
+                        settled = True
+                        self.metrics.incr("jsonValidateFailed")
+                        return failed_generation
+                    if e.status_code < 500:
+                        # Client errors will not succeed on retry, but the API
+                        # answered, so they count as a success for the breaker
+                        self.circuit_breaker.record_success()
+                        settled = True
+                        self.metrics.incr("failures")
+                        print(f"Error sending request to Groq API: {e}")
+                        return None
+                    self.metrics.incr("serverErrors")
+                    retry_after = parse_retry_after(e.response.headers)
+                    error = e
+                except groq.APIConnectionError as e:
+                    self.metrics.incr("connectionErrors")
+                    error = e
+                
+                if attempt < self.max_retries:
+                    self.metrics.incr("retries")
+                    time.sleep(backoff_delay(attempt, retry_after=retry_after))
+            
+            self.circuit_breaker.record_failure()
+            settled = True
+            self.metrics.incr("failures")
+            print(f"Error sending request to Groq API: {error}")
+            return None
+        finally:
+            if not settled:
+                # An unexpected exception is escaping
+                self.circuit_breaker.record_failure()
+                self.metrics.incr("failures")
+    
+    def _failed_generation(self, error):
+        """Get the raw model output from a JSON mode validation error, if any."""
+        body = error.body if isinstance(error.body, dict) else {}
+        body = body.get("error", body) if isinstance(body.get("error"), dict) else body
+        return body.get("failed_generation")
+    
+    def parse_json_response(self, response):
+        """Parse a model response with the tolerant extractor.
+        
+        Returns None when no JSON value can be found. Counts attempts,
+        responses that needed repair and failures in the metrics.
+        """
+        self.metrics.incr("parseAttempts")
+        try:
+            value, clean = extract_json(response)
+        except ValueError:
+            self.metrics.incr("parseFailures")
+            print("Failed to parse JSON response from Groq API")
+            return None
+        if not clean:
+            self.metrics.incr("parseRepaired")
+        return value
+    
+    def _json_object_messages(self, messages, key):
+        """Ask for an array wrapped in an object, as JSON mode requires."""
+        if not self.json_mode:
+            return messages, False
+        system = dict(messages[0])
+        system["content"] += f'\nWrap the array in a JSON object: {{"{key}": [...]}}'
+        return [system] + messages[1:], True
+    
+    def stream_request(self, messages):
+        """Send a streaming request to the Groq API and yield text chunks.
+        
+        Shares the rate limiter and circuit breaker with send_request. A failed
+        stream is not retried, since part of it may already have been shown.
+        """
+        if self.cassette:
+            key = self.cassette.key(self.model, messages)
+            if self.cassette.replaying:
+                recorded = self.cassette.lookup(key)
+                self.metrics.incr("cassetteHits" if recorded is not None else "cassetteMisses")
+                if recorded is not None:
+                    yield recorded
+                return
+        
+        if not self.circuit_breaker.allow():
+            self.metrics.incr("circuitRejected")
+            return
+        
+        estimated_tokens = sum(estimate_tokens(m["content"]) for m in messages) + MAX_TOKENS
+        waited = self.rate_limiter.acquire(estimated_tokens)
+        if waited:
+            self.metrics.incr("throttled")
+            self.metrics.incr("throttledSeconds", waited)
+        
+        self.metrics.incr("requests")
+        try:
+            stream = self.client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 temperature=0.5,
-                max_tokens=1024,
+                max_tokens=MAX_TOKENS,
+                stream=True,
             )
-            return response.choices[0].message.content
-        except Exception as e:
-            print(f"Error sending request to Groq API: {e}")
-            return None
+            received = []
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    received.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+        except GeneratorExit:
+            # The caller stopped reading once it had a complete value
+            self.circuit_breaker.record_success()
+            self.metrics.incr("successes")
+            raise
+        except groq.APIError as e:
+            self.circuit_breaker.record_failure()
+            self.metrics.incr("failures")
+            print(f"Error streaming request from Groq API: {e}")
+            return
+        except Exception:
+            # Settle the breaker before an unexpected exception escapes
+            self.circuit_breaker.record_failure()
+            self.metrics.incr("failures")
+            raise
+        
+        self.circuit_breaker.record_success()
+        self.metrics.incr("successes")
+        if self.cassette:
+            self.cassette.record(key, "".join(received))
     
     def analyze_sms_content(self, sender, content):
         """Analyze SMS content to extract bill information."""
@@ -34,7 +298,7 @@ class GroqService:
                 "content": """You are an AI assistant that extracts bill information from SMS messages.
                 Extract the following details if present:
                 - Bill type or name (e.g. electricity, water, credit card)
-                - Amount due
+                - Amount due and its currency
                 - Due date
                 - Merchant or company name
                 
@@ -42,6 +306,7 @@ class GroqService:
                 {
                     "title": "Bill name",
                     "amount": 123.45,
+                    "currency": "ISO code such as USD or INR",
                     "dueDate": "YYYY-MM-DD",
                     "merchantName": "Company name",
                     "description": "Brief description of the bill",
@@ -58,71 +323,60 @@ class GroqService:
             }
         ]
         
-        response = self.send_request(messages)
-        if response:
-            try:
-                bill_data = json.loads(response)
-                
-                # If it's not a bill, return None
-                if "isBill" in bill_data and not bill_data["isBill"]:
-                    return None
+        response = self.send_request(messages, json_mode=self.json_mode)
+        parsed = self.parse_json_response(response) if response else None
+        if isinstance(parsed, dict):
+            # If it's not a bill, return None
+            if "isBill" in parsed and not parsed["isBill"]:
+                return None
+            
+            bill_data = validate_record(parsed, SMS_BILL_SCHEMA)
+            if bill_data:
+                if bill_data["currency"] is None:
+                    bill_data["currency"] = extract_currency(content)
                 
                 # Determine category ID based on bill title or description
                 if bill_data.get("categoryId") is None:
                     bill_data["categoryId"] = self._determine_category(bill_data)
                 
-                # Set additional fields
-                bill_data["paid"] = False
-                bill_data["recurring"] = True
-                bill_data["detectedFromSms"] = True
-                bill_data["autoPay"] = False
-                
-                return bill_data
-            except json.JSONDecodeError:
-                print("Failed to parse JSON response from Groq API")
-                return None
+                return finalize_sms_bill(bill_data)
+            self.metrics.incr("schemaRejected")
+        
+        # The API is unavailable or its answer unusable, so fall back to local
+        # extraction; bills need a due date like the schema requires
+        bill_data = parse_bill_sms(sender, content)
+        if bill_data and bill_data["dueDate"]:
+            self.metrics.incr("localFallbacks")
+            return finalize_sms_bill(bill_data)
         
         return None
     
     def _determine_category(self, bill_data):
         """Determine the category ID based on bill information."""
-        title = bill_data.get("title", "").lower()
-        merchant = bill_data.get("merchantName", "").lower()
-        description = bill_data.get("description", "").lower()
-        
-        # Combined text for keyword matching
-        text = f"{title} {merchant} {description}"
-        
-        # Category mapping
-        category_keywords = {
-            1: ["rent", "mortgage", "housing", "apartment", "home"],
-            2: ["utility", "electric", "water", "gas", "power", "energy", "internet", "wifi", "broadband"],
-            3: ["car", "auto", "vehicle", "transportation", "fuel", "gas", "petrol", "diesel", "parking"],
-            4: ["grocery", "food", "supermarket", "market"],
-            5: ["entertainment", "movie", "theater", "game", "subscription"],
-            6: ["restaurant", "dining", "cafe", "food delivery"],
-            7: ["health", "medical", "doctor", "hospital", "clinic", "pharmacy", "prescription"],
-            8: ["insurance", "coverage", "policy", "protection", "premium"],
-            9: ["subscription", "membership", "streaming", "netflix", "spotify", "amazon prime"],
-            10: []  # Other (default)
-        }
-        
-        # Check for keyword matches
-        for category_id, keywords in category_keywords.items():
-            for keyword in keywords:
-                if keyword in text:
-                    return category_id
-        
-        # Default to Other
-        return 10
+        return self.category_matcher.categorize(bill_data)
     
-    def generate_bill_suggestions(self, user_data):
-        """Generate bill management suggestions based on user data."""
-        messages = [
+    def categorize_many(self, bills):
+        """Determine category IDs for many bills in one pass."""
+        return self.category_matcher.categorize_many(bills)
+    
+    def _suggestion_messages(self, user_data):
+        """Build the prompt for bill suggestions from a compact feature summary.
+        
+        Raw bill history is reduced by summarize_user_data so the prompt stays
+        the same size however many bills the user has.
+        """
+        content = json.dumps(summarize_user_data(user_data), default=str)
+        # The raw data's size is left to benchmarks/suggestion_prompt_bench;
+        # measuring it here would serialize the full history on every call
+        self.metrics.incr("suggestionPromptTokensSent", estimate_tokens(content))
+        
+        return [
             {
                 "role": "system",
-                "content": """You are an AI assistant that analyzes user spending data and generates
-                actionable bill management suggestions. Generate 2-3 suggestions in JSON format:
+                "content": """You are an AI assistant that analyzes a summary of user spending data and generates
+                actionable bill management suggestions. The summary has per-category monthly totals,
+                the top subscriptions by monthly cost with days since last use, overdue bills and
+                bills whose price changed. Generate 2-3 suggestions in JSON format:
                 [
                     {
                         "type": "savings" or "reminder" or "optimization",
@@ -138,24 +392,31 @@ class GroqService:
             },
             {
                 "role": "user",
-                "content": json.dumps(user_data)
+                "content": content
             }
         ]
-        
-        response = self.send_request(messages)
+    
+    def generate_bill_suggestions(self, user_data):
+        """Generate bill management suggestions based on user data."""
+        messages, json_mode = self._json_object_messages(self._suggestion_messages(user_data), "suggestions")
+        response = self.send_request(messages, json_mode=json_mode)
         if response:
-            try:
-                suggestions = json.loads(response)
-                return suggestions
-            except json.JSONDecodeError:
-                print("Failed to parse JSON response from Groq API")
-                return []
+            parsed = self.parse_json_response(response)
+            return self._validate_list(parsed, SUGGESTION_SCHEMA)
         
         return []
     
-    def forecast_bills(self, historical_bills, months=3):
-        """Generate a forecast of future bills based on historical data."""
-        messages = [
+    def stream_bill_suggestions(self, user_data):
+        """Yield bill suggestions one at a time as they finish streaming."""
+        chunks = self.stream_request(self._suggestion_messages(user_data))
+        for suggestion in iter_json_values(chunks):
+            suggestion = validate_record(suggestion, SUGGESTION_SCHEMA)
+            if suggestion:
+                yield suggestion
+    
+    def _forecast_messages(self, historical_bills, months):
+        """Build the prompt for a bill forecast."""
+        return [
             {
                 "role": "system",
                 "content": f"""You are an AI assistant that forecasts future bill payments based on historical data.
@@ -174,17 +435,44 @@ class GroqService:
             },
             {
                 "role": "user",
-                "content": json.dumps(historical_bills)
+                "content": json.dumps(historical_bills, default=str)
             }
         ]
-        
-        response = self.send_request(messages)
+    
+    def forecast_bills(self, historical_bills, months=3):
+        """Generate a forecast of future bills based on historical data."""
+        messages, json_mode = self._json_object_messages(self._forecast_messages(historical_bills, months), "forecast")
+        response = self.send_request(messages, json_mode=json_mode)
         if response:
-            try:
-                forecast = json.loads(response)
-                return forecast
-            except json.JSONDecodeError:
-                print("Failed to parse JSON response from Groq API")
-                return []
+            parsed = self.parse_json_response(response)
+            return self._validate_list(parsed, FORECAST_MONTH_SCHEMA)
         
         return []
+    
+    def _validate_list(self, parsed, schema):
+        """Validate a parsed array response, counting dropped records."""
+        if parsed is None:
+            return []
+        records = unwrap_list(parsed)
+        valid = validate_records(records, schema)
+        if len(valid) < len(records):
+            self.metrics.incr("schemaRejected", len(records) - len(valid))
+        return valid
+    
+    def stream_forecast_explanation(self, forecast):
+        """Yield a short plain-language explanation of a local forecast."""
+        messages = [
+            {
+                "role": "system",
+                "content": """You are an AI assistant that explains bill forecasts to users.
+                You are given a month-by-month forecast with utilities, subscriptions, other and
+                total amounts, plus a likely range for the total. In 2-4 short sentences, explain
+                the main drivers and any notable changes. Do not invent new numbers."""
+            },
+            {
+                "role": "user",
+                "content": json.dumps(forecast, default=str)
+            }
+        ]
+        
+        yield from self.stream_request(messages)
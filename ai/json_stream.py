@@ -0,0 +1,137 @@
+import json
+import re
+
+# Markdown code fences around a model response, e.g. ```json ... ```
+CODE_FENCE = re.compile(r"```[a-zA-Z]*")
+
+_decoder = json.JSONDecoder()
+
+
+class IncrementalJsonParser:
+    """Incrementally parse a streamed JSON array or object.
+
+    Feed text chunks as they arrive. Each call to ``feed`` returns the
+    top-level values that became complete with that chunk: array elements
+    for an array, ``(key, value)`` pairs for an object. Any prose or code
+    fences before the opening bracket are skipped.
+    """
+
+    def __init__(self):
+        """Initialize an empty parser."""
+        self.buffer = ""
+        self.position = 0
+        self.container = None
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.item_start = None
+        self.done = False
+
+    def feed(self, chunk):
+        """Consume a chunk of text and return the newly completed values."""
+        self.buffer += chunk
+        completed = []
+
+        while self.position < len(self.buffer) and not self.done:
+            char = self.buffer[self.position]
+
+            if self.container is None:
+                # Skip anything before the top-level container opens
+                if char in "[{":
+                    self.container = char
+                    self.depth = 1
+                    self.item_start = self.position + 1
+                self.position += 1
+                continue
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in "[{":
+                self.depth += 1
+            elif char in "]}":
+                self.depth -= 1
+                if self.depth == 0:
+                    self._emit(self.buffer[self.item_start:self.position], completed)
+                    self.done = True
+            elif char == "," and self.depth == 1:
+                self._emit(self.buffer[self.item_start:self.position], completed)
+                self.item_start = self.position + 1
+
+            self.position += 1
+
+        # Drop text that has already been consumed
+        if self.item_start is not None and self.item_start > 0:
+            consumed = self.item_start
+            self.buffer = self.buffer[consumed:]
+            self.position -= consumed
+            self.item_start = 0
+
+        return completed
+
+    def _emit(self, text, completed):
+        text = text.strip()
+        if not text:
+            return
+        try:
+            if self.container == "[":
+                completed.append(json.loads(text))
+            else:
+                completed.extend(json.loads("{" + text + "}").items())
+        except json.JSONDecodeError:
+            print("Skipping malformed JSON fragment in streamed response")
+
+
+def iter_json_values(chunks):
+    """Yield top-level JSON values from an iterable of text chunks."""
+    parser = IncrementalJsonParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.done:
+            return
+
+
+def extract_json(text):
+    """Extract the first complete JSON array or object from a model response.
+
+    Handles responses wrapped in code fences or surrounded by prose. Returns
+    ``(value, clean)`` where ``clean`` is False when the text needed repair;
+    raises ValueError when no JSON value can be found.
+    """
+    stripped = text.strip()
+    try:
+        return json.loads(stripped), True
+    except ValueError:
+        pass
+
+    stripped = CODE_FENCE.sub("", stripped)
+    for match in re.finditer(r"[\[{]", stripped):
+        try:
+            value, _ = _decoder.raw_decode(stripped, match.start())
+        except ValueError:
+            continue
+        return value, False
+
+    raise ValueError("No JSON value found in response")
+
+
+def unwrap_list(value):
+    """Return the list in a response that should be an array.
+
+    JSON mode only allows objects, so arrays come back wrapped as
+    ``{"suggestions": [...]}``; a lone object is treated as a one-item list.
+    """
+    if isinstance(value, list):
+        return value
+    if isinstance(value, dict):
+        for item in value.values():
+            if isinstance(item, list):
+                return item
+        return [value]
+    return []
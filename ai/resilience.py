@@ -0,0 +1,157 @@
+import random
+import threading
+import time
+from collections import Counter
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``rate`` tokens per second."""
+
+    def __init__(self, capacity, rate, clock=time.monotonic):
+        """Initialize a full bucket."""
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, amount=1):
+        """Take tokens if available; otherwise return the seconds to wait."""
+        # Requests larger than the bucket would never fit, so clamp them
+        amount = min(float(amount), self.capacity)
+        with self.lock:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+            return (amount - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Client-side limiter for requests-per-minute and tokens-per-minute quotas."""
+
+    def __init__(self, requests_per_minute, tokens_per_minute, sleep=time.sleep):
+        """Initialize one bucket per quota."""
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+        self.sleep = sleep
+
+    def acquire(self, tokens=0):
+        """Block until one request and ``tokens`` tokens are available.
+
+        Returns the total seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            wait = self.requests.try_acquire(1)
+            if wait == 0:
+                break
+            self.sleep(wait)
+            waited += wait
+
+        while tokens:
+            wait = self.tokens.try_acquire(tokens)
+            if wait == 0:
+                break
+            self.sleep(wait)
+            waited += wait
+
+        return waited
+
+
+class CircuitBreaker:
+    """Fail fast after repeated failures, then probe again after a cool-down.
+
+    The breaker is ``closed`` while calls succeed, ``open`` after
+    ``failure_threshold`` consecutive failures, and ``half_open`` once
+    ``reset_timeout`` seconds have passed, letting one trial call through.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        """Initialize a closed breaker."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        """Current state: closed, open or half_open."""
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        """Return True if a call may go through now."""
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        """Close the breaker after a successful call."""
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        """Count a failure and open the breaker once over the threshold."""
+        with self.lock:
+            self.failures += 1
+            if self.trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+            self.trial_in_flight = False
+
+
+class Metrics:
+    """Thread-safe named counters."""
+
+    def __init__(self):
+        """Initialize empty counters."""
+        self.counters = Counter()
+        self.lock = threading.Lock()
+
+    def incr(self, name, amount=1):
+        """Increment a counter."""
+        with self.lock:
+            self.counters[name] += amount
+
+    def snapshot(self):
+        """Return a copy of all counters."""
+        with self.lock:
+            return dict(self.counters)
+
+
+def backoff_delay(attempt, base=0.5, cap=30.0, retry_after=None):
+    """Exponential backoff with full jitter, honoring a server Retry-After."""
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(cap, retry_after))
+    return delay
+
+
+def parse_retry_after(headers):
+    """Read a Retry-After header (in seconds) if present."""
+    if not headers:
+        return None
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
@@ -0,0 +1,133 @@
+import re
+from datetime import datetime
+
+from ai.sms_parser import CURRENCY_CODES, parse_date
+from utils.currency import SUPPORTED_CURRENCIES
+
+NUMBER = re.compile(r"-?\d[\d,]*(?:\.\d+)?")
+
+SUGGESTION_TYPES = ("savings", "reminder", "optimization")
+
+# field -> (kind, required)
+SMS_BILL_SCHEMA = {
+    "title": ("text", True),
+    "amount": ("amount", True),
+    "currency": ("currency", False),
+    "dueDate": ("date", True),
+    "merchantName": ("text", False),
+    "description": ("text", False),
+    "categoryId": ("id", False),
+}
+
+SUGGESTION_SCHEMA = {
+    "type": ("suggestion_type", True),
+    "title": ("text", True),
+    "description": ("text", True),
+    "icon": ("text", False),
+    "billId": ("id", False),
+    "subscriptionId": ("id", False),
+    "potentialSavings": ("amount", False),
+}
+
+FORECAST_MONTH_SCHEMA = {
+    "month": ("text", True),
+    "subscriptions": ("amount", False),
+    "utilities": ("amount", False),
+    "other": ("amount", False),
+    "total": ("amount", True),
+}
+
+
+def coerce_amount(value):
+    """Coerce 123.45, "123.45" or "$1,234.50" to a float."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = NUMBER.search(str(value))
+    if match:
+        return float(match.group(0).replace(",", ""))
+    return None
+
+
+def coerce_currency(value):
+    """Coerce "inr", "₹" or "Rs." to a supported ISO currency code."""
+    value = coerce_text(value)
+    if not value:
+        return None
+    value = CURRENCY_CODES.get(value.lower(), value.upper())
+    return value if value in SUPPORTED_CURRENCIES else None
+
+
+def coerce_date(value):
+    """Coerce a date, datetime or date string to YYYY-MM-DD."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d")
+    value = str(value).strip()
+    if re.match(r"^\d{4}-\d{2}-\d{2}T", value):
+        value = value[:10]
+    return parse_date(value) if value else None
+
+
+def coerce_id(value):
+    """Coerce an integer ID given as a number or numeric string."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value.strip())
+    return None
+
+
+def coerce_text(value):
+    """Coerce a value to a stripped string, or None when empty."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def coerce_suggestion_type(value):
+    value = coerce_text(value)
+    value = value.lower() if value else None
+    return value if value in SUGGESTION_TYPES else None
+
+
+COERCERS = {
+    "amount": coerce_amount,
+    "currency": coerce_currency,
+    "date": coerce_date,
+    "id": coerce_id,
+    "text": coerce_text,
+    "suggestion_type": coerce_suggestion_type,
+}
+
+
+def validate_record(record, schema):
+    """Validate and coerce a parsed record against a schema.
+
+    Returns a new dict holding only the schema's fields, or None when the
+    record is not a dict or a required field is missing or invalid.
+    """
+    if not isinstance(record, dict):
+        return None
+
+    cleaned = {}
+    for field, (kind, required) in schema.items():
+        value = COERCERS[kind](record.get(field))
+        if value is None and required:
+            return None
+        cleaned[field] = value
+    return cleaned
+
+
+def validate_records(records, schema):
+    """Validate a list of records, dropping the invalid ones."""
+    if not isinstance(records, list):
+        return []
+    return [r for r in (validate_record(record, schema) for record in records) if r is not None]
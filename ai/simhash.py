@@ -0,0 +1,165 @@
+"""SimHash fingerprints and a banded index for near-duplicate SMS lookup.
+
+A fingerprint is a 64-bit SimHash over the message's word tokens. Two
+messages whose fingerprints differ in at most ``max_distance`` bits are
+near-duplicates. The index splits fingerprints into ``max_distance + 2``
+blocks and keys one table on every pair of blocks: a near-duplicate
+differs in at most ``max_distance`` blocks, so it matches on at least one
+pair exactly and a lookup only inspects those tables' buckets.
+"""
+import hashlib
+import re
+from collections import deque
+from itertools import combinations
+
+BITS = 64
+
+# Tokens that only mark a message as a repeat ("reminder", "final reminder")
+REPEAT_MARKERS = {"reminder", "final", "gentle", "friendly", "last", "urgent", "again", "re", "fwd"}
+
+# Numbers (amount, account, date) identify a bill better than its wording,
+# so rewording a reminder moves its fingerprint less than changing them
+NUMBER_WEIGHT = 5
+
+TOKEN = re.compile(r"[a-z0-9]+(?:[.,][0-9]+)*")
+
+# Each of the 64 bit counters lives in its own 16-bit lane of one integer,
+# so adding a token's contribution is a single big-int addition
+LANE_BITS = 16
+LANE_ONES = sum(1 << (LANE_BITS * i) for i in range(BITS))
+LANE_TOP = 1 << (LANE_BITS - 1)
+MAX_TOKENS = (LANE_TOP - 1) // NUMBER_WEIGHT
+
+_lanes = {}
+
+# Maps the 0/1 bytes of the unpacked lanes to ASCII digits
+_BIT_CHARS = bytes.maketrans(b"\x00\x01", b"01")
+
+
+def tokenize(text):
+    """Lowercase word tokens, without repeat markers."""
+    return [token for token in TOKEN.findall(text.lower()) if token not in REPEAT_MARKERS]
+
+
+def _token_lanes(token):
+    """Return a token's 64-bit hash spread out into counter lanes (memoized)."""
+    lanes = _lanes.get(token)
+    if lanes is None:
+        value = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+        lanes = 0
+        for i in range(BITS):
+            if value >> i & 1:
+                lanes |= 1 << (LANE_BITS * i)
+        _lanes[token] = lanes
+    return lanes
+
+
+def simhash(text):
+    """Compute the 64-bit SimHash of a message."""
+    tokens = tokenize(text)[:MAX_TOKENS]
+    if not tokens:
+        return 0
+
+    counts = 0
+    total = 0
+    for token in tokens:
+        if token[0].isdigit():
+            counts += _token_lanes(token) * NUMBER_WEIGHT
+            total += NUMBER_WEIGHT
+        else:
+            counts += _token_lanes(token)
+            total += 1
+
+    # A bit is set when more than half of the token weight sets it: bias every
+    # lane so exactly those lanes reach their top bit, then gather the top bits
+    counts += (LANE_TOP - (total // 2 + 1)) * LANE_ONES
+    top_bits = ((counts >> (LANE_BITS - 1)) & LANE_ONES).to_bytes(BITS * LANE_BITS // 8, "little")
+    return int(top_bits[::LANE_BITS // 8].translate(_BIT_CHARS)[::-1], 2)
+
+
+def hamming_distance(a, b):
+    return (a ^ b).bit_count()
+
+
+class SimHashIndex:
+    """Near-duplicate lookup over recent fingerprints.
+
+    Entries are grouped by a scope (e.g. the user ID) and expire once they
+    are more than ``window`` seconds older than the newest timestamp seen;
+    lookups also skip matches more than ``window`` apart from the query.
+
+    Each insert or lookup touches one bucket per table, 21 with the default
+    ``max_distance`` of 5. A table key is two blocks of 9 or 10 bits, so for
+    ``n`` entries in a scope a bucket holds about ``n / 2**18`` of them: a
+    few candidates per table even with a million entries in one scope. Real
+    fingerprints are less uniform, so buckets of similar messages are fuller.
+    """
+
+    def __init__(self, max_distance=5, window=7 * 24 * 3600, key_blocks=2):
+        """Initialize an empty index; tables are keyed on ``key_blocks`` blocks each."""
+        self.max_distance = max_distance
+        self.window = window
+        self.blocks = max_distance + key_blocks
+        edges = [BITS * i // self.blocks for i in range(self.blocks + 1)]
+        block_masks = [(1 << end) - (1 << start) for start, end in zip(edges, edges[1:])]
+        self.table_masks = [sum(masks) for masks in combinations(block_masks, key_blocks)]
+        # scope -> one dict per table of masked fingerprint -> entry IDs
+        self.buckets = {}
+        # entry ID -> (scope, fingerprint, timestamp, payload)
+        self.entries = {}
+        self.expiry = deque()
+        self.newest = float("-inf")
+        self.next_id = 0
+
+    def _expire(self, timestamp):
+        """Drop entries that fell out of the window behind the newest timestamp."""
+        self.newest = max(self.newest, timestamp)
+        while self.expiry and self.expiry[0][0] < self.newest - self.window:
+            _, entry_id = self.expiry.popleft()
+            scope, fingerprint, _, _ = self.entries.pop(entry_id)
+            tables = self.buckets[scope]
+            for table, mask in zip(tables, self.table_masks):
+                key = fingerprint & mask
+                bucket = table[key]
+                bucket.remove(entry_id)
+                if not bucket:
+                    del table[key]
+            if not any(tables):
+                del self.buckets[scope]
+
+    def query(self, scope, fingerprint, timestamp):
+        """Return ``(distance, payload)`` matches within the window, nearest first."""
+        self._expire(timestamp)
+        tables = self.buckets.get(scope)
+        if not tables:
+            return []
+        seen = set()
+        matches = []
+        for table, mask in zip(tables, self.table_masks):
+            for entry_id in table.get(fingerprint & mask, ()):
+                if entry_id in seen:
+                    continue
+                seen.add(entry_id)
+                _, other, other_time, payload = self.entries[entry_id]
+                distance = hamming_distance(fingerprint, other)
+                if distance <= self.max_distance and abs(timestamp - other_time) <= self.window:
+                    matches.append((distance, payload))
+        matches.sort(key=lambda match: match[0])
+        return matches
+
+    def add(self, scope, fingerprint, timestamp, payload):
+        """Add a fingerprint with an arbitrary payload."""
+        self._expire(timestamp)
+        entry_id = self.next_id
+        self.next_id += 1
+        self.entries[entry_id] = (scope, fingerprint, timestamp, payload)
+        self.expiry.append((timestamp, entry_id))
+        tables = self.buckets.get(scope)
+        if tables is None:
+            tables = self.buckets[scope] = [{} for _ in self.table_masks]
+        for table, mask in zip(tables, self.table_masks):
+            table.setdefault(fingerprint & mask, []).append(entry_id)
+        return entry_id
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,165 @@
+import re
+from datetime import datetime
+
+from ai.category_matcher import default_matcher
+from utils.date_utils import render_today
+
+# Words that mark a message as a bill or payment notification
+BILL_KEYWORDS = re.compile(
+    r"\b(?:bill|due|payment|pay|outstanding|overdue|renew(?:al|s|ed)?|premium|emi|"
+    r"invoice|statement|amount|recharge|subscription)\b",
+    re.IGNORECASE
+)
+
+# Words that usually mean the message is not a bill (OTPs, promotions)
+NON_BILL_KEYWORDS = re.compile(
+    r"\b(?:otp|one[- ]time password|verification code|cashback offer|sale|"
+    r"has been credited|received from)\b",
+    re.IGNORECASE
+)
+
+CURRENCY = r"(?:rs\.?|inr|₹|\$|usd|eur|€|£|gbp|cad|aud|jpy|¥)"
+CURRENCY_MARK = re.compile(CURRENCY, re.IGNORECASE)
+
+# ISO code for each currency symbol or code matched by CURRENCY
+CURRENCY_CODES = {
+    "rs": "INR", "rs.": "INR", "inr": "INR", "₹": "INR",
+    "$": "USD", "usd": "USD",
+    "€": "EUR", "eur": "EUR",
+    "£": "GBP", "gbp": "GBP",
+    "cad": "CAD", "aud": "AUD",
+    "¥": "JPY", "jpy": "JPY",
+}
+NUMBER = r"(\d[\d,]*(?:\.\d{1,2})?)"
+
+AMOUNT_PATTERNS = [
+    re.compile(rf"{CURRENCY}\s*{NUMBER}", re.IGNORECASE),
+    re.compile(rf"{NUMBER}\s*{CURRENCY}", re.IGNORECASE),
+    re.compile(rf"\b(?:amount|amt|total|balance)(?:\s+(?:due|of|payable))?\s*(?:is|:|of)?\s*{NUMBER}", re.IGNORECASE),
+]
+
+MONTHS = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*"
+
+DATE_PATTERNS = [
+    re.compile(r"\b(\d{4}-\d{1,2}-\d{1,2})\b"),
+    re.compile(r"\b(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})\b"),
+    re.compile(rf"\b(\d{{1,2}}(?:st|nd|rd|th)?[\s-]+{MONTHS}(?:[\s,-]+\d{{2,4}})?)\b", re.IGNORECASE),
+    re.compile(rf"\b({MONTHS}\s+\d{{1,2}}(?:st|nd|rd|th)?(?:,?\s+\d{{4}})?)\b", re.IGNORECASE),
+]
+
+DUE_MARKER = re.compile(r"\b(?:due|by|before|on|pay by|renews?)\b", re.IGNORECASE)
+
+DATE_FORMATS = [
+    "%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d/%m/%y", "%d-%m-%y",
+    "%d %b %Y", "%d %B %Y", "%d %b %y", "%d-%b-%Y", "%d-%b-%y",
+    "%b %d %Y", "%B %d %Y", "%d %b", "%d %B", "%b %d", "%B %d",
+]
+
+# Carrier header prefixes such as "AD-" or "VM-" in "AD-HDFCBK"
+SENDER_PREFIX = re.compile(r"^[A-Z]{2}-")
+
+
+def looks_like_bill(sender, content):
+    """Cheap classifier for whether an SMS is a bill notification."""
+    if NON_BILL_KEYWORDS.search(content):
+        return False
+    return bool(BILL_KEYWORDS.search(content)) and extract_amount(content) is not None
+
+
+def extract_amount(content):
+    """Extract the first money amount from an SMS."""
+    for pattern in AMOUNT_PATTERNS:
+        match = pattern.search(content)
+        if match:
+            try:
+                return float(match.group(1).replace(",", ""))
+            except ValueError:
+                continue
+    return None
+
+
+def extract_currency(content):
+    """Get the ISO code of the currency next to the first amount, or None."""
+    for pattern in AMOUNT_PATTERNS:
+        match = pattern.search(content)
+        if match:
+            mark = CURRENCY_MARK.search(match.group(0))
+            return CURRENCY_CODES.get(mark.group(0).lower()) if mark else None
+    return None
+
+
+def parse_date(value, today=None):
+    """Parse a date in any of the common SMS formats to YYYY-MM-DD."""
+    value = re.sub(r"(\d)(?:st|nd|rd|th)\b", r"\1", value.strip(), flags=re.IGNORECASE)
+    value = re.sub(r"[\s,-]+", " ", value) if re.search(r"[a-zA-Z]", value) else value
+    value = re.sub(r"\bsept\b", "sep", value, flags=re.IGNORECASE)
+    today = today or render_today()
+
+    for date_format in DATE_FORMATS:
+        candidate_format = date_format.replace("-", " ") if " " in value else date_format
+        try:
+            parsed = datetime.strptime(value, candidate_format).date()
+        except ValueError:
+            continue
+
+        if "%Y" not in date_format and "%y" not in date_format:
+            # No year given, so use the next occurrence of that day
+            parsed = parsed.replace(year=today.year)
+            if parsed < today:
+                parsed = parsed.replace(year=today.year + 1)
+        return parsed.strftime("%Y-%m-%d")
+
+    return None
+
+
+def extract_due_date(content, today=None):
+    """Extract the due date, preferring dates that follow a 'due' marker."""
+    candidates = []
+    for pattern in DATE_PATTERNS:
+        for match in pattern.finditer(content):
+            parsed = parse_date(match.group(1), today)
+            if parsed:
+                prefix = content[max(0, match.start() - 20):match.start()]
+                candidates.append((0 if DUE_MARKER.search(prefix) else 1, match.start(), parsed))
+
+    if not candidates:
+        return None
+    return min(candidates)[2]
+
+
+def merchant_from_sender(sender):
+    """Derive a merchant name from an SMS sender ID."""
+    sender = SENDER_PREFIX.sub("", sender.strip())
+    return sender if not sender.replace("+", "").isdigit() else None
+
+
+def parse_bill_sms(sender, content, today=None):
+    """Extract bill information from an SMS without calling the LLM.
+
+    Returns a dict in the same shape as GroqService.analyze_sms_content, or
+    None when the message does not look like a bill.
+    """
+    if not looks_like_bill(sender, content):
+        return None
+
+    merchant = merchant_from_sender(sender)
+    bill_data = {
+        "title": f"{merchant} Bill" if merchant else "Bill",
+        "amount": extract_amount(content),
+        "currency": extract_currency(content),
+        "dueDate": extract_due_date(content, today),
+        "merchantName": merchant,
+        "description": content.strip()[:120],
+    }
+    bill_data["categoryId"] = default_matcher.match_text(f"{sender} {content}")
+
+    return bill_data
+
+
+def finalize_sms_bill(bill_data):
+    """Set the default fields for a bill detected from SMS."""
+    bill_data["paid"] = False
+    bill_data["recurring"] = True
+    bill_data["detectedFromSms"] = True
+    bill_data["autoPay"] = False
+    return bill_data
@@ -0,0 +1,202 @@
+"""Bulk SMS import: filter, classify, pre-parse, and call the LLM only when needed.
+
+Messages are processed in chunks. For each chunk:
+
+1. Sender filters and the cheap bill classifier drop messages that are not
+   bill notifications, before anything is stored.
+2. The remaining messages are stored in one bulk call, which also flags
+   near-duplicates of earlier messages.
+3. New messages are pre-parsed locally; only those missing an amount or due
+   date go to the LLM, either inline or as background jobs.
+4. The detected bills are written in one bulk upsert, and duplicates are
+   linked to their original's bill.
+"""
+import re
+
+from ai.sms_parser import looks_like_bill, parse_bill_sms, finalize_sms_bill
+
+CHUNK_SIZE = 200
+
+# Alphanumeric sender IDs ("AD-HDFCBK", "Netflix") belong to businesses;
+# plain phone numbers are almost always personal messages
+PHONE_NUMBER = re.compile(r"^\+?[\d\s()-]{6,}$")
+
+
+def make_sender_filter(include=None, exclude=None, business_only=True):
+    """Build a predicate on the sender ID.
+
+    ``include`` and ``exclude`` are lists of case-insensitive substrings; an
+    empty ``include`` accepts every sender not excluded.
+    """
+    include = [term.lower() for term in include or [] if term]
+    exclude = [term.lower() for term in exclude or [] if term]
+
+    def accept(sender):
+        lowered = sender.lower()
+        if business_only and PHONE_NUMBER.match(sender.strip()):
+            return False
+        if any(term in lowered for term in exclude):
+            return False
+        return not include or any(term in lowered for term in include)
+
+    return accept
+
+
+def new_summary():
+    return {
+        "read": 0,
+        "filtered": 0,
+        "notBill": 0,
+        "created": 0,
+        "duplicates": 0,
+        "skipped": 0,
+        "preParsed": 0,
+        "llmCalls": 0,
+        "queued": 0
+    }
+
+
+def _chunks(messages, size):
+    chunk = []
+    for message in messages:
+        chunk.append(message)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _detect_bill(groq_service, sms, summary, defer):
+    """Pre-parse locally; fall back to the LLM when fields are missing.
+
+    Returns the bill data, or None when there is no bill or the LLM call
+    was deferred to a background job.
+    """
+    bill_data = parse_bill_sms(sms["sender"], sms["content"], today=sms["receivedAt"].date())
+    if bill_data and bill_data["amount"] is not None and bill_data["dueDate"]:
+        summary["preParsed"] += 1
+        return finalize_sms_bill(bill_data)
+
+    if defer and defer(sms):
+        summary["queued"] += 1
+        return None
+
+    summary["llmCalls"] += 1
+    bill_data = groq_service.analyze_sms_content(sms["sender"], sms["content"])
+    if not bill_data:
+        summary["skipped"] += 1
+    return bill_data
+
+
+def import_messages(storage, groq_service, messages, user_id, sender_filter=None,
+                    chunk_size=CHUNK_SIZE, progress=None, defer=None):
+    """Import an iterable of ``{"sender", "content", "receivedAt"}`` messages.
+
+    ``progress`` is called with the running summary after every chunk.
+    ``defer(sms)`` may queue an LLM analysis in the background; it returns
+    a falsy value when the message should be analyzed inline instead.
+    Returns the summary counts: created, duplicates, skipped and so on.
+    """
+    summary = new_summary()
+
+    for chunk in _chunks(messages, chunk_size):
+        summary["read"] += len(chunk)
+
+        # Classify before storing anything
+        candidates = []
+        for message in chunk:
+            if sender_filter and not sender_filter(message["sender"]):
+                summary["filtered"] += 1
+            elif not looks_like_bill(message["sender"], message["content"]):
+                summary["notBill"] += 1
+            else:
+                candidates.append(dict(message, userId=user_id, processed=False, billId=None))
+
+        stored = storage.create_sms_messages(candidates)
+
+        # Detect bills for new messages; repeats wait for their original
+        originals = []
+        bills = []
+        for sms in stored:
+            if sms["duplicateOf"]:
+                continue
+            bill_data = _detect_bill(groq_service, sms, summary, defer)
+            if bill_data:
+                bill_data["userId"] = user_id
+                originals.append(sms)
+                bills.append(bill_data)
+
+        for sms, (bill, created) in zip(originals, storage.upsert_bills(bills)):
+            storage.update_sms_message(sms["id"], {"processed": True, "billId": bill["id"]})
+            summary["created" if created else "duplicates"] += 1
+
+        for sms in stored:
+            if not sms["duplicateOf"]:
+                continue
+            bill = storage.get_duplicate_sms_bill(sms)
+            original = storage.get_sms_message(sms["duplicateOf"])
+            if bill:
+                storage.update_sms_message(sms["id"], {"processed": True, "billId": bill["id"]})
+                summary["duplicates"] += 1
+            elif original and original.get("jobId"):
+                # Linked once the original's background analysis is applied
+                summary["duplicates"] += 1
+            else:
+                summary["skipped"] += 1
+
+        if progress:
+            progress(summary)
+
+    return summary
+
+
+def import_from_inbox(storage, groq_service, inbox, user_id, sender_filter=None, defer=None, max_batches=10):
+    """Drain messages collected by the inbox watcher through the pipeline.
+
+    Each batch is marked consumed only after it was imported; a batch
+    imported twice after a crash is absorbed by the duplicate checks.
+    """
+    summary = new_summary()
+    for _ in range(max_batches):
+        batch = inbox.take()
+        if not batch:
+            break
+        result = import_messages(storage, groq_service, batch, user_id, sender_filter=sender_filter, defer=defer)
+        for key, value in result.items():
+            summary[key] += value
+        inbox.mark_consumed([message["inboxId"] for message in batch])
+    return summary
+
+
+def apply_finished_jobs(storage, job_queue, owner):
+    """Write the results of finished SMS analysis jobs to storage.
+
+    Must run on the session's script thread. Repeats of an analyzed message
+    are linked to the same bill. Returns the number of jobs applied.
+    """
+    jobs = job_queue.get_jobs(owner, ("done", "failed"), unapplied_only=True)
+    if not jobs:
+        return 0
+
+    # Unprocessed repeats per user, keyed by the message they repeat
+    waiting = {}
+
+    for job in jobs:
+        sms = storage.get_sms_message(job["payload"]["smsId"])
+        bill_data = job["result"] if job["status"] == "done" else None
+        # Jobs persisted by an older version may hold a bill without a due date
+        if sms and bill_data and bill_data.get("dueDate"):
+            if sms["userId"] not in waiting:
+                repeats = waiting[sms["userId"]] = {}
+                for other in storage.get_sms_messages(sms["userId"]):
+                    if other.get("duplicateOf") and not other["processed"]:
+                        repeats.setdefault(other["duplicateOf"], []).append(other)
+
+            bill_data["userId"] = sms["userId"]
+            bill, _ = storage.upsert_bill(bill_data)
+            for linked in [sms] + waiting[sms["userId"]].get(sms["id"], []):
+                storage.update_sms_message(linked["id"], {"processed": True, "billId": bill["id"]})
+        job_queue.mark_applied(job["id"])
+
+    return len(jobs)
@@ -0,0 +1,266 @@
+"""Local OpenAI/Groq-compatible stand-in server for offline and load testing.
+
+Serves ``POST /openai/v1/chat/completions`` (the path the Groq SDK uses) with
+canned responses for SMS analysis, suggestions and forecasts, including
+``stream=True`` server-sent events. Latency and errors can be injected:
+
+    python -m ai.stub_server --port 8765 --latency lognormal:80:30 \\
+        --error-rate 429=0.05 --error-rate 500=0.02 --error-rate timeout=0.01
+
+Point the app at it with ``GROQ_BASE_URL=http://127.0.0.1:8765``.
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_RESPONSES = {
+    "sms": {
+        "title": "Electricity Bill",
+        "amount": 87.5,
+        "dueDate": "2025-01-15",
+        "merchantName": "Power Company",
+        "description": "Monthly electricity bill",
+        "categoryId": None
+    },
+    "not_bill": {"isBill": False},
+    "suggestions": [
+        {
+            "type": "savings",
+            "title": "Review unused subscription",
+            "description": "Your gym membership has not been used in 30 days.",
+            "icon": "💡",
+            "billId": None,
+            "subscriptionId": 3,
+            "potentialSavings": 50.0
+        },
+        {
+            "type": "reminder",
+            "title": "Enable auto-pay for rent",
+            "description": "Rent is your largest bill and has no auto-pay.",
+            "icon": "⏰",
+            "billId": 1,
+            "subscriptionId": None,
+            "potentialSavings": None
+        }
+    ],
+    "forecast": [
+        {"month": "January", "subscriptions": 75.98, "utilities": 94.5, "other": 1350.0, "total": 1520.48},
+        {"month": "February", "subscriptions": 76.74, "utilities": 94.5, "other": 1350.0, "total": 1521.24},
+        {"month": "March", "subscriptions": 77.5, "utilities": 87.5, "other": 1350.0, "total": 1515.0}
+    ]
+}
+
+
+class LatencyModel:
+    """Sample response delays from a named distribution (milliseconds)."""
+
+    def __init__(self, spec="fixed:0", rng=None):
+        """Parse a spec such as ``fixed:50``, ``uniform:20:80``, ``normal:50:10`` or ``lognormal:50:20``."""
+        name, *params = spec.split(":")
+        self.name = name
+        self.params = [float(p) for p in params] or [0.0]
+        self.rng = rng or random.Random()
+
+    def sample(self):
+        """Return one delay in seconds."""
+        if self.name == "uniform":
+            delay = self.rng.uniform(self.params[0], self.params[1])
+        elif self.name == "normal":
+            delay = self.rng.gauss(self.params[0], self.params[1])
+        elif self.name == "lognormal":
+            # Parameterized by the mean and standard deviation of the delay itself
+            mean, std = self.params[0], self.params[1]
+            if mean > 0:
+                sigma = math.sqrt(math.log(1 + (std / mean) ** 2))
+                delay = self.rng.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+            else:
+                delay = 0.0
+        else:
+            delay = self.params[0]
+        return max(0.0, delay) / 1000.0
+
+
+class StubConfig:
+    """Shared settings and counters for a running stub server."""
+
+    def __init__(self, latency="fixed:0", error_rates=None, timeout_seconds=60.0,
+                 responses=None, seed=None):
+        """Initialize the stub configuration."""
+        self.rng = random.Random(seed)
+        self.latency = LatencyModel(latency, self.rng)
+        self.error_rates = error_rates or {}
+        self.timeout_seconds = timeout_seconds
+        self.responses = dict(CANNED_RESPONSES, **(responses or {}))
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def count(self, name):
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def pick_error(self):
+        """Return an injected error kind ('429', '500', 'timeout') or None."""
+        roll = self.rng.random()
+        for kind, rate in self.error_rates.items():
+            if roll < rate:
+                return kind
+            roll -= rate
+        return None
+
+
+def classify_request(messages):
+    """Decide which canned response a chat request should get."""
+    system = " ".join(m.get("content", "") for m in messages if m.get("role") == "system").lower()
+    user = " ".join(m.get("content", "") for m in messages if m.get("role") == "user").lower()
+
+    if "sms" in system:
+        return "sms" if any(word in user for word in ("bill", "due", "payment", "amount")) else "not_bill"
+    if "suggestion" in system:
+        return "suggestions"
+    if "forecast" in system:
+        return "forecast"
+    return "not_bill"
+
+
+def completion_body(content, model, stream_chunk=False):
+    """Build an OpenAI-style completion (or streamed chunk) payload."""
+    if stream_chunk:
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}]
+        }
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Request handler for the stub; ``server.config`` holds a StubConfig."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY every
+    # keep-alive response would wait on the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        config = self.server.config
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        config.count("requests")
+
+        time.sleep(config.latency.sample())
+
+        error = config.pick_error()
+        if error == "timeout":
+            config.count("timeouts")
+            time.sleep(config.timeout_seconds)
+            self.close_connection = True
+            return
+        if error in ("429", "500", "503"):
+            config.count(f"errors_{error}")
+            payload = json.dumps({"error": {"message": f"Injected {error}", "type": "stub_error"}}).encode()
+            self.send_response(int(error))
+            if error == "429":
+                self.send_header("Retry-After", "1")
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        kind = classify_request(body.get("messages", []))
+        config.count(kind)
+        response = config.responses[kind]
+        if body.get("response_format", {}).get("type") == "json_object" and isinstance(response, list):
+            # JSON mode only produces objects, so arrays come back wrapped
+            response = {kind: response}
+        content = json.dumps(response)
+        model = body.get("model", "stub")
+
+        if body.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for start in range(0, len(content), 16):
+                chunk = json.dumps(completion_body(content[start:start + 16], model, stream_chunk=True))
+                self.wfile.write(f"data: {chunk}\n\n".encode())
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+            return
+
+        payload = json.dumps(completion_body(content, model)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(host="127.0.0.1", port=0, **config):
+    """Start the stub in a background thread and return ``(server, base_url)``."""
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.config = StubConfig(**config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def parse_error_rates(values):
+    """Parse ``--error-rate KIND=RATE`` arguments."""
+    rates = {}
+    for value in values or []:
+        kind, rate = value.split("=")
+        rates[kind] = float(rate)
+    return rates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Groq-compatible stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="fixed:0",
+                        help="fixed:MS, uniform:LO:HI, normal:MEAN:STD or lognormal:MEAN:STD")
+    parser.add_argument("--error-rate", action="append",
+                        help="KIND=RATE where KIND is 429, 500, 503 or timeout (repeatable)")
+    parser.add_argument("--timeout-seconds", type=float, default=60.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    server.daemon_threads = True
+    server.config = StubConfig(
+        latency=args.latency,
+        error_rates=parse_error_rates(args.error_rate),
+        timeout_seconds=args.timeout_seconds,
+        seed=args.seed
+    )
+    print(f"Groq stub listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -127,6 +127,124 @@ def get_bill_status(due_date):
     else:
         return "upcoming", "Upcoming"
 
+# Button callbacks; they run before the rerun, so the list redraws with the change
+def select_page(page):
+    st.session_state.page = page
+
+def mark_bill_paid(bill_id):
+    for bill in st.session_state.bills:
+        if bill["id"] == bill_id:
+            bill["paid"] = True
+
+def delete_bill(bill_id):
+    st.session_state.bills = [bill for bill in st.session_state.bills if bill["id"] != bill_id]
+
+def set_subscription_active(sub_id, active):
+    for sub in st.session_state.subscriptions:
+        if sub["id"] == sub_id:
+            sub["active"] = active
+
+def delete_subscription(sub_id):
+    st.session_state.subscriptions = [sub for sub in st.session_state.subscriptions if sub["id"] != sub_id]
+
+def show_bill_list():
+    """Display every bill with its Mark Paid and Delete buttons."""
+    if not st.session_state.bills:
+        st.info("No bills found.")
+    else:
+        # Sort bills by due date
+        sorted_bills = sorted(st.session_state.bills, key=lambda x: x["due_date"])
+        
+        for bill in sorted_bills:
+            status_class, status_text = get_bill_status(bill["due_date"])
+            
+            col1, col2, col3, col4, col5 = st.columns([3, 2, 2, 1, 1])
+            
+            col1.markdown(f"<strong>{bill['title']}</strong><br><small>{bill['merchant']}</small>", unsafe_allow_html=True)
+            col2.write(format_date(bill["due_date"]))
+            col3.write(format_currency(bill["amount"]))
+            col4.markdown(f'<span class="{status_class}">{status_text}</span>', unsafe_allow_html=True)
+            
+            if not bill["paid"]:
+                col5.button("Mark Paid", key=f"pay_{bill['id']}", on_click=mark_bill_paid, args=(bill["id"],))
+            else:
+                col5.write("✓ Paid")
+            
+            with st.expander("Details", expanded=False):
+                st.markdown(f"**Description:** {bill['description']}")
+                st.markdown(f"**Category:** {bill['category']}")
+                st.markdown(f"**Recurring:** {'Yes' if bill['recurring'] else 'No'}")
+                
+                # Edit/Delete buttons
+                col1, col2 = st.columns(2)
+                col2.button("Delete", key=f"del_{bill['id']}", on_click=delete_bill, args=(bill["id"],))
+            
+            st.markdown("<hr>", unsafe_allow_html=True)
+
+def show_subscription_list():
+    """Display every subscription with its Activate, Deactivate and Delete buttons."""
+    if not st.session_state.subscriptions:
+        st.info("No subscriptions found.")
+    else:
+        # Sort subscriptions by renewal date
+        sorted_subs = sorted(st.session_state.subscriptions, key=lambda x: x["renewal_date"])
+        
+        # Calculate monthly cost
+        monthly_cost = sum(
+            sub["amount"] if sub["frequency"] == "monthly" else
+            sub["amount"] / 12 if sub["frequency"] == "yearly" else
+            sub["amount"] / 3 if sub["frequency"] == "quarterly" else
+            sub["amount"] * 4.33 if sub["frequency"] == "weekly" else 0
+            for sub in st.session_state.subscriptions if sub["active"]
+        )
+        
+        # Display total monthly cost
+        st.markdown(
+            f'<div style="background-color: #f0f7ff; padding: 15px; border-radius: 10px; margin-bottom: 20px;">'
+            f'<h3 style="margin: 0; color: #1565C0;">Monthly Subscription Cost: {format_currency(monthly_cost)}</h3>'
+            f'</div>',
+            unsafe_allow_html=True
+        )
+        
+        for sub in sorted_subs:
+            col1, col2, col3, col4, col5 = st.columns([3, 2, 2, 1, 1])
+            
+            frequency_display = {
+                "monthly": "Monthly",
+                "yearly": "Yearly",
+                "quarterly": "Quarterly",
+                "weekly": "Weekly",
+                "biweekly": "Bi-weekly"
+            }.get(sub["frequency"], sub["frequency"].capitalize())
+            
+            col1.markdown(f"<strong>{sub['title']}</strong><br><small>{sub['merchant']}</small>", unsafe_allow_html=True)
+            col2.markdown(f"{format_currency(sub['amount'])}<br><small>{frequency_display}</small>", unsafe_allow_html=True)
+            col3.write(format_date(sub["renewal_date"]))
+            
+            status_color = "#4CAF50" if sub["active"] else "#9E9E9E"
+            status_text = "Active" if sub["active"] else "Inactive"
+            col4.markdown(
+                f'<span style="background-color: {status_color}20; color: {status_color}; '
+                f'padding: 3px 10px; border-radius: 12px; font-size: 0.8rem;">'
+                f'{status_text}</span>',
+                unsafe_allow_html=True
+            )
+            
+            if sub["active"]:
+                col5.button("Deactivate", key=f"deact_{sub['id']}", on_click=set_subscription_active, args=(sub["id"], False))
+            else:
+                col5.button("Activate", key=f"act_{sub['id']}", on_click=set_subscription_active, args=(sub["id"], True))
+            
+            with st.expander("Details", expanded=False):
+                st.markdown(f"**Description:** {sub['description']}")
+                st.markdown(f"**Category:** {sub['category']}")
+                
+                # Edit/Delete buttons
+                col1, col2 = st.columns(2)
+                col2.button("Delete", key=f"del_sub_{sub['id']}", on_click=delete_subscription, args=(sub["id"],))
+            
+            st.markdown("<hr>", unsafe_allow_html=True)
+
 # Sidebar for navigation
 with st.sidebar:
     st.title("BillTracker AI")
@@ -135,17 +253,11 @@ with st.sidebar:
     # Navigation
     st.markdown("### Navigation")
     
-    if st.button("📊 Dashboard", use_container_width=True, 
-                type="primary" if st.session_state.page == "Dashboard" else "secondary"):
-        st.session_state.page = "Dashboard"
-        
-    if st.button("💵 Bills", use_container_width=True,
-                type="primary" if st.session_state.page == "Bills" else "secondary"):
-        st.session_state.page = "Bills"
-        
-    if st.button("🔄 Subscriptions", use_container_width=True,
-                type="primary" if st.session_state.page == "Subscriptions" else "secondary"):
-        st.session_state.page = "Subscriptions"
+    # Switch pages in a callback, so the new page renders in the same run
+    for page, icon in (("Dashboard", "📊"), ("Bills", "💵"), ("Subscriptions", "🔄")):
+        st.button(f"{icon} {page}", use_container_width=True,
+                  type="primary" if st.session_state.page == page else "secondary",
+                  on_click=select_page, args=(page,))
     
     st.markdown("---")
     st.caption("© 2023 BillTracker AI")
@@ -248,45 +360,8 @@ elif st.session_state.page == "Bills":
     tab1, tab2 = st.tabs(["All Bills", "Add New Bill"])
     
     with tab1:
-        if not st.session_state.bills:
-            st.info("No bills found.")
-        else:
-            # Sort bills by due date
-            sorted_bills = sorted(st.session_state.bills, key=lambda x: x["due_date"])
-            
-            for bill in sorted_bills:
-                status_class, status_text = get_bill_status(bill["due_date"])
-                
-                col1, col2, col3, col4, col5 = st.columns([3, 2, 2, 1, 1])
-                
-                col1.markdown(f"<strong>{bill['title']}</strong><br><small>{bill['merchant']}</small>", unsafe_allow_html=True)
-                col2.write(format_date(bill["due_date"]))
-                col3.write(format_currency(bill["amount"]))
-                col4.markdown(f'<span class="{status_class}">{status_text}</span>', unsafe_allow_html=True)
-                
-                if not bill["paid"]:
-                    if col5.button("Mark Paid", key=f"pay_{bill['id']}"):
-                        for b in st.session_state.bills:
-                            if b["id"] == bill["id"]:
-                                b["paid"] = True
-                                st.success(f"Marked {bill['title']} as paid!")
-                                st.rerun()
-                else:
-                    col5.write("✓ Paid")
-                
-                with st.expander("Details", expanded=False):
-                    st.markdown(f"**Description:** {bill['description']}")
-                    st.markdown(f"**Category:** {bill['category']}")
-                    st.markdown(f"**Recurring:** {'Yes' if bill['recurring'] else 'No'}")
-                    
-                    # Edit/Delete buttons
-                    col1, col2 = st.columns(2)
-                    if col2.button("Delete", key=f"del_{bill['id']}"):
-                        st.session_state.bills = [b for b in st.session_state.bills if b["id"] != bill["id"]]
-                        st.success(f"Deleted {bill['title']}!")
-                        st.rerun()
-                
-                st.markdown("<hr>", unsafe_allow_html=True)
+        # A fragment, so the buttons on each bill rerun only the list
+        st.fragment(show_bill_list)()
     
     with tab2:
         # Check if form was just submitted
@@ -364,80 +439,8 @@ elif st.session_state.page == "Subscriptions":
     tab1, tab2 = st.tabs(["All Subscriptions", "Add New Subscription"])
     
     with tab1:
-        if not st.session_state.subscriptions:
-            st.info("No subscriptions found.")
-        else:
-            # Sort subscriptions by renewal date
-            sorted_subs = sorted(st.session_state.subscriptions, key=lambda x: x["renewal_date"])
-            
-            # Calculate monthly cost
-            monthly_cost = sum(
-                sub["amount"] if sub["frequency"] == "monthly" else
-                sub["amount"] / 12 if sub["frequency"] == "yearly" else
-                sub["amount"] / 3 if sub["frequency"] == "quarterly" else
-                sub["amount"] * 4.33 if sub["frequency"] == "weekly" else 0
-                for sub in st.session_state.subscriptions if sub["active"]
-            )
-            
-            # Display total monthly cost
-            st.markdown(
-                f'<div style="background-color: #f0f7ff; padding: 15px; border-radius: 10px; margin-bottom: 20px;">'
-                f'<h3 style="margin: 0; color: #1565C0;">Monthly Subscription Cost: {format_currency(monthly_cost)}</h3>'
-                f'</div>',
-                unsafe_allow_html=True
-            )
-            
-            for sub in sorted_subs:
-                col1, col2, col3, col4, col5 = st.columns([3, 2, 2, 1, 1])
-                
-                frequency_display = {
-                    "monthly": "Monthly",
-                    "yearly": "Yearly",
-                    "quarterly": "Quarterly",
-                    "weekly": "Weekly",
-                    "biweekly": "Bi-weekly"
-                }.get(sub["frequency"], sub["frequency"].capitalize())
-                
-                col1.markdown(f"<strong>{sub['title']}</strong><br><small>{sub['merchant']}</small>", unsafe_allow_html=True)
-                col2.markdown(f"{format_currency(sub['amount'])}<br><small>{frequency_display}</small>", unsafe_allow_html=True)
-                col3.write(format_date(sub["renewal_date"]))
-                
-                status_color = "#4CAF50" if sub["active"] else "#9E9E9E"
-                status_text = "Active" if sub["active"] else "Inactive"
-                col4.markdown(
-                    f'<span style="background-color: {status_color}20; color: {status_color}; '
-                    f'padding: 3px 10px; border-radius: 12px; font-size: 0.8rem;">'
-                    f'{status_text}</span>',
-                    unsafe_allow_html=True
-                )
-                
-                if sub["active"]:
-                    if col5.button("Deactivate", key=f"deact_{sub['id']}"):
-                        for s in st.session_state.subscriptions:
-                            if s["id"] == sub["id"]:
-                                s["active"] = False
-                                st.success(f"Deactivated {sub['title']}!")
-                                st.rerun()
-                else:
-                    if col5.button("Activate", key=f"act_{sub['id']}"):
-                        for s in st.session_state.subscriptions:
-                            if s["id"] == sub["id"]:
-                                s["active"] = True
-                                st.success(f"Activated {sub['title']}!")
-                                st.rerun()
-                
-                with st.expander("Details", expanded=False):
-                    st.markdown(f"**Description:** {sub['description']}")
-                    st.markdown(f"**Category:** {sub['category']}")
-                    
-                    # Edit/Delete buttons
-                    col1, col2 = st.columns(2)
-                    if col2.button("Delete", key=f"del_sub_{sub['id']}"):
-                        st.session_state.subscriptions = [s for s in st.session_state.subscriptions if s["id"] != sub["id"]]
-                        st.success(f"Deleted {sub['title']}!")
-                        st.rerun()
-                
-                st.markdown("<hr>", unsafe_allow_html=True)
+        # A fragment, so the buttons on each subscription rerun only the list
+        st.fragment(show_subscription_list)()
     
     with tab2:
         # Check if form was just submitted
@@ -0,0 +1,93 @@
+"""Load driver for the AI paths, run against the offline Groq stub server.
+
+Reports p50/p95/p99 end-to-end latency and throughput for
+analyze_sms_content, generate_bill_suggestions and forecast_bills.
+Run from the repository root:
+
+    python -m benchmarks.ai_load_driver --requests 300 --concurrency 8 \\
+        --latency lognormal:80:30 --error-rate 429=0.05 --error-rate 500=0.02
+
+Pass --base-url to drive an already running stub instead of an in-process one.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ai.groq_service import GroqService
+from ai.resilience import RateLimiter
+from ai.stub_server import parse_error_rates, start_stub_server
+
+SMS = ("AD-POWERCO", "Your electricity bill of Rs. 1,245.50 is due on 15/03/2025.")
+USER_DATA = {
+    "bills": [{"id": 1, "title": "Rent", "amount": 1200.0, "dueDate": "2025-01-05"}],
+    "subscriptions": [{"id": 3, "title": "Gym Membership", "amount": 50.0, "frequency": "monthly"}]
+}
+
+PATHS = {
+    "analyze_sms_content": lambda service: service.analyze_sms_content(*SMS),
+    "generate_bill_suggestions": lambda service: service.generate_bill_suggestions(USER_DATA),
+    "forecast_bills": lambda service: service.forecast_bills(USER_DATA["bills"], 3),
+}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_path(service, call, count, concurrency):
+    """Run ``count`` calls and return (latencies in ms, wall seconds, empty results)."""
+    def timed(_):
+        start = time.perf_counter()
+        result = call(service)
+        return (time.perf_counter() - start) * 1000, not result
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, range(count)))
+    wall = time.perf_counter() - start
+
+    return sorted(r[0] for r in results), wall, sum(r[1] for r in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the AI paths against the Groq stub")
+    parser.add_argument("--requests", type=int, default=200, help="requests per path")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--base-url", help="use a running stub instead of starting one")
+    parser.add_argument("--latency", default="lognormal:80:30")
+    parser.add_argument("--error-rate", action="append")
+    parser.add_argument("--timeout", type=float, default=5.0, help="client timeout in seconds")
+    parser.add_argument("--rpm", type=int, default=100000, help="client requests-per-minute quota")
+    parser.add_argument("--tpm", type=int, default=100000000, help="client tokens-per-minute quota")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server, base_url = start_stub_server(
+            latency=args.latency,
+            error_rates=parse_error_rates(args.error_rate),
+            timeout_seconds=args.timeout * 2
+        )
+
+    service = GroqService(api_key="load-test", base_url=base_url, timeout=args.timeout)
+    service.rate_limiter = RateLimiter(args.rpm, args.tpm)
+
+    print(f"{'path':<28}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'empty':>8}")
+    for name, call in PATHS.items():
+        latencies, wall, empty = run_path(service, call, args.requests, args.concurrency)
+        print(f"{name:<28}{percentile(latencies, 50):>10.1f}{percentile(latencies, 95):>10.1f}"
+              f"{percentile(latencies, 99):>10.1f}{args.requests / wall:>10.1f}{empty:>8}")
+
+    print(f"client metrics: {service.get_metrics()}")
+    if server:
+        print(f"stub counts:    {server.config.counts}")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark the compiled category matcher against the old nested keyword loops.
+
+Run from the repository root:
+
+    python -m benchmarks.category_matcher_bench [count]
+"""
+import random
+import sys
+import time
+
+from ai.category_matcher import CategoryMatcher
+
+WORDS = [
+    "Electricity", "Water", "Gas", "Internet", "Rent", "Car", "Insurance", "Netflix",
+    "Spotify", "Gym", "Membership", "Pharmacy", "Grocery", "Restaurant", "Parking",
+    "Monthly", "Bill", "Payment", "Reminder", "Premium", "Card", "Credit", "Station",
+    "Plan", "Service", "Home", "Loan", "Phone", "Mobile", "Streaming",
+]
+
+LEGACY_KEYWORDS = {
+    1: ["rent", "mortgage", "housing", "apartment", "home"],
+    2: ["utility", "electric", "water", "gas", "power", "energy", "internet", "wifi", "broadband"],
+    3: ["car", "auto", "vehicle", "transportation", "fuel", "gas", "petrol", "diesel", "parking"],
+    4: ["grocery", "food", "supermarket", "market"],
+    5: ["entertainment", "movie", "theater", "game", "subscription"],
+    6: ["restaurant", "dining", "cafe", "food delivery"],
+    7: ["health", "medical", "doctor", "hospital", "clinic", "pharmacy", "prescription"],
+    8: ["insurance", "coverage", "policy", "protection", "premium"],
+    9: ["subscription", "membership", "streaming", "netflix", "spotify", "amazon prime"],
+    10: []
+}
+
+
+def legacy_categorize(text):
+    """The original substring scan from GroqService._determine_category."""
+    text = text.lower()
+    for category_id, keywords in LEGACY_KEYWORDS.items():
+        for keyword in keywords:
+            if keyword in text:
+                return category_id
+    return 10
+
+
+def make_titles(count, seed=42):
+    """Generate random three-word bill titles."""
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=3)) for _ in range(count)]
+
+
+def main(count=1_000_000):
+    titles = make_titles(count)
+    matcher = CategoryMatcher()
+
+    start = time.perf_counter()
+    for title in titles:
+        legacy_categorize(title)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher.categorize_many(titles)
+    matcher_time = time.perf_counter() - start
+
+    print(f"titles:            {count:,}")
+    print(f"legacy loops:      {legacy_time:.2f}s ({count / legacy_time:,.0f} titles/s)")
+    print(f"categorize_many:   {matcher_time:.2f}s ({count / matcher_time:,.0f} titles/s)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,52 @@
+"""Measure the cold import time of each page with ``-X importtime``.
+
+Every import runs in a fresh interpreter, and the best of ``runs`` is kept.
+The time sums the self time of every module imported, Streamlit included.
+The heavy libraries each page pulls in are listed alongside. Run from the
+repository root:
+
+    python -m benchmarks.cold_start_bench [runs]
+"""
+import subprocess
+import sys
+
+from pages import PAGES
+
+# Libraries a page should only load when it needs them
+HEAVY_MODULES = ("pandas", "plotly.express", "plotly.graph_objects", "groq")
+
+
+def import_time(statement):
+    """Import in a fresh interpreter; returns (seconds, heavy modules loaded)."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True
+    ).stderr
+    total = 0
+    loaded = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_time, _, module = line[len("import time:"):].split("|")
+        if self_time.strip().isdigit():
+            total += int(self_time)
+            loaded.add(module.strip())
+    return total / 1e6, [module for module in HEAVY_MODULES if module in loaded]
+
+
+def best_import_time(statement, runs):
+    results = [import_time(statement) for _ in range(runs)]
+    return min(seconds for seconds, _ in results), results[0][1]
+
+
+def main(runs=5):
+    statements = [("streamlit", "import streamlit"), ("page registry", "import pages")]
+    statements += [(page, f"import pages.{module}") for page, module in PAGES.items()]
+    for label, statement in statements:
+        seconds, heavy = best_import_time(statement, runs)
+        print(f"{label:15s} {seconds * 1000:6.0f} ms  {', '.join(heavy)}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
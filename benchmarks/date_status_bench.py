@@ -0,0 +1,75 @@
+"""Benchmark the batch date utilities against the original per-row functions.
+
+The legacy functions parse each date with strptime and read the clock on
+every call (up to three times per status). Run from the repository root:
+
+    python -m benchmarks.date_status_bench [count]
+"""
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+from utils.date_utils import due_date_statuses, format_dates, relative_time_strings
+
+
+def legacy_is_due_soon(due_date_str, days=7):
+    due_date = datetime.strptime(due_date_str, "%Y-%m-%d").date()
+    return 0 <= (due_date - datetime.now().date()).days <= days
+
+
+def legacy_is_overdue(due_date_str):
+    return datetime.strptime(due_date_str, "%Y-%m-%d").date() < datetime.now().date()
+
+
+def legacy_status(due_date_str):
+    """The original get_due_date_status."""
+    if legacy_is_overdue(due_date_str):
+        return {"label": "Overdue", "color": "red", "severity": 3}
+    elif legacy_is_due_soon(due_date_str, 3):
+        return {"label": "Due Soon", "color": "orange", "severity": 2}
+    elif legacy_is_due_soon(due_date_str, 7):
+        return {"label": "Upcoming", "color": "green", "severity": 1}
+    return {"label": "Scheduled", "color": "blue", "severity": 0}
+
+
+def legacy_format(date_str):
+    return datetime.strptime(date_str, "%Y-%m-%d").strftime("%b %d, %Y")
+
+
+def make_dates(count, seed=42):
+    """Generate due dates from a year ago to a year ahead."""
+    rng = random.Random(seed)
+    today = date.today()
+    return [(today + timedelta(days=rng.randint(-365, 365))).isoformat() for _ in range(count)]
+
+
+def timed(function, dates):
+    start = time.perf_counter()
+    result = function(dates)
+    return result, time.perf_counter() - start
+
+
+def main(count=100_000):
+    dates = make_dates(count)
+
+    legacy, legacy_status_time = timed(lambda ds: [legacy_status(d) for d in ds], dates)
+    batch, batch_status_time = timed(due_date_statuses, dates)
+    assert legacy == batch
+
+    legacy, legacy_format_time = timed(lambda ds: [legacy_format(d) for d in ds], dates)
+    batch, batch_format_time = timed(format_dates, dates)
+    assert legacy == batch
+
+    _, relative_time = timed(relative_time_strings, dates)
+
+    print(f"dates:                  {count:,}")
+    print(f"legacy statuses:        {legacy_status_time:.3f}s ({count / legacy_status_time:,.0f} dates/s)")
+    print(f"due_date_statuses:      {batch_status_time:.3f}s ({count / batch_status_time:,.0f} dates/s)")
+    print(f"legacy format_date:     {legacy_format_time:.3f}s ({count / legacy_format_time:,.0f} dates/s)")
+    print(f"format_dates:           {batch_format_time:.3f}s ({count / batch_format_time:,.0f} dates/s)")
+    print(f"relative_time_strings:  {relative_time:.3f}s ({count / relative_time:,.0f} dates/s)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
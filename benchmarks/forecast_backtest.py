@@ -0,0 +1,52 @@
+"""Backtest the local forecasting models on synthetic multi-year histories.
+
+Each series has a level, a linear trend, yearly seasonality and noise. The
+last ``horizon`` months are held out and every model is scored by MAPE.
+Run from the repository root:
+
+    python -m benchmarks.forecast_backtest [series] [years]
+"""
+import sys
+import time
+
+import numpy as np
+
+from models.forecasting import MODELS, forecast
+
+
+def make_histories(n_series, n_months, seed=0):
+    """Generate positive monthly spending series with trend and seasonality."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_months)
+    level = rng.uniform(50, 1500, size=(n_series, 1))
+    trend = rng.normal(0, 0.003, size=(n_series, 1)) * level
+    amplitude = rng.uniform(0, 0.25, size=(n_series, 1)) * level
+    phase = rng.uniform(0, 2 * np.pi, size=(n_series, 1))
+    noise = rng.normal(0, 0.05, size=(n_series, n_months)) * level
+    return np.clip(level + trend * t + amplitude * np.sin(2 * np.pi * t / 12 + phase) + noise, 1, None)
+
+
+def mape(actual, predicted):
+    return float(np.mean(np.abs(actual - predicted) / actual) * 100)
+
+
+def main(n_series=10_000, years=4, horizon=3):
+    Y = make_histories(n_series, years * 12 + horizon)
+    train, test = Y[:, :-horizon], Y[:, -horizon:]
+
+    print(f"series: {n_series:,}  history: {train.shape[1]} months  horizon: {horizon}")
+    print(f"{'model':<24}{'MAPE %':>10}{'runtime s':>12}{'coverage %':>12}")
+
+    for name in list(MODELS) + ["auto"]:
+        start = time.perf_counter()
+        mean, lower, upper, _ = forecast(train, horizon, method=name)
+        elapsed = time.perf_counter() - start
+        coverage = float(np.mean((test >= lower) & (test <= upper)) * 100)
+        print(f"{name:<24}{mape(test, mean):>10.2f}{elapsed:>12.3f}{coverage:>12.1f}")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    )
@@ -0,0 +1,55 @@
+"""Compare cold (new GroqService per call) and warm (shared) request latency.
+
+Starts the local Groq stub server so no API quota is used.
+Run from the repository root:
+
+    python -m benchmarks.groq_client_bench [requests]
+"""
+import statistics
+import sys
+import time
+
+from ai.groq_service import GroqService
+from ai.resilience import RateLimiter
+from ai.stub_server import start_stub_server
+
+
+def measure(make_service, count):
+    """Return per-request latencies in milliseconds."""
+    messages = [{"role": "user", "content": "ping"}]
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        service = make_service()
+        service.send_request(messages)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(name, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<6} mean {statistics.mean(latencies):7.2f}ms  "
+          f"p50 {statistics.median(latencies):7.2f}ms  p95 {p95:7.2f}ms")
+
+
+def main(count=200):
+    server, base_url = start_stub_server()
+
+    cold = measure(lambda: GroqService(api_key="bench", base_url=base_url), count)
+
+    shared = GroqService(api_key="bench", base_url=base_url)
+    # Lift the client-side quota so only connection reuse is measured
+    shared.rate_limiter = RateLimiter(1_000_000, 1_000_000_000)
+    shared.send_request([{"role": "user", "content": "warmup"}])
+    warm = measure(lambda: shared, count)
+
+    server.shutdown()
+
+    print(f"requests per mode: {count}")
+    report("cold", cold)
+    report("warm", warm)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,98 @@
+"""Measure near-duplicate SMS detection throughput with SimHash.
+
+Generates bill reminders for many users where about a third are repeats
+("Final reminder: ...", reworded) of an earlier message, then fingerprints
+and dedupes them through a SimHashIndex, reporting throughput and how many
+repeats were caught. Run from the repository root:
+
+    python -m benchmarks.sms_dedupe_bench [messages]
+"""
+import gc
+import random
+import sys
+import time
+
+from ai.simhash import SimHashIndex, simhash
+from ai.sms_parser import extract_amount
+
+MERCHANTS = ["Power Co", "City Water", "FastNet", "Airtel", "HDFC Card", "Netflix", "Gas Corp", "LIC", "Jio", "Spotify"]
+
+TEMPLATES = [
+    "Your {m} bill of Rs {a} for account {acct} is due on {d}. Pay now to avoid a late fee.",
+    "Dear customer, {m} statement amount Rs {a} is due by {d}. Account {acct}.",
+    "{m}: payment of Rs {a} for a/c {acct} is due on {d}. Ignore if already paid.",
+]
+
+REPEATS = [
+    "Reminder: {text}",
+    "Final reminder: {text}",
+    "{text} Please pay now.",
+]
+
+
+def make_messages(count, users=10_000, repeat_rate=0.33, seed=7):
+    """Return (user ID, timestamp, text, original index or None) tuples.
+
+    Messages arrive every 5 seconds on average, so a million of them span
+    about two months and the index's 7-day window keeps expiring entries.
+    """
+    rng = random.Random(seed)
+    messages = []
+    timestamp = 0.0
+    for _ in range(count):
+        timestamp += rng.uniform(0, 10)
+        if messages and rng.random() < repeat_rate:
+            # Repeat a recent message
+            original = rng.randrange(max(0, len(messages) - 50_000), len(messages))
+            user_id, _, text, source = messages[original]
+            source = original if source is None else source
+            messages.append((user_id, timestamp, rng.choice(REPEATS).format(text=messages[source][2]), source))
+            continue
+        text = rng.choice(TEMPLATES).format(
+            m=rng.choice(MERCHANTS),
+            a=f"{rng.randint(100, 9999)}.{rng.randint(0, 99):02d}",
+            acct=rng.randint(10_000, 99_999),
+            d=f"{rng.randint(1, 28)} {rng.choice(['Jan', 'Feb', 'Mar', 'Apr'])}"
+        )
+        messages.append((rng.randint(1, users), timestamp, text, None))
+    return messages
+
+
+def main(count=1_000_000):
+    messages = make_messages(count)
+    repeats = sum(1 for message in messages if message[3] is not None)
+    # Keep the collector from rescanning the generated messages on every pass
+    gc.freeze()
+
+    start = time.perf_counter()
+    fingerprints = [simhash(text) for _, _, text, _ in messages]
+    fingerprint_time = time.perf_counter() - start
+
+    index = SimHashIndex()
+    caught = false_matches = 0
+    start = time.perf_counter()
+    for i, (user_id, timestamp, text, source) in enumerate(messages):
+        amount = extract_amount(text)
+        duplicate = None
+        for _, other in index.query(user_id, fingerprints[i], timestamp):
+            if extract_amount(messages[other][2]) == amount:
+                duplicate = other
+                break
+        if duplicate is not None:
+            if source is not None and (duplicate == source or messages[duplicate][3] == source):
+                caught += 1
+            else:
+                false_matches += 1
+        index.add(user_id, fingerprints[i], timestamp, i)
+    index_time = time.perf_counter() - start
+
+    total = fingerprint_time + index_time
+    print(f"messages: {count:,}  repeats: {repeats:,}  indexed at end: {len(index):,}")
+    print(f"fingerprint   {fingerprint_time:7.2f}s  {count / fingerprint_time:>12,.0f} msg/s")
+    print(f"query + add   {index_time:7.2f}s  {count / index_time:>12,.0f} msg/s")
+    print(f"end to end    {total:7.2f}s  {count / total:>12,.0f} msg/s")
+    print(f"repeats caught: {caught / repeats:.1%}  false matches: {false_matches}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
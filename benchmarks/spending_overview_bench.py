@@ -0,0 +1,132 @@
+"""Benchmark the rollup-backed monthly spending overview against the original loops.
+
+The legacy version builds the month list in a while-loop, runs strptime
+for every bill and adds every subscription into every month. The page now
+reads the storage rollup cube instead, which storage keeps up to date on
+every write; building it from scratch is timed separately. Run from the
+repository root:
+
+    python -m benchmarks.spending_overview_bench [bills] [years]
+"""
+import random
+import sys
+import time
+from datetime import date, datetime
+
+import numpy as np
+
+from models.rollup import build_rollup, summarize
+from pages.analytics import monthly_spending
+from utils.date_utils import add_months
+
+FREQUENCIES = ("monthly", "yearly", "quarterly", "weekly")
+CATEGORIES = ("cat1", "cat2", "cat3", "cat4", "cat5", "cat6")
+
+
+def legacy_monthly_spending(bills, subscriptions, start_date, end_date):
+    """The original show_spending_overview aggregation."""
+    months = []
+    current_date = start_date
+    while current_date <= end_date:
+        months.append(current_date.strftime("%Y-%m"))
+        if current_date.month == 12:
+            current_date = current_date.replace(year=current_date.year + 1, month=1)
+        else:
+            current_date = current_date.replace(month=current_date.month + 1)
+
+    def get_month_key(date_str):
+        return datetime.strptime(date_str, "%Y-%m-%d").strftime("%Y-%m")
+
+    monthly_data = {month: {"bills": 0, "subscriptions": 0} for month in months}
+    for bill in bills:
+        month_key = get_month_key(bill["dueDate"])
+        if month_key in monthly_data:
+            monthly_data[month_key]["bills"] += bill["amount"]
+
+    active_subs = [sub for sub in subscriptions if sub["active"]]
+    for month in months:
+        for sub in active_subs:
+            monthly_amount = sub["amount"]
+            if sub["frequency"] == "yearly":
+                monthly_amount = sub["amount"] / 12
+            elif sub["frequency"] == "quarterly":
+                monthly_amount = sub["amount"] / 3
+            elif sub["frequency"] == "weekly":
+                monthly_amount = sub["amount"] * 4.33
+            monthly_data[month]["subscriptions"] += monthly_amount
+
+    return [
+        {
+            "month": datetime.strptime(month, "%Y-%m").strftime("%b %Y"),
+            "bills": values["bills"],
+            "subscriptions": values["subscriptions"],
+            "total": values["bills"] + values["subscriptions"]
+        }
+        for month, values in monthly_data.items()
+    ]
+
+
+def make_data(bill_count, years, subscription_count=200, seed=42):
+    """Generate bills spread over the range and a set of subscriptions."""
+    rng = random.Random(seed)
+    end_date = date(2026, 10, 1)
+    start_date = add_months(end_date, -12 * years)
+    span = (end_date - start_date).days
+    bills = [
+        {
+            "userId": "user1",
+            "categoryId": rng.choice(CATEGORIES),
+            "dueDate": date.fromordinal(start_date.toordinal() + rng.randint(0, span)).isoformat(),
+            "amount": round(rng.uniform(5, 500), 2),
+            "currency": "USD"
+        }
+        for _ in range(bill_count)
+    ]
+    subscriptions = [
+        {
+            "userId": "user1",
+            "categoryId": rng.choice(CATEGORIES),
+            "amount": round(rng.uniform(1, 100), 2),
+            "currency": "USD",
+            "frequency": rng.choice(FREQUENCIES),
+            "active": rng.random() < 0.8
+        }
+        for _ in range(subscription_count)
+    ]
+    return bills, subscriptions, start_date, end_date
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def rollup_monthly_spending(rollup, start_date, end_date):
+    """The page's query: summarize the user's cells, then fill in the months."""
+    spending = summarize(rollup["user1"], start_date.strftime("%Y-%m"), end_date.strftime("%Y-%m"), "USD")
+    return monthly_spending(spending, start_date, end_date)
+
+
+def main(bill_count=100_000, years=10):
+    bills, subscriptions, start_date, end_date = make_data(bill_count, years)
+
+    legacy, legacy_time = timed(legacy_monthly_spending, bills, subscriptions, start_date, end_date)
+    rollup, build_time = timed(build_rollup, bills, subscriptions)
+    df, rollup_time = timed(rollup_monthly_spending, rollup, start_date, end_date)
+
+    assert [row["month"] for row in legacy] == df["month"].tolist()
+    for column in ("bills", "subscriptions", "total"):
+        assert np.allclose([row[column] for row in legacy], df[column].to_numpy())
+
+    print(f"bills:             {bill_count:,} over {years} years ({len(df)} months)")
+    print(f"legacy loops:      {legacy_time:.3f}s")
+    print(f"rollup build:      {build_time:.3f}s (once, then kept up to date)")
+    print(f"rollup query:      {rollup_time:.3f}s ({legacy_time / rollup_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    )
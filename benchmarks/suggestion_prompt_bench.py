@@ -0,0 +1,72 @@
+"""Compare suggestion prompt size for raw user data and the feature summary.
+
+Also sends each summarized prompt to the offline Groq stub to check that
+suggestions still come back well-formed. Run from the repository root:
+
+    python -m benchmarks.suggestion_prompt_bench
+"""
+import random
+from datetime import datetime, timedelta
+
+from ai.features import prompt_size, summarize_user_data
+from ai.groq_service import GroqService
+from ai.resilience import RateLimiter
+from ai.stub_server import start_stub_server
+
+PAYEES = ["Power Company", "City Water", "Gas Co", "ABC Properties", "SafeDrive Insurance",
+          "FiberNet", "Mobile Co", "Health Plus"]
+SERVICES = [("Netflix", 15.99), ("Spotify", 9.99), ("Gym Membership", 50.0), ("Cloud Storage", 2.99),
+            ("News", 12.0), ("Video Games", 14.99), ("Music Pro", 19.99), ("VPN", 99.0)]
+
+
+def make_user_data(bill_count, seed=7):
+    """Generate a synthetic bill history spread over the last few years."""
+    rng = random.Random(seed)
+    now = datetime.now()
+    bills = []
+    for bill_id in range(1, bill_count + 1):
+        payee = rng.choice(PAYEES)
+        bills.append({
+            "id": bill_id,
+            "title": f"{payee} Bill",
+            "amount": round(rng.uniform(20, 400), 2),
+            "dueDate": (now - timedelta(days=rng.randint(-30, 1000))).strftime("%Y-%m-%d"),
+            "categoryId": rng.randint(1, 10),
+            "userId": 1,
+            "paid": rng.random() < 0.9,
+            "recurring": True,
+            "description": f"Monthly statement from {payee}",
+            "merchantName": payee,
+            "createdAt": now
+        })
+    subscriptions = [{
+        "id": sub_id,
+        "title": title,
+        "amount": amount,
+        "frequency": "yearly" if amount > 50 else "monthly",
+        "categoryId": 9,
+        "userId": 1,
+        "active": True,
+        "lastUsed": now - timedelta(days=rng.randint(0, 90))
+    } for sub_id, (title, amount) in enumerate(SERVICES, start=1)]
+    return {"bills": bills, "subscriptions": subscriptions}
+
+
+def main():
+    server, base_url = start_stub_server()
+    service = GroqService(api_key="bench", base_url=base_url)
+    service.rate_limiter = RateLimiter(1_000_000, 1_000_000_000)
+
+    print(f"{'bills':>8}{'raw tokens':>14}{'summary tokens':>16}{'suggestions':>14}")
+    for bill_count in (10, 100, 1_000, 10_000):
+        user_data = make_user_data(bill_count)
+        raw, compact = prompt_size(user_data, summarize_user_data(user_data))
+        suggestions = service.generate_bill_suggestions(user_data)
+        well_formed = all({"type", "title", "description"} <= set(s) for s in suggestions)
+        print(f"{bill_count:>8}{raw:>14,}{compact:>16,}{len(suggestions):>10}{' ok' if well_formed else ' BAD':>4}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
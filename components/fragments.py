@@ -0,0 +1,20 @@
+from functools import wraps
+
+import streamlit as st
+
+def data_fragment(func, storage, run_every=None):
+    """Wrap a page section in a fragment that refreshes the page when it changes data.
+    
+    Widgets inside the section rerun only the section. When such a rerun
+    writes to storage, the other sections still show the older data
+    version, so the whole app reruns and each section rebuilds from the
+    new one (cheaply, as page data is cached per data version).
+    """
+    @wraps(func)
+    def run(*args, **kwargs):
+        version = storage.get_data_version()
+        func(*args, **kwargs)
+        if storage.get_data_version() != version:
+            st.rerun()
+    
+    return st.fragment(run, run_every=run_every)
@@ -0,0 +1,33 @@
+from functools import partial
+
+import streamlit as st
+
+def selectable_grid(data, ids, key, **kwargs):
+    """Show a multi-row selectable grid and return the IDs of the selected records.
+    
+    Streamlit reports a selection as row positions in the grid the user
+    clicked. They are mapped to IDs as soon as the selection changes, using
+    the IDs that grid was drawn with, so records added, removed or
+    reordered later cannot shift the selection onto other records. ``ids``
+    runs parallel to the rows of ``data``; selected IDs that are no longer
+    in it are dropped.
+    """
+    st.dataframe(
+        data,
+        hide_index=True,
+        use_container_width=True,
+        on_select=partial(remember_selection, key),
+        selection_mode="multi-row",
+        key=key,
+        **kwargs
+    )
+    st.session_state[f"{key}_ids"] = list(ids)
+    
+    current = set(ids)
+    return [record_id for record_id in st.session_state.get(f"{key}_selected", []) if record_id in current]
+
+def remember_selection(key):
+    """Store a grid's selected rows as the IDs of the records shown in them."""
+    ids = st.session_state.get(f"{key}_ids", [])
+    rows = st.session_state[key].selection.rows
+    st.session_state[f"{key}_selected"] = [ids[row] for row in rows if row < len(ids)]
@@ -23,13 +23,15 @@ def render_sidebar():
     if "current_page" not in st.session_state:
         st.session_state.current_page = "Dashboard"
     
-    # Create sidebar navigation
+    # Create sidebar navigation; pages switch in a callback, so the new
+    # page renders in the same run instead of after a second rerun
     for page, icon in pages.items():
-        if st.sidebar.button(f"{icon} {page}", 
-                           key=f"nav_{page}", 
-                           use_container_width=True,
-                           type="primary" if st.session_state.current_page == page else "secondary"):
-            st.session_state.current_page = page
+        st.sidebar.button(f"{icon} {page}", 
+                          key=f"nav_{page}", 
+                          use_container_width=True,
+                          type="primary" if st.session_state.current_page == page else "secondary",
+                          on_click=select_page,
+                          args=(page,))
     
     # Display a version number and other info
     st.sidebar.markdown("---")
@@ -37,3 +39,7 @@ def render_sidebar():
     st.sidebar.caption("Version 1.0.0")
     
     return st.session_state.current_page
+
+def select_page(page):
+    """Switch to a page."""
+    st.session_state.current_page = page
@@ -0,0 +1,63 @@
+import threading
+import time
+
+import streamlit as st
+
+# Seconds to wait after a run before prefetching, so a quick next click
+# does not compete with the prefetch
+PREFETCH_DELAY = 0.5
+
+def lazy_tabs(labels, key):
+    """Show a tab bar and return the selected tab's label.
+    
+    st.tabs runs the body of every tab on each rerun, hidden or not; here
+    only the caller's code for the returned tab runs. The selection is
+    kept in session state under ``key``.
+    """
+    if st.session_state.get(key) not in labels:
+        st.session_state[key] = labels[0]
+    return st.radio("Tab", labels, key=key, horizontal=True, label_visibility="collapsed")
+
+def get_tab_cache(key):
+    """Get the cache shared by a page's tabs and their prefetch thread."""
+    return st.session_state.setdefault(f"{key}_cache", {})
+
+def cached_tab(cache, tab, builder):
+    """Get a tab's built data, building it now unless it is cached.
+    
+    ``builder`` is ``(stamp, build, load)``, where the stamp identifies the
+    inputs (data version, filters, ...) and ``load`` returns the arguments
+    for ``build``; an entry built from other inputs is rebuilt. ``load``
+    only runs on a rebuild, so a cached tab reads no data.
+    """
+    stamp, build, load = builder
+    entry = cache.get(tab)
+    if entry and entry[0] == stamp:
+        return entry[1]
+    value = build(*load())
+    cache[tab] = (stamp, value)
+    return value
+
+def prefetch_tabs(cache, labels, selected, builders):
+    """Build the tabs next to the selected one in a background thread.
+    
+    ``builders`` maps a tab label to its ``(stamp, build, load)``. Loaders
+    run here in the script thread; builders run outside it, so they must
+    only use their arguments and never Streamlit or session state.
+    """
+    index = labels.index(selected)
+    neighbours = [labels[i] for i in (index - 1, index + 1) if 0 <= i < len(labels)]
+    jobs = [
+        (tab, builders[tab][0], builders[tab][1], builders[tab][2]()) for tab in neighbours
+        if tab in builders and (cache.get(tab) or (None,))[0] != builders[tab][0]
+    ]
+    if jobs:
+        threading.Thread(target=_prefetch, args=(cache, jobs), name="tab-prefetch", daemon=True).start()
+
+def _prefetch(cache, jobs):
+    time.sleep(PREFETCH_DELAY)
+    for tab, stamp, build, args in jobs:
+        try:
+            cache[tab] = (stamp, build(*args))
+        except Exception as e:
+            print(f"Error prefetching {tab} tab: {e}")
@@ -1 +1,7 @@
-from .storage import  MemStorage
+def __getattr__(name):
+    # Storage pulls in Streamlit and pandas, so it loads only when it is
+    # asked for, not whenever a models submodule is imported
+    if name == "MemStorage":
+        from .storage import MemStorage
+        return MemStorage
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,171 @@
+"""Local statistical forecasting of monthly bill totals.
+
+Every model works on a 2-D array ``Y`` of shape ``(series, months)`` and
+fits all series at once, so one call covers every category of every user.
+Each model returns ``(mean, sigma)`` arrays of shape ``(series, horizon)``,
+where ``sigma`` is the forecast standard deviation used for intervals.
+"""
+import numpy as np
+
+SEASON_LENGTH = 12
+
+# z-score for a 95% prediction interval
+INTERVAL_Z = 1.96
+
+# Smoothing parameter grids searched per series
+ALPHAS = np.array([0.1, 0.3, 0.5, 0.7, 0.9])
+BETAS = np.array([0.05, 0.2])
+GAMMAS = np.array([0.1, 0.3])
+
+
+def _residual_sigma(errors):
+    """Root mean squared one-step error per series, ignoring NaNs."""
+    with np.errstate(invalid="ignore"):
+        sigma = np.sqrt(np.nanmean(errors ** 2, axis=1))
+    return np.nan_to_num(sigma)
+
+
+def seasonal_naive(Y, horizon, season=SEASON_LENGTH):
+    """Repeat the last observed season (or the last value for short series).
+
+    A single season leaves no seasonal residuals to size the interval, so
+    the seasonal variant needs more than ``season`` months.
+    """
+    n_series, n_months = Y.shape
+    steps = np.arange(horizon)
+
+    if n_months <= season:
+        mean = np.repeat(Y[:, -1:], horizon, axis=1)
+        errors = np.diff(Y, axis=1) if n_months > 1 else np.zeros((n_series, 1))
+        sigma = _residual_sigma(errors)[:, None] * np.sqrt(steps + 1)
+        return mean, sigma
+
+    mean = Y[:, n_months - season + steps % season]
+    errors = Y[:, season:] - Y[:, :-season]
+    sigma = _residual_sigma(errors)[:, None] * np.sqrt(steps // season + 1)
+    return mean, sigma
+
+
+def exponential_smoothing(Y, horizon, alphas=ALPHAS):
+    """Simple exponential smoothing with a per-series grid-searched alpha."""
+    n_series, n_months = Y.shape
+    # Parameter axis first: (params, series)
+    alpha = alphas[:, None]
+    level = np.repeat(Y[None, :, 0], len(alphas), axis=0)
+    sse = np.zeros_like(level)
+
+    for t in range(1, n_months):
+        error = Y[None, :, t] - level
+        sse += error ** 2
+        level = level + alpha * error
+
+    best = np.argmin(sse, axis=0)
+    rows = np.arange(n_series)
+    sigma = np.sqrt(sse[best, rows] / max(n_months - 1, 1))
+    steps = np.arange(horizon)
+
+    mean = np.repeat(level[best, rows][:, None], horizon, axis=1)
+    sigma = sigma[:, None] * np.sqrt(1 + steps * alphas[best][:, None] ** 2)
+    return mean, sigma
+
+
+def holt_winters(Y, horizon, season=SEASON_LENGTH, alphas=ALPHAS, betas=BETAS, gammas=GAMMAS):
+    """Additive Holt-Winters (level, trend, season) with per-series grid search.
+
+    Needs two full seasons of history; shorter series fall back to simple
+    exponential smoothing.
+    """
+    n_series, n_months = Y.shape
+    if n_months < 2 * season:
+        return exponential_smoothing(Y, horizon, alphas)
+
+    grid = np.array(np.meshgrid(alphas, betas, gammas, indexing="ij")).reshape(3, -1)
+    alpha, beta, gamma = (g[:, None] for g in grid)
+    n_params = grid.shape[1]
+
+    # Initialize from the first two seasons
+    first, second = Y[:, :season], Y[:, season:2 * season]
+    level = np.repeat(first.mean(axis=1)[None, :], n_params, axis=0)
+    trend = np.repeat(((second.mean(axis=1) - first.mean(axis=1)) / season)[None, :], n_params, axis=0)
+    seasonal = np.repeat((first - first.mean(axis=1, keepdims=True))[None, :, :], n_params, axis=0)
+    sse = np.zeros((n_params, n_series))
+
+    for t in range(season, n_months):
+        slot = t % season
+        forecast = level + trend + seasonal[:, :, slot]
+        error = Y[None, :, t] - forecast
+        sse += error ** 2
+        new_level = alpha * (Y[None, :, t] - seasonal[:, :, slot]) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        seasonal[:, :, slot] = gamma * (Y[None, :, t] - new_level) + (1 - gamma) * seasonal[:, :, slot]
+        level = new_level
+
+    best = np.argmin(sse, axis=0)
+    rows = np.arange(n_series)
+    steps = np.arange(1, horizon + 1)
+    slots = (n_months + steps - 1) % season
+
+    mean = (level[best, rows][:, None] + steps * trend[best, rows][:, None]
+            + seasonal[best, rows][:, slots])
+    sigma = np.sqrt(sse[best, rows] / (n_months - season))[:, None] * np.sqrt(steps)
+    return mean, sigma
+
+
+MODELS = {
+    "seasonal_naive": seasonal_naive,
+    "exponential_smoothing": exponential_smoothing,
+    "holt_winters": holt_winters,
+}
+
+
+def forecast(Y, horizon, method="auto"):
+    """Forecast every series in ``Y``.
+
+    Returns ``(mean, lower, upper, sigma)`` arrays of shape
+    ``(series, horizon)``; the mean and 95% interval are clipped at zero.
+    With ``method="auto"`` each series uses the model with the smallest
+    one-step residual spread.
+    """
+    Y = np.asarray(Y, dtype=float)
+    if Y.size == 0:
+        empty = np.zeros((Y.shape[0], horizon))
+        return empty, empty, empty, empty
+
+    if method == "auto":
+        results = [model(Y, horizon) for model in MODELS.values()]
+        spreads = np.stack([sigma[:, 0] for _, sigma in results])
+        best = np.argmin(spreads, axis=0)
+        rows = np.arange(Y.shape[0])
+        mean = np.stack([m for m, _ in results])[best, rows]
+        sigma = np.stack([s for _, s in results])[best, rows]
+    else:
+        mean, sigma = MODELS[method](Y, horizon)
+
+    lower = np.clip(mean - INTERVAL_Z * sigma, 0, None)
+    upper = np.clip(mean + INTERVAL_Z * sigma, 0, None)
+    return np.clip(mean, 0, None), lower, upper, sigma
+
+
+def build_monthly_series(bills, end_year, end_month, months):
+    """Aggregate bills into per-(userId, categoryId) monthly totals.
+
+    Returns ``(keys, Y)`` where ``keys[i]`` is the (userId, categoryId) of
+    row ``i`` and ``Y`` covers the ``months`` months ending at end_year/end_month.
+    """
+    if not bills:
+        return [], np.zeros((0, months))
+
+    due = np.array([bill["dueDate"][:7] for bill in bills], dtype="datetime64[M]")
+    end = np.datetime64(f"{end_year:04d}-{end_month:02d}", "M")
+    month_index = (due - end).astype(int) + months - 1
+    in_window = (month_index >= 0) & (month_index < months)
+
+    pairs = [(bill["userId"], bill["categoryId"]) for bill in bills]
+    keys = sorted(set(pairs))
+    key_index = {key: i for i, key in enumerate(keys)}
+    rows = np.array([key_index[pair] for pair in pairs])
+    amounts = np.array([bill["amount"] for bill in bills], dtype=float)
+
+    Y = np.zeros((len(keys), months))
+    np.add.at(Y, (rows[in_window], month_index[in_window]), amounts[in_window])
+    return keys, Y
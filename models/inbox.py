@@ -0,0 +1,366 @@
+"""Watched inbox directory for continuous SMS and email bill ingestion.
+
+A watcher polls a directory for SMS exports (``.jsonl``, ``.json``,
+``.csv``, ``.xml``) and bill emails (``.eml``, ``.mbox``). Files are skipped cheaply
+while their mtime and size match the last checkpoint; growing files are
+read from their stored byte offset, so only new data is parsed.
+
+Extracted messages are appended to a SQLite inbox in the same transaction
+that advances the file's checkpoint, so every message is recorded exactly
+once even if the watcher is killed and restarted. The app later drains the
+inbox through the SMS analysis pipeline. Run the watcher standalone with:
+
+    python -m models.inbox --dir /path/to/inbox
+"""
+import argparse
+import codecs
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from utils.sms_backup import detect_format, iter_json, iter_xml, message_from_email, normalize_message
+
+INBOX_DIR = os.getenv("INBOX_DIR")
+INBOX_DB_PATH = os.getenv("INBOX_DB_PATH", "inbox.sqlite3")
+INBOX_POLL_SECONDS = float(os.getenv("INBOX_POLL_SECONDS", "5"))
+
+# Whole-file formats are only read once they stop changing for this long
+SETTLE_SECONDS = 2.0
+
+# Messages committed per checkpoint transaction
+BATCH_SIZE = 500
+
+# Formats read incrementally from a byte offset; the others are re-read
+# when changed, skipping the messages already taken (offset counts messages)
+BYTE_OFFSET_FORMATS = ("jsonl", "csv", "mbox")
+
+_inbox = None
+_inbox_lock = threading.Lock()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    offset INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT NOT NULL,
+    sender TEXT NOT NULL,
+    content TEXT NOT NULL,
+    receivedAt TEXT NOT NULL,
+    consumed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS messages_pending ON messages (consumed, id);
+"""
+
+
+def get_inbox():
+    """Get the process-wide inbox, watching INBOX_DIR in a thread if it is set."""
+    global _inbox
+    if _inbox is None:
+        with _inbox_lock:
+            if _inbox is None:
+                _inbox = Inbox(directory=INBOX_DIR)
+                if INBOX_DIR:
+                    _inbox.start()
+    return _inbox
+
+
+def file_format(path):
+    """Get the inbox format of a file, or None if it is not ingested."""
+    if path.lower().endswith(".mbox"):
+        return "mbox"
+    return detect_format(os.path.basename(path))
+
+
+def _complete_lines(handle, offset):
+    """Yield ``(line, end offset)`` for each newline-terminated line after offset."""
+    handle.seek(offset)
+    for line in handle:
+        if not line.endswith(b"\n"):
+            # Still being written
+            return
+        offset += len(line)
+        yield line, offset
+
+
+def read_jsonl(path, offset, settled):
+    with open(path, "rb") as handle:
+        for line, end in _complete_lines(handle, offset):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield (normalize_message(record) if isinstance(record, dict) else None), end
+
+
+def read_csv(path, offset, settled):
+    """Yield a message per CSV record; quoted fields may span lines."""
+    with open(path, "rb") as handle:
+        header = handle.readline()
+        offset = max(offset, len(header))
+        fields = next(csv.reader([codecs.decode(header, "utf-8-sig")]), [])
+        position = {"end": offset, "exhausted": False}
+
+        def lines():
+            for line, end in _complete_lines(handle, offset):
+                position["end"] = end
+                yield line.decode("utf-8", errors="replace")
+            position["exhausted"] = True
+
+        # The reader only asks for another line mid-record, so a row that
+        # comes back after the lines ran out is cut off inside a quoted field
+        for row in csv.reader(lines()):
+            if position["exhausted"]:
+                return
+            yield normalize_message(dict(zip(fields, row))), position["end"]
+
+
+def read_mbox(path, offset, settled):
+    """Yield messages separated by "From " lines; the last one once settled.
+
+    Each message comes with the offset where it ends, which is where the next
+    "From " line starts.
+    """
+    with open(path, "rb") as handle:
+        lines = []
+        end = offset
+        for line, end in _complete_lines(handle, offset):
+            if line.startswith(b"From ") and lines:
+                yield message_from_email(b"".join(lines[1:])), end - len(line)
+                lines = []
+            lines.append(line)
+        if lines and settled:
+            yield message_from_email(b"".join(lines[1:])), end
+
+
+def read_eml(path, offset, settled):
+    if settled and offset == 0:
+        with open(path, "rb") as handle:
+            yield message_from_email(handle.read()), 1
+
+
+def read_xml(path, offset, settled):
+    if not settled:
+        return
+    with open(path, "rb") as handle:
+        for count, message in enumerate(iter_xml(handle), 1):
+            if count > offset:
+                yield message, count
+
+
+def read_json(path, offset, settled):
+    if not settled:
+        return
+    with open(path, "rb") as handle:
+        for count, message in enumerate(iter_json(handle), 1):
+            if count > offset:
+                yield message, count
+
+
+READERS = {
+    "jsonl": read_jsonl,
+    "csv": read_csv,
+    "mbox": read_mbox,
+    "eml": read_eml,
+    "xml": read_xml,
+    "json": read_json,
+}
+
+
+class Inbox:
+    """Checkpointed ingestion from a watched directory into a message inbox."""
+
+    def __init__(self, directory=None, path=None, poll_seconds=None):
+        """Open (or create) the inbox database."""
+        self.directory = directory
+        self.poll_seconds = poll_seconds or INBOX_POLL_SECONDS
+        self.connection = sqlite3.connect(path or INBOX_DB_PATH, check_same_thread=False, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stopping = threading.Event()
+        with self.lock:
+            self.connection.executescript(SCHEMA)
+
+    # Watching
+
+    def start(self):
+        """Poll the directory in a background thread."""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="inbox-watcher", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def run(self):
+        """Poll until stopped."""
+        while not self.stopping.is_set():
+            try:
+                self.poll()
+            except OSError as e:
+                print(f"Error polling inbox directory: {e}")
+            self.stopping.wait(self.poll_seconds)
+
+    def poll(self):
+        """Ingest new data from every changed file; returns messages added."""
+        added = 0
+        checkpoints = self._checkpoints()
+        now = time.time()
+        for entry in sorted(os.scandir(self.directory), key=lambda e: e.name):
+            backup_format = file_format(entry.name)
+            if not entry.is_file() or not backup_format:
+                continue
+            stat = entry.stat()
+            checkpoint = checkpoints.get(entry.path)
+            if checkpoint and checkpoint["mtime"] == stat.st_mtime and checkpoint["size"] == stat.st_size:
+                continue
+            added += self._ingest(entry.path, backup_format, stat, now - stat.st_mtime >= SETTLE_SECONDS)
+        return added
+
+    def _checkpoints(self):
+        with self.lock:
+            rows = self.connection.execute("SELECT * FROM files").fetchall()
+        return {row["path"]: dict(row) for row in rows}
+
+    def _ingest(self, path, backup_format, stat, settled):
+        """Read a file from its checkpoint, committing messages and offset together."""
+        with self.lock:
+            row = self.connection.execute("SELECT offset FROM files WHERE path = ?", (path,)).fetchone()
+        stored = row["offset"] if row else None
+        offset = stored or 0
+        if backup_format in BYTE_OFFSET_FORMATS and stat.st_size < offset:
+            # Truncated or replaced: start over
+            offset = 0
+
+        added = 0
+        batch = []
+        for message, end in READERS[backup_format](path, offset, settled):
+            if message:
+                batch.append(message)
+            offset = end
+            if len(batch) >= BATCH_SIZE:
+                if not self._commit(path, batch, stored, offset, None):
+                    return added
+                added += len(batch)
+                stored = offset
+                batch = []
+
+        # Only record the mtime once everything available has been read, so
+        # an unsettled file is looked at again on the next poll
+        complete = settled or backup_format in ("jsonl", "csv")
+        if self._commit(path, batch, stored, offset, stat if complete else None):
+            added += len(batch)
+        return added
+
+    def _commit(self, path, messages, expected, offset, stat):
+        """Insert messages and move the checkpoint from ``expected`` to ``offset``.
+
+        Returns False without writing anything if another watcher moved the
+        checkpoint first.
+        """
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.connection.execute("SELECT offset FROM files WHERE path = ?", (path,)).fetchone()
+                if (row["offset"] if row else None) != expected:
+                    self.connection.execute("ROLLBACK")
+                    return False
+                self.connection.executemany(
+                    "INSERT INTO messages (source, sender, content, receivedAt) VALUES (?, ?, ?, ?)",
+                    [(path, m["sender"], m["content"], m["receivedAt"].isoformat()) for m in messages]
+                )
+                self.connection.execute(
+                    "INSERT INTO files (path, mtime, size, offset) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(path) DO UPDATE SET mtime = excluded.mtime, size = excluded.size, offset = excluded.offset",
+                    (path, stat.st_mtime if stat else -1, stat.st_size if stat else -1, offset)
+                )
+                self.connection.execute("COMMIT")
+            except sqlite3.Error:
+                self.connection.execute("ROLLBACK")
+                raise
+        return True
+
+    # Draining
+
+    def take(self, limit=BATCH_SIZE):
+        """Get up to ``limit`` unconsumed messages, oldest first."""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT * FROM messages WHERE consumed = 0 ORDER BY id LIMIT ?", (limit,)
+            ).fetchall()
+        return [
+            {
+                "inboxId": row["id"],
+                "sender": row["sender"],
+                "content": row["content"],
+                "receivedAt": datetime.fromisoformat(row["receivedAt"])
+            }
+            for row in rows
+        ]
+
+    def mark_consumed(self, inbox_ids):
+        """Mark messages as handed to the pipeline."""
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            self.connection.executemany("UPDATE messages SET consumed = 1 WHERE id = ?", [(i,) for i in inbox_ids])
+            self.connection.execute("COMMIT")
+
+    def get_backlog(self):
+        """Get unconsumed messages plus files and bytes not yet ingested."""
+        with self.lock:
+            messages = self.connection.execute("SELECT COUNT(*) FROM messages WHERE consumed = 0").fetchone()[0]
+        backlog = {"messages": messages, "files": 0, "bytes": 0}
+        if not self.directory or not os.path.isdir(self.directory):
+            return backlog
+
+        checkpoints = self._checkpoints()
+        for entry in os.scandir(self.directory):
+            backup_format = file_format(entry.name)
+            if not entry.is_file() or not backup_format:
+                continue
+            stat = entry.stat()
+            checkpoint = checkpoints.get(entry.path)
+            if checkpoint and checkpoint["mtime"] == stat.st_mtime and checkpoint["size"] == stat.st_size:
+                continue
+            backlog["files"] += 1
+            if checkpoint and backup_format in BYTE_OFFSET_FORMATS and stat.st_size >= checkpoint["offset"]:
+                backlog["bytes"] += stat.st_size - checkpoint["offset"]
+            else:
+                backlog["bytes"] += stat.st_size
+        return backlog
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a directory for SMS exports and bill emails")
+    parser.add_argument("--dir", default=INBOX_DIR, required=INBOX_DIR is None)
+    parser.add_argument("--db", default=INBOX_DB_PATH)
+    parser.add_argument("--interval", type=float, default=INBOX_POLL_SECONDS)
+    args = parser.parse_args()
+
+    inbox = Inbox(directory=args.dir, path=args.db, poll_seconds=args.interval)
+    print(f"Watching {args.dir} every {args.interval:g}s")
+    try:
+        while True:
+            added = inbox.poll()
+            backlog = inbox.get_backlog()
+            if added:
+                print(f"Ingested {added} messages; backlog: {backlog['messages']} messages, "
+                      f"{backlog['files']} files ({backlog['bytes']:,} bytes)")
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
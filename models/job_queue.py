@@ -0,0 +1,212 @@
+"""Persistent background job queue with a bounded worker pool.
+
+Jobs are stored in SQLite so queued work survives app restarts, and run on
+a small pool of worker threads so slow work (LLM calls) never blocks a
+Streamlit script run. Workers only compute results; the session that
+submitted a job applies the result to its storage when it polls, since
+session state must not be touched from other threads.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", "jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_DEPTH = int(os.getenv("JOB_QUEUE_DEPTH", "1000"))
+
+# Finished jobs are deleted this long after their results were applied
+JOB_RETENTION_SECONDS = 7 * 24 * 3600
+
+STATUSES = ("queued", "running", "done", "failed")
+
+_queue = None
+_queue_lock = threading.Lock()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    owner TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    result TEXT,
+    error TEXT,
+    applied INTEGER NOT NULL DEFAULT 0,
+    createdAt REAL NOT NULL,
+    updatedAt REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+CREATE INDEX IF NOT EXISTS jobs_owner ON jobs (owner, applied);
+"""
+
+
+def get_job_queue():
+    """Get the process-wide job queue, starting its workers on first use."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                from ai.groq_service import get_groq_service
+
+                def analyze_sms(payload):
+                    return get_groq_service().analyze_sms_content(payload["sender"], payload["content"])
+
+                _queue = JobQueue(handlers={"analyze_sms": analyze_sms})
+                _queue.start()
+    return _queue
+
+
+class JobQueue:
+    """SQLite-backed job queue served by a pool of worker threads."""
+
+    def __init__(self, path=None, handlers=None, workers=None, max_depth=None):
+        """Open (or create) the job database."""
+        self.handlers = handlers or {}
+        self.workers = workers or JOB_WORKERS
+        self.max_depth = max_depth or JOB_QUEUE_DEPTH
+        self.connection = sqlite3.connect(path or JOB_DB_PATH, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.threads = []
+        self.stopping = False
+
+        with self.lock, self.connection:
+            self.connection.executescript(SCHEMA)
+            # Jobs interrupted by a restart run again
+            self.connection.execute(
+                "UPDATE jobs SET status = 'queued', updatedAt = ? WHERE status = 'running'", (time.time(),)
+            )
+            self.connection.execute(
+                "DELETE FROM jobs WHERE applied = 1 AND updatedAt < ?", (time.time() - JOB_RETENTION_SECONDS,)
+            )
+
+    def start(self):
+        """Start the worker threads."""
+        for i in range(self.workers - len(self.threads)):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self):
+        """Stop the workers after their current job."""
+        with self.lock:
+            self.stopping = True
+            self.wakeup.notify_all()
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    def submit(self, kind, payload, owner):
+        """Queue a job and return its ID, or None when the queue is full."""
+        now = time.time()
+        with self.lock:
+            pending = self.connection.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchone()[0]
+            if pending >= self.max_depth:
+                print(f"Job queue is full ({pending} pending jobs)")
+                return None
+
+            with self.connection:
+                cursor = self.connection.execute(
+                    "INSERT INTO jobs (owner, kind, payload, createdAt, updatedAt) VALUES (?, ?, ?, ?, ?)",
+                    (owner, kind, json.dumps(payload, default=str), now, now)
+                )
+            self.wakeup.notify()
+            return cursor.lastrowid
+
+    def get_job(self, job_id):
+        """Get a job by ID."""
+        with self.lock:
+            row = self.connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row) if row else None
+
+    def get_jobs(self, owner, statuses=STATUSES, unapplied_only=False):
+        """Get an owner's jobs with the given statuses, oldest first."""
+        query = f"SELECT * FROM jobs WHERE owner = ? AND status IN ({', '.join('?' * len(statuses))})"
+        if unapplied_only:
+            query += " AND applied = 0"
+        with self.lock:
+            rows = self.connection.execute(query + " ORDER BY id", (owner, *statuses)).fetchall()
+        return [self._job(row) for row in rows]
+
+    def get_jobs_by_ids(self, job_ids):
+        """Get jobs by ID in one query, as a dict of ID to job."""
+        job_ids = [job_id for job_id in set(job_ids) if job_id is not None]
+        if not job_ids:
+            return {}
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT * FROM jobs WHERE id IN ({', '.join('?' * len(job_ids))})", job_ids
+            ).fetchall()
+        return {row["id"]: self._job(row) for row in rows}
+
+    def get_counts(self, owner):
+        """Count an owner's not yet applied jobs per status."""
+        counts = dict.fromkeys(STATUSES, 0)
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE owner = ? AND applied = 0 GROUP BY status", (owner,)
+            ).fetchall()
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def mark_applied(self, job_id):
+        """Record that a finished job's result was written to storage."""
+        with self.lock, self.connection:
+            self.connection.execute(
+                "UPDATE jobs SET applied = 1, updatedAt = ? WHERE id = ?", (time.time(), job_id)
+            )
+
+    def _job(self, row):
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        job["applied"] = bool(job["applied"])
+        return job
+
+    def _claim(self):
+        """Mark the oldest queued job as running and return it (lock held)."""
+        row = self.connection.execute(
+            "SELECT * FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+        ).fetchone()
+        if row is None:
+            return None
+        with self.connection:
+            self.connection.execute(
+                "UPDATE jobs SET status = 'running', updatedAt = ? WHERE id = ?", (time.time(), row["id"])
+            )
+        return self._job(row)
+
+    def _finish(self, job_id, status, result=None, error=None):
+        with self.lock, self.connection:
+            self.connection.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updatedAt = ? WHERE id = ?",
+                (status, json.dumps(result, default=str), error, time.time(), job_id)
+            )
+
+    def _work(self):
+        while True:
+            with self.lock:
+                job = self._claim()
+                while job is None and not self.stopping:
+                    self.wakeup.wait(timeout=1)
+                    job = self._claim()
+                if self.stopping:
+                    if job:
+                        # Leave it for the next start
+                        with self.connection:
+                            self.connection.execute("UPDATE jobs SET status = 'queued' WHERE id = ?", (job["id"],))
+                    return
+
+            handler = self.handlers.get(job["kind"])
+            try:
+                if handler is None:
+                    raise ValueError(f"No handler for job kind {job['kind']!r}")
+                self._finish(job["id"], "done", result=handler(job["payload"]))
+            except Exception as e:
+                print(f"Job {job['id']} failed: {e}")
+                self._finish(job["id"], "failed", error=str(e))
@@ -0,0 +1,94 @@
+"""Rollup cube of spending per (user, month, category, kind).
+
+Storage keeps one set of cells per user, mapping ``(month, categoryId,
+kind)`` to ``[amount, count]`` and updated by every bill and subscription
+mutation:
+
+- kind "bill": bills due in ``month`` ("YYYY-MM")
+- kind "subscription": active subscriptions at their monthly cost; they
+  cost the same every month, so ``month`` is None
+
+Amounts are kept in BASE_CURRENCY (bills at the rate on their due date,
+subscriptions at the latest rate) and converted back per month when
+queried. That is exact while rates only change on the first of a month,
+as in the bundled rate table. A date range then costs O(months x
+categories), however many bills there are.
+"""
+from utils.currency import BASE_CURRENCY, DEFAULT_CURRENCY, conversion_factor
+from utils.date_utils import to_monthly_amount
+
+# Relative difference the consistency check accepts from running sums
+TOLERANCE = 1e-9
+
+
+def rollup_cell(record, kind):
+    """Get the cell a bill or subscription counts in and its base amount.
+
+    Returns None for records outside the cube (inactive subscriptions).
+    """
+    currency = record.get("currency") or DEFAULT_CURRENCY
+    if kind == "bill":
+        due = str(record["dueDate"])[:10]
+        return (due[:7], record["categoryId"], kind), record["amount"] * conversion_factor(currency, BASE_CURRENCY, due)
+    if not record.get("active"):
+        return None
+    amount = to_monthly_amount(record["amount"], record.get("frequency"))
+    return (None, record["categoryId"], kind), amount * conversion_factor(currency, BASE_CURRENCY)
+
+
+def add_to_rollup(rollup, record, kind, sign=1):
+    """Add a record to the cube, or remove it with ``sign=-1``."""
+    entry = rollup_cell(record, kind)
+    if entry is None:
+        return
+    cell, amount = entry
+    cells = rollup.setdefault(record["userId"], {})
+    totals = cells.setdefault(cell, [0.0, 0])
+    totals[0] += sign * amount
+    totals[1] += sign
+    if totals[1] <= 0:
+        # Also drops what rounding left of the sum
+        del cells[cell]
+
+
+def build_rollup(bills, subscriptions):
+    """Build the cube from scratch."""
+    rollup = {}
+    for bill in bills:
+        add_to_rollup(rollup, bill, "bill")
+    for subscription in subscriptions:
+        add_to_rollup(rollup, subscription, "subscription")
+    return rollup
+
+
+def compare_rollups(rollup, expected):
+    """List ``(userId, cell, found, expected)`` for every cell that differs."""
+    mismatches = []
+    for user_id in set(rollup) | set(expected):
+        cells = rollup.get(user_id, {})
+        expected_cells = expected.get(user_id, {})
+        for cell in set(cells) | set(expected_cells):
+            found = cells.get(cell, [0.0, 0])
+            wanted = expected_cells.get(cell, [0.0, 0])
+            if found[1] != wanted[1] or abs(found[0] - wanted[0]) > TOLERANCE * max(abs(wanted[0]), 1):
+                mismatches.append((user_id, cell, tuple(found), tuple(wanted)))
+    return mismatches
+
+
+def summarize(cells, start_month, end_month, currency):
+    """Sum one user's cells for bills due from start_month to end_month ("YYYY-MM").
+
+    Returns bill totals by month and by category, the monthly subscription
+    cost by category and the number of active subscriptions, in ``currency``.
+    """
+    summary = {"months": {}, "categories": {}, "subscriptions": {}, "subscriptionCount": 0}
+    for (month, category_id, kind), (amount, count) in cells.items():
+        if kind == "subscription":
+            amount *= conversion_factor(BASE_CURRENCY, currency)
+            summary["subscriptions"][category_id] = summary["subscriptions"].get(category_id, 0) + amount
+            summary["subscriptionCount"] += count
+        elif start_month <= month <= end_month:
+            amount *= conversion_factor(BASE_CURRENCY, currency, f"{month}-01")
+            summary["months"][month] = summary["months"].get(month, 0) + amount
+            summary["categories"][category_id] = summary["categories"].get(category_id, 0) + amount
+    return summary
@@ -1,26 +1,93 @@
+import bisect
 import datetime
+import re
 import streamlit as st
+from collections import deque
 from datetime import timedelta
-import pandas as pd
 
-# Create a global singleton storage instance
-if 'bills' not in st.session_state:
-    st.session_state.bills = {}
-    st.session_state.subscriptions = {}
-    st.session_state.categories = {}
-    st.session_state.users = {}
-    st.session_state.reminders = {}
-    st.session_state.sms_messages = {}
-    st.session_state.suggestions = {}
-    st.session_state.bill_counter = 0
-    st.session_state.subscription_counter = 0
-    st.session_state.initialized = False
+from models.forecasting import build_monthly_series, forecast as forecast_series, INTERVAL_Z
+from models.rollup import add_to_rollup, build_rollup, compare_rollups, summarize
+from ai.simhash import SimHashIndex, simhash
+from ai.sms_parser import extract_amount
+from utils.date_utils import to_monthly_amount, parse_date, render_now, render_today, set_render_clock
+from utils.currency import DEFAULT_CURRENCY, convert_amounts, convert_records
+
+# Number of recent changes kept for incremental consumers
+CHANGE_LOG_SIZE = 1000
+
+# Months of bill history used for forecasting
+FORECAST_HISTORY_MONTHS = 36
+
+# Forecast bucket for each category ID (anything else is "other")
+FORECAST_BUCKETS = {2: "utilities", 9: "subscriptions"}
+
+# Repeats of an SMS within this window link to the first message's bill
+SMS_DUPLICATE_WINDOW = timedelta(days=7)
+SMS_DUPLICATE_DISTANCE = 5
+
+def bill_key(bill):
+    """Normalized (userId, merchant, amount, dueDate) key identifying a bill.
+    
+    The same bill seen twice (e.g. an SMS analyzed again) gets the same key
+    even if the merchant's case, spacing or punctuation differs.
+    """
+    merchant = bill.get("merchantName") or bill.get("title") or ""
+    merchant = " ".join(re.sub(r"[^a-z0-9]+", " ", merchant.lower()).split())
+    amount = round(float(bill.get("amount") or 0), 2)
+    return (bill.get("userId"), merchant, amount, str(bill.get("dueDate"))[:10])
+
+def init_session_state():
+    """Create the session's collections and indexes on its first run."""
+    # Collections
+    if 'bills' not in st.session_state:
+        st.session_state.bills = {}
+        st.session_state.subscriptions = {}
+        st.session_state.categories = {}
+        st.session_state.users = {}
+        st.session_state.reminders = {}
+        st.session_state.sms_messages = {}
+        st.session_state.suggestions = {}
+        st.session_state.bill_counter = 0
+        st.session_state.subscription_counter = 0
+        st.session_state.initialized = False
+    
+    # Data version and change log, so derived data can be updated incrementally
+    if 'data_version' not in st.session_state:
+        st.session_state.data_version = 0
+        st.session_state.change_log = deque(maxlen=CHANGE_LOG_SIZE)
+    
+    # SimHash index of recent SMS for near-duplicate detection
+    if 'sms_index' not in st.session_state:
+        st.session_state.sms_index = SimHashIndex(
+            max_distance=SMS_DUPLICATE_DISTANCE,
+            window=SMS_DUPLICATE_WINDOW.total_seconds()
+        )
+    
+    # Unique index of bill keys to bill IDs
+    if 'bill_keys' not in st.session_state:
+        st.session_state.bill_keys = {bill_key(bill): bill_id for bill_id, bill in st.session_state.bills.items()}
+    
+    # Spending rollup cube per (userId, month, categoryId, kind), kept up to date by the mutators
+    if 'rollup' not in st.session_state:
+        st.session_state.rollup = build_rollup(st.session_state.bills.values(), st.session_state.subscriptions.values())
+    
+    # Per-user (receivedAt, id) lists kept in time order for paged SMS history
+    if 'sms_timeline' not in st.session_state:
+        st.session_state.sms_timeline = {}
+        for sms in st.session_state.sms_messages.values():
+            bisect.insort(st.session_state.sms_timeline.setdefault(sms["userId"], []), (sms["receivedAt"], sms["id"]))
 
 class MemStorage:
     """In-memory storage for bills, subscriptions, and other data."""
     
     def __init__(self):
         """Initialize the storage with empty collections."""
+        init_session_state()
+        
+        # Pages create their storage once at the start of each run, so this
+        # fixes "now" for everything the run renders
+        set_render_clock()
+        
         # Initialize if not already done
         if not st.session_state.initialized:
             self.initialize_default_categories()
@@ -31,7 +98,7 @@ class MemStorage:
                 "username": "demo",
                 "email": "demo@example.com",
                 "name": "Demo User",
-                "createdAt": datetime.datetime.now(),
+                "createdAt": render_now(),
                 "settings": {
                     "notifications": {
                         "email": True,
@@ -45,6 +112,7 @@ class MemStorage:
             
             # Initialize demo data
             self.initialize_demo_data()
+            st.session_state.rollup = build_rollup(st.session_state.bills.values(), st.session_state.subscriptions.values())
             st.session_state.initialized = True
     
     def initialize_default_categories(self):
@@ -73,13 +141,14 @@ class MemStorage:
                 "id": 1,
                 "title": "Rent",
                 "amount": 1200.00,
-                "dueDate": (datetime.datetime.now() + timedelta(days=5)).strftime("%Y-%m-%d"),
+                "currency": "USD",
+                "dueDate": (render_now() + timedelta(days=5)).strftime("%Y-%m-%d"),
                 "categoryId": 1,
                 "userId": 1,
                 "paid": False,
                 "recurring": True,
                 "description": "Monthly apartment rent",
-                "createdAt": datetime.datetime.now() - timedelta(days=25),
+                "createdAt": render_now() - timedelta(days=25),
                 "merchantName": "ABC Properties",
                 "autoPay": False,
                 "detectedFromSms": False
@@ -88,13 +157,14 @@ class MemStorage:
                 "id": 2,
                 "title": "Electricity Bill",
                 "amount": 87.50,
-                "dueDate": (datetime.datetime.now() + timedelta(days=10)).strftime("%Y-%m-%d"),
+                "currency": "USD",
+                "dueDate": (render_now() + timedelta(days=10)).strftime("%Y-%m-%d"),
                 "categoryId": 2,
                 "userId": 1,
                 "paid": False,
                 "recurring": True,
                 "description": "Monthly electricity utility bill",
-                "createdAt": datetime.datetime.now() - timedelta(days=5),
+                "createdAt": render_now() - timedelta(days=5),
                 "merchantName": "Power Company",
                 "autoPay": True,
                 "detectedFromSms": True
@@ -103,13 +173,14 @@ class MemStorage:
                 "id": 3,
                 "title": "Car Insurance",
                 "amount": 150.00,
-                "dueDate": (datetime.datetime.now() - timedelta(days=2)).strftime("%Y-%m-%d"),
+                "currency": "USD",
+                "dueDate": (render_now() - timedelta(days=2)).strftime("%Y-%m-%d"),
                 "categoryId": 8,
                 "userId": 1,
                 "paid": False,
                 "recurring": True,
                 "description": "Quarterly car insurance premium",
-                "createdAt": datetime.datetime.now() - timedelta(days=20),
+                "createdAt": render_now() - timedelta(days=20),
                 "merchantName": "SafeDrive Insurance",
                 "autoPay": False,
                 "detectedFromSms": False
@@ -118,6 +189,7 @@ class MemStorage:
         
         for bill in bills:
             st.session_state.bills[bill["id"]] = bill
+            self._index_bill(bill)
         
         st.session_state.bill_counter = 3
         
@@ -127,46 +199,49 @@ class MemStorage:
                 "id": 1,
                 "title": "Netflix",
                 "amount": 15.99,
-                "renewalDate": (datetime.datetime.now() + timedelta(days=12)).strftime("%Y-%m-%d"),
+                "currency": "USD",
+                "renewalDate": (render_now() + timedelta(days=12)).strftime("%Y-%m-%d"),
                 "frequency": "monthly",
                 "categoryId": 9,
                 "userId": 1,
                 "active": True,
                 "description": "Standard HD streaming plan",
-                "createdAt": datetime.datetime.now() - timedelta(days=60),
+                "createdAt": render_now() - timedelta(days=60),
                 "merchantName": "Netflix",
                 "autoPay": True,
-                "lastUsed": datetime.datetime.now() - timedelta(days=2)
+                "lastUsed": render_now() - timedelta(days=2)
             },
             {
                 "id": 2,
                 "title": "Spotify",
                 "amount": 9.99,
-                "renewalDate": (datetime.datetime.now() + timedelta(days=20)).strftime("%Y-%m-%d"),
+                "currency": "USD",
+                "renewalDate": (render_now() + timedelta(days=20)).strftime("%Y-%m-%d"),
                 "frequency": "monthly",
                 "categoryId": 9,
                 "userId": 1,
                 "active": True,
                 "description": "Premium music subscription",
-                "createdAt": datetime.datetime.now() - timedelta(days=90),
+                "createdAt": render_now() - timedelta(days=90),
                 "merchantName": "Spotify",
                 "autoPay": True,
-                "lastUsed": datetime.datetime.now() - timedelta(days=1)
+                "lastUsed": render_now() - timedelta(days=1)
             },
             {
                 "id": 3,
                 "title": "Gym Membership",
                 "amount": 50.00,
-                "renewalDate": (datetime.datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d"),
+                "currency": "USD",
+                "renewalDate": (render_now() + timedelta(days=7)).strftime("%Y-%m-%d"),
                 "frequency": "monthly",
                 "categoryId": 5,
                 "userId": 1,
                 "active": True,
                 "description": "Monthly gym membership",
-                "createdAt": datetime.datetime.now() - timedelta(days=120),
+                "createdAt": render_now() - timedelta(days=120),
                 "merchantName": "FitLife Gym",
                 "autoPay": False,
-                "lastUsed": datetime.datetime.now() - timedelta(days=30)
+                "lastUsed": render_now() - timedelta(days=30)
             }
         ]
         
@@ -183,7 +258,7 @@ class MemStorage:
                 "title": "Cancel unused subscription",
                 "description": "You haven't used your gym membership in the last 30 days. Consider cancelling to save $50/month.",
                 "userId": 1,
-                "createdAt": datetime.datetime.now() - timedelta(days=1),
+                "createdAt": render_now() - timedelta(days=1),
                 "dismissed": False,
                 "icon": "💡",
                 "subscriptionId": 3,
@@ -196,7 +271,7 @@ class MemStorage:
                 "title": "Overdue bill",
                 "description": "Your car insurance payment is overdue by 2 days.",
                 "userId": 1,
-                "createdAt": datetime.datetime.now(),
+                "createdAt": render_now(),
                 "dismissed": False,
                 "icon": "⚠️",
                 "subscriptionId": None,
@@ -216,8 +291,8 @@ class MemStorage:
                 "userId": 1,
                 "billId": 1,
                 "subscriptionId": None,
-                "reminderDate": datetime.datetime.now() + timedelta(days=2),
-                "createdAt": datetime.datetime.now() - timedelta(days=3),
+                "reminderDate": render_now() + timedelta(days=2),
+                "createdAt": render_now() - timedelta(days=3),
                 "sent": False,
                 "dismissed": False,
                 "priority": "high"
@@ -227,10 +302,46 @@ class MemStorage:
         for reminder in reminders:
             st.session_state.reminders[reminder["id"]] = reminder
     
+    def record_change(self, kind, record_id):
+        """Bump the data version and log which record changed."""
+        st.session_state.data_version += 1
+        st.session_state.change_log.append((st.session_state.data_version, kind, record_id))
+    
+    def get_data_version(self):
+        """Get the current data version."""
+        return st.session_state.data_version
+    
+    def get_changes_since(self, version):
+        """Get (version, kind, id) changes after a version.
+        
+        Returns None when the log no longer reaches back that far, in which
+        case the caller should rebuild from scratch.
+        """
+        log = st.session_state.change_log
+        if version >= st.session_state.data_version:
+            return []
+        if not log or log[0][0] > version + 1:
+            return None
+        return [change for change in log if change[0] > version]
+    
     def get_user(self, user_id):
         """Get a user by ID."""
         return st.session_state.users.get(user_id)
     
+    def update_user_settings(self, user_id, updates):
+        """Update a user's settings."""
+        user = self.get_user(user_id)
+        if user:
+            user["settings"].update(updates)
+            self.record_change("user", user_id)
+            return user
+        return None
+    
+    def get_display_currency(self, user_id):
+        """Get the currency a user's totals are shown in."""
+        user = self.get_user(user_id)
+        return (user and user["settings"].get("currency")) or DEFAULT_CURRENCY
+    
     def get_bills(self, user_id):
         """Get all bills for a user."""
         return [bill for bill in st.session_state.bills.values() if bill["userId"] == user_id]
@@ -239,14 +350,19 @@ class MemStorage:
         """Get a bill by ID."""
         return st.session_state.bills.get(bill_id)
     
+    def get_bills_by_ids(self, bill_ids):
+        """Get bills by ID in one call, as a dict of ID to bill."""
+        bills = st.session_state.bills
+        return {bill_id: bills[bill_id] for bill_id in set(bill_ids) if bill_id in bills}
+    
     def get_upcoming_bills(self, user_id, days=7):
         """Get upcoming bills for a user within the specified days."""
-        today = datetime.datetime.now().date()
+        today = render_today()
         target_date = today + timedelta(days=days)
         
         upcoming = []
         for bill in self.get_bills(user_id):
-            due_date = datetime.datetime.strptime(bill["dueDate"], "%Y-%m-%d").date()
+            due_date = parse_date(bill["dueDate"])
             if today <= due_date <= target_date and not bill["paid"]:
                 upcoming.append(bill)
         
@@ -254,40 +370,101 @@ class MemStorage:
     
     def create_bill(self, bill_data):
         """Create a new bill."""
-        # Debug
-        st.write(f"Creating bill with data in storage: {bill_data}")
-        
+        return self._insert_bill(bill_data)
+    
+    def _insert_bill(self, bill_data):
         st.session_state.bill_counter += 1
         bill_id = st.session_state.bill_counter
         bill_data["id"] = bill_id
-        bill_data["createdAt"] = datetime.datetime.now()
-        
-        # Debug
-        st.write(f"Assigned bill ID: {bill_id}")
+        bill_data["createdAt"] = render_now()
+        # Amounts without a currency are in the user's own currency
+        bill_data["currency"] = bill_data.get("currency") or self.get_display_currency(bill_data.get("userId"))
         
         # Store in session state
         st.session_state.bills[bill_id] = bill_data
-        
-        # Debug
-        st.write(f"Current bills in storage: {list(st.session_state.bills.keys())}")
-        
+        self._index_bill(bill_data)
+        add_to_rollup(st.session_state.rollup, bill_data, "bill")
+        self.record_change("bill", bill_id)
         return bill_data
     
     def update_bill(self, bill_id, updates):
         """Update a bill."""
         bill = self.get_bill(bill_id)
         if bill:
+            self._unindex_bill(bill)
+            add_to_rollup(st.session_state.rollup, bill, "bill", -1)
             bill.update(updates)
+            self._index_bill(bill)
+            add_to_rollup(st.session_state.rollup, bill, "bill")
+            self.record_change("bill", bill_id)
             return bill
         return None
     
+    def update_bills(self, bill_ids, updates):
+        """Apply the same updates to many bills; returns the bills that changed."""
+        changed = []
+        for bill_id in bill_ids:
+            bill = self.get_bill(bill_id)
+            if bill and any(bill.get(field) != value for field, value in updates.items()):
+                changed.append(self.update_bill(bill_id, updates))
+        return changed
+    
     def delete_bill(self, bill_id):
         """Delete a bill."""
         if bill_id in st.session_state.bills:
+            self._unindex_bill(st.session_state.bills[bill_id])
+            add_to_rollup(st.session_state.rollup, st.session_state.bills[bill_id], "bill", -1)
             del st.session_state.bills[bill_id]
+            self.record_change("bill", bill_id)
             return True
         return False
     
+    def _index_bill(self, bill):
+        # The first bill with a key owns it
+        st.session_state.bill_keys.setdefault(bill_key(bill), bill["id"])
+    
+    def _unindex_bill(self, bill):
+        key = bill_key(bill)
+        if st.session_state.bill_keys.get(key) == bill["id"]:
+            del st.session_state.bill_keys[key]
+    
+    def find_bill(self, bill_data):
+        """Find the bill with the same normalized key as bill_data, if any."""
+        bill_id = st.session_state.bill_keys.get(bill_key(bill_data))
+        return self.get_bill(bill_id) if bill_id is not None else None
+    
+    def upsert_bill(self, bill_data):
+        """Create a bill, or merge it into the existing bill with the same key.
+        
+        Merging only fills fields the existing bill is missing, so user edits
+        such as marking it paid are kept. Returns ``(bill, created)``.
+        """
+        existing = self.find_bill(bill_data)
+        if existing is None:
+            return self.create_bill(bill_data), True
+        return self._merge_bill(existing, bill_data), False
+    
+    def upsert_bills(self, bills):
+        """Upsert many bills at once, e.g. from a bulk import.
+        
+        Returns a list of ``(bill, created)`` in input order.
+        """
+        results = []
+        for bill_data in bills:
+            existing = self.find_bill(bill_data)
+            if existing is None:
+                results.append((self._insert_bill(bill_data), True))
+            else:
+                results.append((self._merge_bill(existing, bill_data), False))
+        return results
+    
+    def _merge_bill(self, existing, bill_data):
+        missing = {field: value for field, value in bill_data.items()
+                   if value is not None and existing.get(field) is None and field not in ("id", "createdAt")}
+        if missing:
+            self.update_bill(existing["id"], missing)
+        return existing
+    
     def get_subscriptions(self, user_id):
         """Get all subscriptions for a user."""
         return [sub for sub in st.session_state.subscriptions.values() if sub["userId"] == user_id]
@@ -302,37 +479,44 @@ class MemStorage:
     
     def create_subscription(self, sub_data):
         """Create a new subscription."""
-        # Debug
-        st.write(f"Creating subscription with data in storage: {sub_data}")
-        
         st.session_state.subscription_counter += 1
         sub_id = st.session_state.subscription_counter
         sub_data["id"] = sub_id
-        sub_data["createdAt"] = datetime.datetime.now()
-        
-        # Debug
-        st.write(f"Assigned subscription ID: {sub_id}")
+        sub_data["createdAt"] = render_now()
+        sub_data["currency"] = sub_data.get("currency") or self.get_display_currency(sub_data.get("userId"))
         
         # Store in session state
         st.session_state.subscriptions[sub_id] = sub_data
-        
-        # Debug
-        st.write(f"Current subscriptions in storage: {list(st.session_state.subscriptions.keys())}")
-        
+        add_to_rollup(st.session_state.rollup, sub_data, "subscription")
+        self.record_change("subscription", sub_id)
         return sub_data
     
     def update_subscription(self, sub_id, updates):
         """Update a subscription."""
         subscription = self.get_subscription(sub_id)
         if subscription:
+            add_to_rollup(st.session_state.rollup, subscription, "subscription", -1)
             subscription.update(updates)
+            add_to_rollup(st.session_state.rollup, subscription, "subscription")
+            self.record_change("subscription", sub_id)
             return subscription
         return None
     
+    def update_subscriptions(self, sub_ids, updates):
+        """Apply the same updates to many subscriptions; returns the ones that changed."""
+        changed = []
+        for sub_id in sub_ids:
+            subscription = self.get_subscription(sub_id)
+            if subscription and any(subscription.get(field) != value for field, value in updates.items()):
+                changed.append(self.update_subscription(sub_id, updates))
+        return changed
+    
     def delete_subscription(self, sub_id):
         """Delete a subscription."""
         if sub_id in st.session_state.subscriptions:
+            add_to_rollup(st.session_state.rollup, st.session_state.subscriptions[sub_id], "subscription", -1)
             del st.session_state.subscriptions[sub_id]
+            self.record_change("subscription", sub_id)
             return True
         return False
     
@@ -350,7 +534,7 @@ class MemStorage:
     
     def get_pending_reminders(self, user_id):
         """Get pending reminders for a user."""
-        now = datetime.datetime.now()
+        now = render_now()
         return [reminder for reminder in self.get_reminders(user_id) 
                 if reminder["reminderDate"] <= now and not reminder["sent"] and not reminder["dismissed"]]
     
@@ -358,15 +542,86 @@ class MemStorage:
         """Get all SMS messages for a user."""
         return [sms for sms in st.session_state.sms_messages.values() if sms["userId"] == user_id]
     
+    def get_sms_message(self, sms_id):
+        """Get an SMS message by ID."""
+        return st.session_state.sms_messages.get(sms_id)
+    
     def create_sms_message(self, sms_data):
-        """Create a new SMS message."""
+        """Create a new SMS message.
+        
+        The message is fingerprinted, and ``duplicateOf`` is set to the ID of
+        an earlier near-identical message from the same user, if any.
+        """
         sms_id = max(list(st.session_state.sms_messages.keys()) or [0]) + 1
+        return self._insert_sms_message(sms_data, sms_id)
+    
+    def create_sms_messages(self, messages):
+        """Create many SMS messages at once, e.g. from a bulk import."""
+        next_id = max(list(st.session_state.sms_messages.keys()) or [0]) + 1
+        return [self._insert_sms_message(sms_data, next_id + i) for i, sms_data in enumerate(messages)]
+    
+    def _insert_sms_message(self, sms_data, sms_id):
         sms_data["id"] = sms_id
-        sms_data["createdAt"] = datetime.datetime.now()
+        sms_data["createdAt"] = render_now()
+        
+        received_at = sms_data.get("receivedAt") or sms_data["createdAt"]
+        sms_data["fingerprint"] = simhash(sms_data["content"])
+        sms_data["duplicateOf"] = self.find_duplicate_sms(sms_data, received_at.timestamp())
+        st.session_state.sms_index.add(sms_data["userId"], sms_data["fingerprint"], received_at.timestamp(), sms_id)
+        
+        timeline = st.session_state.sms_timeline.setdefault(sms_data["userId"], [])
+        bisect.insort(timeline, (received_at, sms_id))
         
         st.session_state.sms_messages[sms_id] = sms_data
         return sms_data
     
+    def query_sms_messages(self, user_id, processed=None, sender=None, start=None, end=None, offset=0, limit=50):
+        """Get one page of a user's SMS messages, most recent first.
+        
+        ``processed`` filters on whether a bill was linked, ``sender`` is a
+        case-insensitive substring and ``start``/``end`` bound ``receivedAt``
+        (inclusive). Returns ``(messages, total matching)``.
+        """
+        timeline = st.session_state.sms_timeline.get(user_id, [])
+        # The date range is a slice of the time-ordered timeline
+        low = bisect.bisect_left(timeline, (start,)) if start else 0
+        high = bisect.bisect_right(timeline, (end, float("inf"))) if end else len(timeline)
+        sender = sender.lower() if sender else None
+        
+        page = []
+        total = 0
+        for i in range(high - 1, low - 1, -1):
+            sms = st.session_state.sms_messages[timeline[i][1]]
+            if processed is not None and bool(sms["processed"] and sms["billId"]) != processed:
+                continue
+            if sender and sender not in sms["sender"].lower():
+                continue
+            if offset <= total < offset + limit:
+                page.append(sms)
+            total += 1
+        return page, total
+    
+    def find_duplicate_sms(self, sms_data, received_at):
+        """Find an earlier near-duplicate of an SMS within the duplicate window.
+        
+        A near-identical text with a different amount is a new bill (e.g. next
+        month's statement), so amounts must match too.
+        """
+        amount = extract_amount(sms_data["content"])
+        matches = st.session_state.sms_index.query(sms_data["userId"], sms_data["fingerprint"], received_at)
+        for _, other_id in matches:
+            other = self.get_sms_message(other_id)
+            if other and extract_amount(other["content"]) == amount:
+                return other_id
+        return None
+    
+    def get_duplicate_sms_bill(self, sms):
+        """Get the bill already created for the message an SMS duplicates."""
+        original = self.get_sms_message(sms.get("duplicateOf"))
+        if original and original["billId"]:
+            return self.get_bill(original["billId"])
+        return None
+    
     def update_sms_message(self, sms_id, updates):
         """Update an SMS message."""
         sms = st.session_state.sms_messages.get(sms_id)
@@ -387,9 +642,10 @@ class MemStorage:
         """Create a new suggestion."""
         suggestion_id = max(list(st.session_state.suggestions.keys()) or [0]) + 1
         suggestion_data["id"] = suggestion_id
-        suggestion_data["createdAt"] = datetime.datetime.now()
+        suggestion_data["createdAt"] = render_now()
         
         st.session_state.suggestions[suggestion_id] = suggestion_data
+        self.record_change("suggestion", suggestion_id)
         return suggestion_data
     
     def update_suggestion(self, suggestion_id, updates):
@@ -397,6 +653,7 @@ class MemStorage:
         suggestion = st.session_state.suggestions.get(suggestion_id)
         if suggestion:
             suggestion.update(updates)
+            self.record_change("suggestion", suggestion_id)
             return suggestion
         return None
     
@@ -404,60 +661,71 @@ class MemStorage:
         """Delete a suggestion."""
         if suggestion_id in st.session_state.suggestions:
             del st.session_state.suggestions[suggestion_id]
+            self.record_change("suggestion", suggestion_id)
             return True
         return False
     
+    def get_spending_rollup(self, user_id, start_month, end_month):
+        """Get a user's spending from the rollup cube, in their display currency.
+        
+        Covers bills due from start_month to end_month ("YYYY-MM") and the
+        monthly cost of active subscriptions; see models.rollup.summarize.
+        """
+        currency = self.get_display_currency(user_id)
+        summary = summarize(st.session_state.rollup.get(user_id, {}), start_month, end_month, currency)
+        summary["currency"] = currency
+        return summary
+    
+    def check_rollup(self, repair=False):
+        """Compare the rollup cube with one rebuilt from the raw bills and subscriptions.
+        
+        Returns the mismatched cells as (userId, cell, found, expected); with
+        ``repair`` the rebuilt cube replaces the stored one.
+        """
+        expected = build_rollup(st.session_state.bills.values(), st.session_state.subscriptions.values())
+        mismatches = compare_rollups(st.session_state.rollup, expected)
+        if mismatches:
+            print(f"Rollup cube has {len(mismatches)} mismatched cells")
+            if repair:
+                st.session_state.rollup = expected
+                self.record_change("rollup", None)
+        return mismatches
+    
     def get_stats(self, user_id):
         """Get dashboard stats for a user."""
-        total_bills_this_month = 0
-        total_upcoming = 0
-        total_active_subscriptions = 0
-        monthly_subscription_cost = 0
-        potential_savings = 0
-        suggestion_count = 0
+        # This month's bills and the subscription costs come from the rollup
+        # cube, in the user's display currency
+        month = render_today().strftime("%Y-%m")
+        spending = self.get_spending_rollup(user_id, month, month)
+        currency = spending["currency"]
         
         # Calculate bills for current month
-        now = datetime.datetime.now()
-        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(seconds=1)
-        
-        for bill in self.get_bills(user_id):
-            bill_date = datetime.datetime.strptime(bill["dueDate"], "%Y-%m-%d")
-            if month_start <= bill_date <= month_end:
-                total_bills_this_month += bill["amount"]
+        total_bills_this_month = sum(spending["months"].values())
         
         # Calculate upcoming bills
         total_upcoming = len(self.get_upcoming_bills(user_id, 7))
         
         # Calculate subscription stats
-        active_subscriptions = self.get_active_subscriptions(user_id)
-        total_active_subscriptions = len(active_subscriptions)
-        
-        for sub in active_subscriptions:
-            monthly_amount = sub["amount"]
-            if sub["frequency"] == "yearly":
-                monthly_amount = sub["amount"] / 12
-            elif sub["frequency"] == "quarterly":
-                monthly_amount = sub["amount"] / 3
-            elif sub["frequency"] == "weekly":
-                monthly_amount = sub["amount"] * 4.33  # Average weeks per month
-            
-            monthly_subscription_cost += monthly_amount
+        total_active_subscriptions = spending["subscriptionCount"]
+        monthly_subscription_cost = sum(spending["subscriptions"].values())
         
         # Calculate suggestion stats
         active_suggestions = self.get_active_suggestions(user_id)
         suggestion_count = len(active_suggestions)
         
-        for suggestion in active_suggestions:
-            if suggestion["potentialSavings"]:
-                potential_savings += suggestion["potentialSavings"]
+        # Suggestions without a currency (e.g. from the AI) are in the display currency
+        savings = [suggestion for suggestion in active_suggestions if suggestion["potentialSavings"]]
+        potential_savings = float(convert_amounts(
+            [suggestion["potentialSavings"] for suggestion in savings],
+            [suggestion.get("currency") or currency for suggestion in savings],
+            [None] * len(savings),
+            currency
+        ).sum())
         
-        # Calculate category breakdown
+        # Calculate category breakdown: this month's bills plus a month of subscriptions
         categories = {}
-        for bill in self.get_bills(user_id):
-            bill_date = datetime.datetime.strptime(bill["dueDate"], "%Y-%m-%d")
-            if month_start <= bill_date <= month_end:
-                cat_id = bill["categoryId"]
+        for totals in (spending["categories"], spending["subscriptions"]):
+            for cat_id, amount in totals.items():
                 if cat_id not in categories:
                     category = self.get_category(cat_id)
                     categories[cat_id] = {
@@ -466,28 +734,7 @@ class MemStorage:
                         "amount": 0,
                         "color": category["color"]
                     }
-                categories[cat_id]["amount"] += bill["amount"]
-        
-        for sub in active_subscriptions:
-            cat_id = sub["categoryId"]
-            if cat_id not in categories:
-                category = self.get_category(cat_id)
-                categories[cat_id] = {
-                    "id": cat_id,
-                    "name": category["name"],
-                    "amount": 0,
-                    "color": category["color"]
-                }
-            
-            monthly_amount = sub["amount"]
-            if sub["frequency"] == "yearly":
-                monthly_amount = sub["amount"] / 12
-            elif sub["frequency"] == "quarterly":
-                monthly_amount = sub["amount"] / 3
-            elif sub["frequency"] == "weekly":
-                monthly_amount = sub["amount"] * 4.33
-            
-            categories[cat_id]["amount"] += monthly_amount
+                categories[cat_id]["amount"] += amount
         
         # Calculate percentages
         total_spending = sum(cat["amount"] for cat in categories.values())
@@ -516,77 +763,103 @@ class MemStorage:
             "monthlySubscriptionCost": monthly_subscription_cost,
             "potentialSavings": potential_savings,
             "suggestionCount": suggestion_count,
-            "categories": category_stats
+            "categories": category_stats,
+            "currency": currency
         }
     
     def get_forecast_data(self, user_id, months=3):
-        """Get forecasted bill data for the next several months."""
-        # This is a simple forecast based on current bills and subscriptions
-        forecast = []
+        """Get forecasted bill data for the next several months.
+        
+        Recurring bills are forecast per category with the local statistical
+        models in models.forecasting, and active subscriptions are added at
+        their known monthly cost. Each month includes a 95% interval for the
+        total as totalLower/totalUpper.
+        """
+        forecasts = self.get_all_forecasts(months)
+        bill_forecast = forecasts["users"].get(user_id, {})
+        
+        # Active subscriptions are known costs, not forecasts
+        known = {"utilities": 0, "subscriptions": 0, "other": 0}
+        currency = self.get_display_currency(user_id)
+        for sub in convert_records(self.get_active_subscriptions(user_id), currency):
+            known[FORECAST_BUCKETS.get(sub["categoryId"], "other")] += to_monthly_amount(sub["amount"], sub["frequency"])
         
-        # Start from current month
-        now = datetime.datetime.now()
-        month_start = now.replace(day=1)
-        
-        for i in range(months):
-            forecast_month = month_start + timedelta(days=30 * i)
-            month_name = forecast_month.strftime("%B")
-            
-            utilities = 0
-            subscriptions = 0
-            other = 0
-            
-            # Calculate recurring bills
-            for bill in self.get_bills(user_id):
-                if not bill["recurring"]:
-                    continue
-                
-                if bill["categoryId"] == 2:  # Utilities
-                    utilities += bill["amount"]
-                elif bill["categoryId"] == 9:  # Subscriptions
-                    subscriptions += bill["amount"]
-                else:
-                    other += bill["amount"]
-            
-            # Add active subscriptions
-            for sub in self.get_active_subscriptions(user_id):
-                monthly_amount = sub["amount"]
-                if sub["frequency"] == "yearly":
-                    monthly_amount = sub["amount"] / 12
-                elif sub["frequency"] == "quarterly":
-                    monthly_amount = sub["amount"] / 3
-                elif sub["frequency"] == "weekly":
-                    monthly_amount = sub["amount"] * 4.33  # Average weeks per month
-                
-                if sub["categoryId"] == 2:  # Utilities
-                    utilities += monthly_amount
-                elif sub["categoryId"] == 9:  # Subscriptions
-                    subscriptions += monthly_amount
-                else:
-                    other += monthly_amount
-            
-            # Apply simple growth/seasonality to utilities
-            # Summer months (May-August) typically have higher utility bills
-            if forecast_month.month in [5, 6, 7, 8]:
-                utilities *= 1.1
-            # Winter months (December-February) also typically have higher bills
-            elif forecast_month.month in [12, 1, 2]:
-                utilities *= 1.08
-            
-            # Small growth factor for subscriptions (price increases)
-            subscriptions *= (1 + (0.01 * i))
-            
-            total = utilities + subscriptions + other
+        forecast = []
+        for i, month_name in enumerate(forecasts["months"]):
+            month = {}
+            variance = 0
+            for bucket in ("utilities", "subscriptions", "other"):
+                mean, bucket_variance = bill_forecast.get(bucket, ([0] * months, [0] * months))
+                month[bucket] = round(float(mean[i]) + known[bucket], 2)
+                variance += float(bucket_variance[i])
             
+            total = month["utilities"] + month["subscriptions"] + month["other"]
+            margin = INTERVAL_Z * variance ** 0.5
             forecast.append({
                 "month": month_name,
-                "utilities": round(utilities, 2),
-                "subscriptions": round(subscriptions, 2),
-                "other": round(other, 2),
-                "total": round(total, 2)
+                "utilities": month["utilities"],
+                "subscriptions": month["subscriptions"],
+                "other": month["other"],
+                "total": round(total, 2),
+                "totalLower": round(max(total - margin, 0), 2),
+                "totalUpper": round(total + margin, 2)
             })
         
         return forecast
+    
+    def get_all_forecasts(self, months=3):
+        """Forecast recurring bills for every user and category in one batched pass.
+        
+        Each user's bills are converted to their display currency first. The
+        result is cached until the data version or the day changes.
+        """
+        now = render_now()
+        cache_key = (self.get_data_version(), months, now.date())
+        cached = st.session_state.get("forecast_cache")
+        if cached and cached[0] == cache_key:
+            return cached[1]
+        
+        recurring_by_user = {}
+        for bill in st.session_state.bills.values():
+            if bill["recurring"]:
+                recurring_by_user.setdefault(bill["userId"], []).append(bill)
+        recurring = [
+            bill
+            for user_id, bills in recurring_by_user.items()
+            for bill in convert_records(bills, self.get_display_currency(user_id), "dueDate")
+        ]
+        
+        # History runs from the earliest bill month up to the current month
+        history = 1
+        if recurring:
+            earliest = parse_date(min(bill["dueDate"] for bill in recurring)[:10])
+            history = (now.year - earliest.year) * 12 + now.month - earliest.month + 1
+            history = min(max(history, 1), FORECAST_HISTORY_MONTHS)
+        
+        keys, Y = build_monthly_series(recurring, now.year, now.month, history)
+        mean, _, _, sigma = forecast_series(Y, months)
+        
+        users = {}
+        for row, (user_id, category_id) in enumerate(keys):
+            bucket = FORECAST_BUCKETS.get(category_id, "other")
+            bucket_mean, bucket_variance = users.setdefault(user_id, {}).get(bucket, (0, 0))
+            users[user_id][bucket] = (bucket_mean + mean[row], bucket_variance + sigma[row] ** 2)
+        
+        # Forecast months start after the current month
+        month_names = []
+        year, month = now.year, now.month
+        for _ in range(months):
+            year, month = (year, month + 1) if month < 12 else (year + 1, 1)
+            month_names.append(datetime.date(year, month, 1).strftime("%B"))
+        
+        result = {"months": month_names, "users": users}
+        st.session_state.forecast_cache = (cache_key, result)
+        return result
 
-# Create a global storage instance
-storage = MemStorage()
+def get_storage():
+    """Get the storage for this run.
+    
+    Pages call this once at the start of each run. Nothing is created when
+    the module is imported; the first call in a session sets up its data.
+    """
+    return MemStorage()
@@ -0,0 +1,331 @@
+import datetime
+import streamlit as st
+
+from utils.date_utils import to_monthly_amount, parse_date, render_today, format_currency
+from utils.currency import DEFAULT_CURRENCY, convert_amounts, convert_records
+
+# A subscription unused for this many days triggers a cancel suggestion
+UNUSED_DAYS = 30
+
+# Monthly plans at or above this amount get an annual-plan suggestion
+ANNUAL_PLAN_MIN_MONTHLY = 10.0
+
+# Typical annual-plan discount (two months free)
+ANNUAL_PLAN_DISCOUNT = 2 / 12
+
+# This many unpaid bills due in the same week triggers a cluster reminder
+CLUSTER_MIN_BILLS = 3
+
+
+def _new_state():
+    return {
+        "version": -1,
+        "day": None,
+        # (rule, kind, key) -> suggestion ID
+        "rule_suggestions": {},
+        # subscription ID -> (user ID, normalized service name), and the reverse
+        "sub_services": {},
+        "service_subs": {},
+        # unpaid bill ID -> (user ID, ISO week it is due in), and the reverse
+        "bill_weeks": {},
+        "week_bills": {}
+    }
+
+
+def _as_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, str):
+        return parse_date(value)
+    return value
+
+
+def _service_key(sub):
+    return " ".join((sub.get("merchantName") or sub["title"]).lower().split())
+
+
+def _week_key(bill):
+    year, week, _ = _as_date(bill["dueDate"]).isocalendar()
+    return (bill["userId"], f"{year}-W{week:02d}")
+
+
+def _move(forward, reverse, record_id, group):
+    """Move a record to a new group in a two-way index.
+
+    Returns the groups whose membership changed.
+    """
+    old_group = forward.pop(record_id, None)
+    if old_group is not None:
+        reverse[old_group].discard(record_id)
+        if not reverse[old_group]:
+            del reverse[old_group]
+    if group is not None:
+        forward[record_id] = group
+        reverse.setdefault(group, set()).add(record_id)
+    return {g for g in (old_group, group) if g is not None}
+
+
+class SuggestionEngine:
+    """Rule-based suggestions kept in sync with storage incrementally.
+
+    Rules cover unused subscriptions, overdue bills, duplicate services,
+    annual-vs-monthly savings and clusters of bills due in the same week.
+    Each sync only re-evaluates records that changed since the last sync,
+    using the storage change log; a new day triggers a full rescan since
+    overdue and unused rules depend on the date.
+    """
+
+    def __init__(self, storage):
+        """Initialize the engine on top of a storage instance."""
+        self.storage = storage
+        # Created on the session's first run, not at import, which happens
+        # once per process
+        self.state = st.session_state.setdefault("suggestion_engine", _new_state())
+        self._touched = None
+
+    def sync(self):
+        """Bring rule-based suggestions up to date with storage."""
+        today = render_today()
+        version = self.storage.get_data_version()
+        changes = None
+        if self.state["day"] == today:
+            changes = self.storage.get_changes_since(self.state["version"])
+
+        if changes is None:
+            self._full_scan(today)
+        else:
+            for _, kind, record_id in changes:
+                if kind == "bill":
+                    self._evaluate_bill(record_id, today)
+                elif kind == "subscription":
+                    self._evaluate_subscription(record_id, today)
+
+        self.state["day"] = today
+        # Suggestions created during the sync bump the version too
+        self.state["version"] = max(version, self.storage.get_data_version())
+
+    def _full_scan(self, today):
+        for index in ("sub_services", "service_subs", "bill_weeks", "week_bills"):
+            self.state[index] = {}
+        
+        self._touched = set()
+        for bill_id in list(st.session_state.bills):
+            self._evaluate_bill(bill_id, today)
+        for sub_id in list(st.session_state.subscriptions):
+            self._evaluate_subscription(sub_id, today)
+        
+        # Drop suggestions for records deleted since the last scan
+        for rule_key in list(self.state["rule_suggestions"]):
+            if rule_key not in self._touched:
+                self._resolve(*rule_key)
+        self._touched = None
+
+    # Bill rules
+
+    def _evaluate_bill(self, bill_id, today):
+        bill = self.storage.get_bill(bill_id)
+
+        if bill and not bill["paid"] and _as_date(bill["dueDate"]) < today:
+            days = (today - _as_date(bill["dueDate"])).days
+            self._upsert("overdue_bill", "bill", bill_id, {
+                "type": "reminder",
+                "title": "Overdue bill",
+                "description": f"Your {bill['title'].lower()} payment is overdue by {days} day{'s' if days != 1 else ''}.",
+                "userId": bill["userId"],
+                "icon": "⚠️",
+                "subscriptionId": None,
+                "billId": bill_id,
+                "potentialSavings": None
+            })
+        else:
+            self._resolve("overdue_bill", "bill", bill_id)
+
+        # Re-check the week the bill was in and the week it is in now
+        week = None
+        if bill and not bill["paid"] and _as_date(bill["dueDate"]) >= today:
+            week = _week_key(bill)
+        for affected in _move(self.state["bill_weeks"], self.state["week_bills"], bill_id, week):
+            self._evaluate_week(affected)
+
+    def _evaluate_week(self, week):
+        user_id, week_name = week
+        bill_ids = sorted(self.state["week_bills"].get(week, ()))
+        if len(bill_ids) >= CLUSTER_MIN_BILLS:
+            bills = [self.storage.get_bill(bill_id) for bill_id in bill_ids]
+            # Bills may be in different currencies, so total them in the display currency
+            currency = self.storage.get_display_currency(user_id)
+            total = float(convert_amounts(
+                [bill["amount"] for bill in bills],
+                [bill.get("currency") for bill in bills],
+                [bill["dueDate"] for bill in bills],
+                currency
+            ).sum())
+            self._upsert("due_date_cluster", "week", week, {
+                "type": "reminder",
+                "title": "Several bills due the same week",
+                "description": (
+                    f"{len(bills)} bills totalling {format_currency(total, currency)} are due in week {week_name[-2:]}: "
+                    f"{', '.join(bill['title'] for bill in bills)}. Consider moving a due date to spread them out."
+                ),
+                "userId": user_id,
+                "icon": "📆",
+                "subscriptionId": None,
+                "billId": bill_ids[0],
+                "potentialSavings": None
+            })
+        else:
+            self._resolve("due_date_cluster", "week", week)
+
+    # Subscription rules
+
+    def _evaluate_subscription(self, sub_id, today):
+        sub = self.storage.get_subscription(sub_id)
+        active = bool(sub and sub["active"])
+
+        last_used = _as_date(sub.get("lastUsed")) if active else None
+        unused = bool(last_used and (today - last_used).days >= UNUSED_DAYS)
+        if unused:
+            savings = round(to_monthly_amount(sub["amount"], sub["frequency"]), 2)
+            self._upsert("unused_subscription", "subscription", sub_id, {
+                "type": "savings",
+                "title": "Cancel unused subscription",
+                "description": (
+                    f"You haven't used your {sub['title'].lower()} in the last {(today - last_used).days} days. "
+                    f"Consider cancelling to save {format_currency(savings, sub.get('currency'))}/month."
+                ),
+                "userId": sub["userId"],
+                "icon": "💡",
+                "subscriptionId": sub_id,
+                "billId": None,
+                "potentialSavings": savings,
+                "currency": sub.get("currency")
+            })
+        else:
+            self._resolve("unused_subscription", "subscription", sub_id)
+
+        if active and not unused and sub["frequency"] == "monthly" and sub["amount"] >= ANNUAL_PLAN_MIN_MONTHLY:
+            savings = round(sub["amount"] * ANNUAL_PLAN_DISCOUNT, 2)
+            self._upsert("annual_plan", "subscription", sub_id, {
+                "type": "optimization",
+                "title": "Switch to an annual plan",
+                "description": (
+                    f"{sub['title']} costs {format_currency(sub['amount'] * 12, sub.get('currency'))} a year on a monthly plan. "
+                    f"Annual plans are often about two months cheaper."
+                ),
+                "userId": sub["userId"],
+                "icon": "📅",
+                "subscriptionId": sub_id,
+                "billId": None,
+                "potentialSavings": savings,
+                "currency": sub.get("currency")
+            })
+        else:
+            self._resolve("annual_plan", "subscription", sub_id)
+
+        # Re-check the service this subscription belonged to and belongs to now
+        service = (sub["userId"], _service_key(sub)) if active else None
+        for affected in _move(self.state["sub_services"], self.state["service_subs"], sub_id, service):
+            self._evaluate_service(affected)
+
+    def _evaluate_service(self, service):
+        user_id, name = service
+        sub_ids = sorted(self.state["service_subs"].get(service, ()))
+        if len(sub_ids) > 1:
+            subs = [self.storage.get_subscription(sub_id) for sub_id in sub_ids]
+            # Compare the duplicates in the first one's currency
+            currency = subs[0].get("currency") or DEFAULT_CURRENCY
+            monthly = [to_monthly_amount(sub["amount"], sub["frequency"]) for sub in convert_records(subs, currency)]
+            self._upsert("duplicate_service", "service", service, {
+                "type": "savings",
+                "title": "Duplicate subscription",
+                "description": (
+                    f"You have {len(subs)} active subscriptions for {subs[0]['title']}. "
+                    f"Keeping only one would save {format_currency(sum(monthly) - max(monthly), currency)}/month."
+                ),
+                "userId": user_id,
+                "icon": "🔁",
+                "subscriptionId": sub_ids[0],
+                "billId": None,
+                "potentialSavings": round(sum(monthly) - max(monthly), 2),
+                "currency": currency
+            })
+        else:
+            self._resolve("duplicate_service", "service", service)
+
+    # Suggestion bookkeeping
+
+    def _find_existing(self, rule, data):
+        """Find an unclaimed active suggestion from the same rule for the same record.
+        
+        Suggestions without a rule (e.g. the demo data) can be adopted by any
+        rule of the same type, but only by one.
+        """
+        claimed = set(self.state["rule_suggestions"].values())
+        for suggestion in self.storage.get_active_suggestions(data["userId"]):
+            if (suggestion["id"] not in claimed
+                    and suggestion.get("rule") in (None, rule)
+                    and suggestion["type"] == data["type"]
+                    and suggestion.get("billId") == data["billId"]
+                    and suggestion.get("subscriptionId") == data["subscriptionId"]):
+                return suggestion
+        return None
+
+    def _upsert(self, rule, kind, key, data):
+        rule_key = (rule, kind, key)
+        if self._touched is not None:
+            self._touched.add(rule_key)
+        suggestion_id = self.state["rule_suggestions"].get(rule_key)
+        suggestion = st.session_state.suggestions.get(suggestion_id) if suggestion_id else None
+
+        if suggestion is None:
+            suggestion = self._find_existing(rule, data)
+            if suggestion is None:
+                suggestion = self.storage.create_suggestion(dict(data, dismissed=False, source="rules", rule=rule))
+            elif suggestion.get("rule") is None:
+                self.storage.update_suggestion(suggestion["id"], {"rule": rule})
+            self.state["rule_suggestions"][rule_key] = suggestion["id"]
+        elif suggestion.get("source") == "rules" and not suggestion["dismissed"]:
+            changed = {field: value for field, value in data.items() if suggestion.get(field) != value}
+            if changed:
+                self.storage.update_suggestion(suggestion["id"], changed)
+
+    def _resolve(self, rule, kind, key):
+        suggestion_id = self.state["rule_suggestions"].pop((rule, kind, key), None)
+        suggestion = st.session_state.suggestions.get(suggestion_id) if suggestion_id else None
+        if suggestion and suggestion.get("source") == "rules":
+            self.storage.delete_suggestion(suggestion_id)
+        elif suggestion and not suggestion["dismissed"]:
+            # An adopted suggestion whose condition no longer holds
+            self.storage.update_suggestion(suggestion_id, {"dismissed": True})
+
+    # Escalation to the LLM
+
+    def is_duplicate(self, suggestion, user_id):
+        """Check whether a suggestion (e.g. from the LLM) repeats an active one."""
+        title = suggestion.get("title", "").strip().lower()
+        for existing in self.storage.get_active_suggestions(user_id):
+            if existing["title"].strip().lower() == title:
+                return True
+            if suggestion.get("billId") and suggestion.get("billId") == existing.get("billId"):
+                return True
+            if suggestion.get("subscriptionId") and suggestion.get("subscriptionId") == existing.get("subscriptionId"):
+                return True
+        return False
+
+    def escalation_data(self, user_id):
+        """Get the bills and subscriptions no active suggestion covers yet.
+
+        Only these novel cases need to go to the LLM. Amounts are converted to
+        the user's display currency so the LLM's savings are in that currency.
+        """
+        active = self.storage.get_active_suggestions(user_id)
+        covered_bills = {s.get("billId") for s in active}
+        covered_subs = {s.get("subscriptionId") for s in active}
+        currency = self.storage.get_display_currency(user_id)
+        bills = [b for b in self.storage.get_bills(user_id) if b["id"] not in covered_bills]
+        subscriptions = [s for s in self.storage.get_subscriptions(user_id) if s["id"] not in covered_subs]
+        return {
+            "bills": convert_records(bills, currency, "dueDate"),
+            "subscriptions": convert_records(subscriptions, currency),
+            "currency": currency
+        }
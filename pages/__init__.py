@@ -1,6 +1,33 @@
-from . import dashboard
-from . import bills
-from . import subscriptions
-from . import analytics
-from . import sms_import
-from . import settings
+"""Page registry.
+
+A page's module is imported the first time the page is shown, so opening
+one page does not load what only the others use (plotly for the charts,
+groq for the AI features). With the sidebar:
+
+    show_page(render_sidebar())
+"""
+import importlib
+
+# Page name -> module in this package, in navigation order
+PAGES = {
+    "Dashboard": "dashboard",
+    "Bills": "bills",
+    "Subscriptions": "subscriptions",
+    "Analytics": "analytics",
+    "SMS Import": "sms_import",
+    "Settings": "settings"
+}
+
+def get_page(name):
+    """Get a page's module, importing it on first use."""
+    return importlib.import_module(f"{__name__}.{PAGES[name]}")
+
+def show_page(name):
+    """Display a page."""
+    get_page(name).show()
+
+def __getattr__(name):
+    # Keep pages.<module> working without importing every page up front
+    if name in PAGES.values():
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,21 +1,27 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime
 
-from models.storage import MemStorage
-from utils.date_utils import format_date, format_currency, get_due_date_status
+from models.storage import get_storage
+from utils.date_utils import parse_dates, format_date, format_currency, due_date_statuses, render_today
+from utils.currency import SUPPORTED_CURRENCIES, DEFAULT_CURRENCY
+from components.grid import selectable_grid
+
+# Grid badge for each due date status color
+STATUS_ICONS = {
+    "red": "🔴",
+    "orange": "🟠",
+    "green": "🟢",
+    "blue": "🔵"
+}
 
 def show():
     """Display the bills page."""
     # Initialize storage
-    storage = MemStorage()
+    storage = get_storage()
     
     # Get user ID (in a real app, this would come from authentication)
     user_id = 1
     
-    # Get bills for the user
-    bills = storage.get_bills(user_id)
-    
     # Get categories
     categories = {category["id"]: category for category in storage.get_categories()}
     
@@ -26,103 +32,160 @@ def show():
     tab1, tab2 = st.tabs(["All Bills", "Add New Bill"])
     
     with tab1:
-        # Display bills
-        if not bills:
-            st.info("No bills found.")
-        else:
-            # Sort bills by due date
-            bills.sort(key=lambda x: x["dueDate"])
-            
-            # Create a simple table for bills
-            for bill in bills:
-                status = get_due_date_status(bill["dueDate"])
-                
-                col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
-                
-                # Bill title and merchant
-                col1.markdown(f"<strong>{bill['title']}</strong><br><small>{bill['merchantName'] or 'N/A'}</small>", unsafe_allow_html=True)
-                
-                # Due date
-                col2.write(format_date(bill["dueDate"]))
-                
-                # Amount
-                col3.write(format_currency(bill["amount"]))
-                
-                # Status
-                col4.markdown(
-                    f'<span style="background-color: {status["color"]}20; color: {status["color"]}; '
-                    f'padding: 3px 10px; border-radius: 12px; font-size: 0.7rem; font-weight: 500;">'
-                    f'{status["label"]}</span>',
-                    unsafe_allow_html=True
-                )
-                
-                # Display bill details in an expander
-                with st.expander("Details", expanded=False):
-                    st.markdown(f"**Description:** {bill['description'] or 'No description'}")
-                    st.markdown(f"**Category:** {categories[bill['categoryId']]['name']}")
-                    st.markdown(f"**Recurring:** {'Yes' if bill['recurring'] else 'No'}")
-                    st.markdown(f"**Paid:** {'Yes' if bill['paid'] else 'No'}")
-                    st.markdown(f"**Auto-pay:** {'Yes' if bill['autoPay'] else 'No'}")
-                
-                st.markdown("<hr>", unsafe_allow_html=True)
+        # A fragment, so selecting rows and batch actions rerun only the list
+        st.fragment(show_bill_list)(storage, user_id, categories)
     
     with tab2:
-    # Simple approach to add a bill without using st.form
-    st.subheader("Add New Bill")
-    
-    # Bill details
-    title = st.text_input("Bill Title", key="bill_title")
-    amount = st.number_input("Amount", min_value=0.01, value=0.01, step=0.01, key="bill_amount")
-    due_date = st.date_input("Due Date", datetime.now().date(), key="bill_due_date")
+        # Simple approach to add a bill without using st.form
+        st.subheader("Add New Bill")
+        
+        # Bill details
+        title = st.text_input("Bill Title", key="bill_title")
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            amount = st.number_input("Amount", min_value=0.01, value=0.01, step=0.01, key="bill_amount")
+        
+        with col2:
+            currency = st.selectbox(
+                "Currency",
+                options=SUPPORTED_CURRENCIES,
+                index=SUPPORTED_CURRENCIES.index(storage.get_display_currency(user_id)),
+                key="bill_currency"
+            )
+        
+        due_date = st.date_input("Due Date", render_today(), key="bill_due_date")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            category_id = st.selectbox(
+                "Category",
+                options=[category["id"] for category in categories.values()],
+                format_func=lambda x: categories[x]["name"],
+                key="bill_category"
+            )
+        
+        with col2:
+            merchant = st.text_input("Merchant/Company", key="bill_merchant")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            recurring = st.checkbox("Recurring Bill", True, key="bill_recurring")
+        
+        with col2:
+            auto_pay = st.checkbox("Auto-Pay Enabled", False, key="bill_autopay")
+        
+        description = st.text_area("Description", key="bill_description")
+        
+        # Submit button
+        if st.button("Add Bill", key="add_bill_btn"):
+            if not title:
+                st.error("Please enter a bill title.")
+            else:
+                # Create bill object
+                new_bill = {
+                    "title": title,
+                    "amount": float(amount),
+                    "currency": currency,
+                    "dueDate": due_date.strftime("%Y-%m-%d"),
+                    "categoryId": category_id,
+                    "userId": user_id,
+                    "paid": False,
+                    "recurring": recurring,
+                    "description": description,
+                    "merchantName": merchant,
+                    "autoPay": auto_pay,
+                    "detectedFromSms": False
+                }
+            
+                # Add to storage
+                bill = storage.create_bill(new_bill)
+            
+                if bill:
+                    st.success(f"Added new bill: {title}")
+                else:
+                    st.error("Failed to add bill.")
+
+def show_bill_list(storage, user_id, categories):
+    """Display every bill in one grid, with details and actions for the selection."""
+    bills = storage.get_bills(user_id)
     
-    col1, col2 = st.columns(2)
-    with col1:
-        category_id = st.selectbox(
-            "Category",
-            options=[category["id"] for category in categories.values()],
-            format_func=lambda x: categories[x]["name"],
-            key="bill_category"
+    # Display bills
+    if not bills:
+        st.info("No bills found.")
+    else:
+        # Sort bills by due date
+        bills.sort(key=lambda x: x["dueDate"])
+        
+        # Get every bill's status in one pass
+        due_dates = [bill["dueDate"] for bill in bills]
+        statuses = due_date_statuses(due_dates)
+        
+        # One grid for every bill; selecting rows opens the details and actions
+        rows = [
+            {
+                "Status": f"{STATUS_ICONS[status['color']]} {status['label']}",
+                "Bill": bill["title"],
+                "Merchant": bill["merchantName"] or "N/A",
+                "Due Date": due_date,
+                "Amount": bill["amount"],
+                "Currency": bill.get("currency") or DEFAULT_CURRENCY,
+                "Paid": bill["paid"],
+                "Auto-pay": bill["autoPay"]
+            }
+            for bill, status, due_date in zip(bills, statuses, parse_dates(due_dates))
+        ]
+        
+        selected_ids = selectable_grid(
+            pd.DataFrame(rows),
+            [bill["id"] for bill in bills],
+            "bills_table",
+            column_config={
+                "Bill": st.column_config.TextColumn(width="medium"),
+                "Due Date": st.column_config.DateColumn(format="MMM DD, YYYY"),
+                "Amount": st.column_config.NumberColumn(format="%.2f"),
+                "Paid": st.column_config.CheckboxColumn(),
+                "Auto-pay": st.column_config.CheckboxColumn()
+            }
         )
+        
+        bills_by_id = {bill["id"]: bill for bill in bills}
+        selected = [bills_by_id[bill_id] for bill_id in selected_ids]
+        if not selected:
+            st.caption("Select bills to see their details or mark them as paid.")
+        else:
+            show_bill_actions(storage, selected, categories)
+
+def show_bill_actions(storage, selected, categories):
+    """Display the selected bills' details and batch actions."""
+    if len(selected) == 1:
+        bill = selected[0]
+        st.markdown(f"#### {bill['title']} - {format_currency(bill['amount'], bill.get('currency'))}")
+        st.markdown(f"**Due:** {format_date(bill['dueDate'])}")
+        st.markdown(f"**Description:** {bill['description'] or 'No description'}")
+        st.markdown(f"**Category:** {categories[bill['categoryId']]['name']}")
+        st.markdown(f"**Recurring:** {'Yes' if bill['recurring'] else 'No'}")
+        st.markdown(f"**Paid:** {'Yes' if bill['paid'] else 'No'}")
+        st.markdown(f"**Auto-pay:** {'Yes' if bill['autoPay'] else 'No'}")
+    else:
+        st.markdown(f"#### {len(selected)} bills selected")
     
-    with col2:
-        merchant = st.text_input("Merchant/Company", key="bill_merchant")
-    
+    # Batch actions run as callbacks, so the grid redraws with the change
+    bill_ids = [bill["id"] for bill in selected]
     col1, col2 = st.columns(2)
     with col1:
-        recurring = st.checkbox("Recurring Bill", True, key="bill_recurring")
+        st.button(
+            "Mark as Paid",
+            key="bills_mark_paid",
+            disabled=all(bill["paid"] for bill in selected),
+            on_click=storage.update_bills,
+            args=(bill_ids, {"paid": True})
+        )
     
     with col2:
-        auto_pay = st.checkbox("Auto-Pay Enabled", False, key="bill_autopay")
-    
-    description = st.text_area("Description", key="bill_description")
-    
-    # Submit button
-    if st.button("Add Bill", key="add_bill_btn"):
-        if not title:
-            st.error("Please enter a bill title.")
-        else:
-            # Debug info
-            st.write("Submitting bill data...")
-            
-            # Create bill object
-            new_bill = {
-                "title": title,
-                "amount": float(amount),
-                "dueDate": due_date.strftime("%Y-%m-%d"),
-                "categoryId": category_id,
-                "userId": user_id,
-                "paid": False,
-                "recurring": recurring,
-                "description": description,
-                "merchantName": merchant,
-                "autoPay": auto_pay,
-                "detectedFromSms": False
-            }
-            
-            # Add to storage
-            bill = storage.create_bill(new_bill)
-            
-            if bill:
-                st.success(f"Added new bill: {title}")
-            else:
-                st.error("Failed to add bill.")
+        st.button(
+            "Mark as Unpaid",
+            key="bills_mark_unpaid",
+            disabled=not any(bill["paid"] for bill in selected),
+            on_click=storage.update_bills,
+            args=(bill_ids, {"paid": False})
+        )
@@ -1,40 +1,52 @@
 import streamlit as st
-import plotly.graph_objects as go
-import plotly.express as px
 import pandas as pd
-from datetime import datetime, timedelta
 
-from models.storage import MemStorage
-from utils.date_utils import format_currency, get_due_date_status, format_date
+from models.storage import get_storage
+from models.suggestion_engine import SuggestionEngine
+from utils.date_utils import format_currency, due_date_statuses, format_dates, render_today
+from components.fragments import data_fragment
 
 def show():
     """Display the dashboard page."""
     # Initialize storage
     storage = get_storage()
 
-    
     # Get user ID (in a real app, this would come from authentication)
     user_id = 1
     
-    # Get dashboard stats
-    stats = storage.get_stats(user_id)
-    
-    # Get upcoming bills
-    upcoming_bills = storage.get_upcoming_bills(user_id, 7)
-    
-    # Get active suggestions
-    suggestions = storage.get_active_suggestions(user_id)
+    # Bring rule-based suggestions up to date
+    engine = SuggestionEngine(storage)
+    engine.sync()
     
     # Header
     st.markdown('<h1 class="main-header">Dashboard</h1>', unsafe_allow_html=True)
     
-    # Top metrics row
+    # Each section is a fragment, so its widgets rerun only that section;
+    # sections read the page data cached for the current data version
+    st.fragment(show_metrics)(storage, user_id)
+    
+    # Main content area
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        st.fragment(show_upcoming_and_categories)(storage, user_id)
+    
+    with col2:
+        # Adding AI suggestions changes the stats, so it refreshes the page
+        data_fragment(show_suggestions, storage)(storage, engine, user_id)
+        st.fragment(show_forecast)(storage, user_id)
+
+def show_metrics(storage, user_id):
+    """Display the top metrics row."""
+    stats = get_dashboard_data(storage, user_id)["stats"]
+    currency = stats["currency"]
+    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         display_summary_card(
             "This Month", 
-            format_currency(stats.get("totalBillsThisMonth", 0)), 
+            format_currency(stats.get("totalBillsThisMonth", 0), currency), 
             "💵", 
             "#1E88E5"
         )
@@ -50,7 +62,7 @@ def show():
     with col3:
         display_summary_card(
             "Subscriptions", 
-            format_currency(stats.get("monthlySubscriptionCost", 0)), 
+            format_currency(stats.get("monthlySubscriptionCost", 0), currency), 
             "🔄", 
             "#8E24AA"
         )
@@ -58,88 +70,158 @@ def show():
     with col4:
         display_summary_card(
             "Potential Savings", 
-            format_currency(stats.get("potentialSavings", 0)), 
+            format_currency(stats.get("potentialSavings", 0), currency), 
             "💰", 
             "#FB8C00"
         )
+
+def show_upcoming_and_categories(storage, user_id):
+    """Display the upcoming bills and spending by category."""
+    data = get_dashboard_data(storage, user_id)
+    stats = data["stats"]
     
-    # Main content area
-    col1, col2 = st.columns([2, 1])
+    # Upcoming bills card
+    display_upcoming_bills(data["upcomingBills"])
     
-    with col1:
-        # Upcoming bills card
-        display_upcoming_bills(upcoming_bills)
-        
-        # Spending categories visualization
-        if stats.get("categories"):
-            display_spending_categories(stats["categories"])
+    # Spending categories visualization
+    if stats.get("categories"):
+        display_spending_categories(stats["categories"], stats["currency"], data["categoryFigure"])
+
+def show_suggestions(storage, engine, user_id):
+    """Display active suggestions and the AI suggestions button."""
+    currency = storage.get_display_currency(user_id)
+    display_suggestions(storage.get_active_suggestions(user_id), currency)
+    display_ai_suggestions(storage, engine, user_id)
+
+def show_forecast(storage, user_id):
+    """Display the bill forecast chart and monthly totals."""
+    data = get_dashboard_data(storage, user_id)
+    currency = data["stats"]["currency"]
     
-    with col2:
-        # Suggestions card
-        display_suggestions(suggestions)
-        
-        # Forecast visualization
-        st.markdown('<div class="card"><h3 class="card-title">🔮 Bill Forecast</h3>', unsafe_allow_html=True)
-        
-        # Get forecast data
-        forecast_data = storage.get_forecast_data(user_id, 3)
-        
-        # Create a DataFrame for plotting
-        df = pd.DataFrame(forecast_data)
-        
-        # Plot stacked bar chart
-        fig = go.Figure()
-        
-        # Add traces for each expense category
-        fig.add_trace(go.Bar(
-            x=df["month"],
-            y=df["subscriptions"],
-            name="Subscriptions",
-            marker_color="#8E24AA"
-        ))
-        fig.add_trace(go.Bar(
-            x=df["month"],
-            y=df["utilities"],
-            name="Utilities",
-            marker_color="#43A047"
-        ))
-        fig.add_trace(go.Bar(
-            x=df["month"],
-            y=df["other"],
-            name="Other",
-            marker_color="#FB8C00"
-        ))
-        
-        # Update layout
-        fig.update_layout(
-            barmode="stack",
-            height=300,
-            margin=dict(l=20, r=20, t=30, b=20),
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            ),
-            xaxis_title=None,
-            yaxis_title="Amount ($)",
-            template="plotly_white"
+    st.markdown('<div class="card"><h3 class="card-title">🔮 Bill Forecast</h3>', unsafe_allow_html=True)
+    
+    st.plotly_chart(data["forecastFigure"], use_container_width=True)
+    
+    # Display totals
+    for month in data["forecast"]:
+        st.markdown(
+            f'<div style="display: flex; justify-content: space-between; margin-bottom: 5px;">'
+            f'<span>{month["month"]}</span>'
+            f'<span><strong>{format_currency(month["total"], currency)}</strong></span>'
+            f'</div>',
+            unsafe_allow_html=True
         )
-        
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # Display totals
-        for month in forecast_data:
-            st.markdown(
-                f'<div style="display: flex; justify-content: space-between; margin-bottom: 5px;">'
-                f'<span>{month["month"]}</span>'
-                f'<span><strong>{format_currency(month["total"])}</strong></span>'
-                f'</div>',
-                unsafe_allow_html=True
-            )
-        
-        st.markdown('</div>', unsafe_allow_html=True)
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+
+def get_dashboard_data(storage, user_id):
+    """Get the dashboard's stats, upcoming bills, forecast and figures.
+    
+    Everything here depends only on the stored data and the date, so it is
+    kept in session state and reused until either changes; reruns from
+    unrelated widget clicks skip both the computation and the figure build.
+    """
+    cache_key = (user_id, storage.get_data_version(), render_today())
+    cached = st.session_state.get("dashboard_cache")
+    if cached and cached[0] == cache_key:
+        return cached[1]
+    
+    stats = storage.get_stats(user_id)
+    forecast_data = storage.get_forecast_data(user_id, 3)
+    data = {
+        "stats": stats,
+        "upcomingBills": storage.get_upcoming_bills(user_id, 7),
+        "forecast": forecast_data,
+        "forecastFigure": build_forecast_figure(forecast_data, stats["currency"]),
+        "categoryFigure": build_category_figure(stats["categories"]) if stats["categories"] else None
+    }
+    st.session_state.dashboard_cache = (cache_key, data)
+    return data
+
+def build_forecast_figure(forecast_data, currency):
+    """Build the stacked bar chart of forecast spending."""
+    import plotly.graph_objects as go
+    
+    # Create a DataFrame for plotting
+    df = pd.DataFrame(forecast_data)
+    
+    # Plot stacked bar chart
+    fig = go.Figure()
+    
+    # Add traces for each expense category
+    fig.add_trace(go.Bar(
+        x=df["month"],
+        y=df["subscriptions"],
+        name="Subscriptions",
+        marker_color="#8E24AA"
+    ))
+    fig.add_trace(go.Bar(
+        x=df["month"],
+        y=df["utilities"],
+        name="Utilities",
+        marker_color="#43A047"
+    ))
+    fig.add_trace(go.Bar(
+        x=df["month"],
+        y=df["other"],
+        name="Other",
+        marker_color="#FB8C00"
+    ))
+    
+    # Update layout
+    fig.update_layout(
+        barmode="stack",
+        height=300,
+        margin=dict(l=20, r=20, t=30, b=20),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        xaxis_title=None,
+        yaxis_title=f"Amount ({currency})",
+        template="plotly_white"
+    )
+    return fig
+
+def build_category_figure(categories):
+    """Build the spending by category pie chart."""
+    import plotly.express as px
+    
+    # Create DataFrame for pie chart
+    df = pd.DataFrame(categories)
+    
+    # Create pie chart
+    fig = px.pie(
+        df,
+        values="amount",
+        names="name",
+        color_discrete_sequence=df["color"].tolist(),
+        hole=0.4
+    )
+    
+    # Update layout
+    fig.update_layout(
+        height=300,
+        margin=dict(l=20, r=20, t=30, b=20),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.2,
+            xanchor="center",
+            x=0.5
+        ),
+        template="plotly_white"
+    )
+    
+    # Update traces
+    fig.update_traces(
+        textposition="inside",
+        textinfo="percent+label"
+    )
+    return fig
 
 def display_summary_card(title, value, icon, color):
     """Display a summary card with title, value, and icon."""
@@ -170,15 +252,17 @@ def display_upcoming_bills(bills):
         
         st.markdown("<hr style='margin: 5px 0; opacity: 0.3;'>", unsafe_allow_html=True)
         
+        # Get every bill's status and formatted due date in one pass
+        due_dates = [bill["dueDate"] for bill in bills]
+        statuses = due_date_statuses(due_dates)
+        formatted_dates = format_dates(due_dates)
+        
         # Display each bill row
-        for bill in bills:
-            # Get status for the bill
-            status = get_due_date_status(bill["dueDate"])
-            
+        for bill, status, formatted_date in zip(bills, statuses, formatted_dates):
             cols = st.columns([3, 2, 2, 2])
             cols[0].markdown(f"<strong>{bill['title']}</strong><br><small>{bill['merchantName'] or 'N/A'}</small>", unsafe_allow_html=True)
-            cols[1].markdown(format_date(bill["dueDate"]), unsafe_allow_html=True)
-            cols[2].markdown(format_currency(bill["amount"]), unsafe_allow_html=True)
+            cols[1].markdown(formatted_date, unsafe_allow_html=True)
+            cols[2].markdown(format_currency(bill["amount"], bill.get("currency")), unsafe_allow_html=True)
             cols[3].markdown(
                 f'<span class="status-badge {status["label"].lower().replace(" ", "-")}" '
                 f'style="background-color: {status["color"]}20; color: {status["color"]};">'
@@ -190,42 +274,10 @@ def display_upcoming_bills(bills):
     
     st.markdown('</div>', unsafe_allow_html=True)
 
-def display_spending_categories(categories):
+def display_spending_categories(categories, currency, fig):
     """Display spending categories visualization."""
     st.markdown('<div class="card"><h3 class="card-title">📊 Spending by Category</h3>', unsafe_allow_html=True)
     
-    # Create DataFrame for pie chart
-    df = pd.DataFrame(categories)
-    
-    # Create pie chart
-    fig = px.pie(
-        df,
-        values="amount",
-        names="name",
-        color_discrete_sequence=df["color"].tolist(),
-        hole=0.4
-    )
-    
-    # Update layout
-    fig.update_layout(
-        height=300,
-        margin=dict(l=20, r=20, t=30, b=20),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=-0.2,
-            xanchor="center",
-            x=0.5
-        ),
-        template="plotly_white"
-    )
-    
-    # Update traces
-    fig.update_traces(
-        textposition="inside",
-        textinfo="percent+label"
-    )
-    
     st.plotly_chart(fig, use_container_width=True)
     
     # Display top categories
@@ -235,14 +287,14 @@ def display_spending_categories(categories):
         st.markdown(
             f'<div style="display: flex; justify-content: space-between; margin-bottom: 5px;">'
             f'<span><span style="display: inline-block; width: 10px; height: 10px; border-radius: 50%; background-color: {cat["color"]}; margin-right: 5px;"></span> {cat["name"]}</span>'
-            f'<span><strong>{format_currency(cat["amount"])}</strong> ({cat["percentage"]:.1f}%)</span>'
+            f'<span><strong>{format_currency(cat["amount"], currency)}</strong> ({cat["percentage"]:.1f}%)</span>'
             f'</div>',
             unsafe_allow_html=True
         )
     
     st.markdown('</div>', unsafe_allow_html=True)
 
-def display_suggestions(suggestions):
+def display_suggestions(suggestions, currency):
     """Display suggestions section."""
     st.markdown('<div class="card"><h3 class="card-title">💡 Smart Suggestions</h3>', unsafe_allow_html=True)
     
@@ -250,27 +302,83 @@ def display_suggestions(suggestions):
         st.markdown("<p>No active suggestions at this time.</p>", unsafe_allow_html=True)
     else:
         for suggestion in suggestions:
-            icon = suggestion.get("icon", "💡")
-            
-            st.markdown(
-                f'<div class="suggestion-card" style="margin-bottom: 15px; padding: 10px; background-color: #f5f5f5; border-radius: 8px;">'
-                f'<div style="display: flex; align-items: center; margin-bottom: 5px;">'
-                f'<span style="font-size: 1.5rem; margin-right: 10px;">{icon}</span>'
-                f'<span style="font-weight: 600;">{suggestion["title"]}</span>'
-                f'</div>'
-                f'<p style="margin: 5px 0 10px 0;">{suggestion["description"]}</p>',
-                unsafe_allow_html=True
-            )
-            
-            if suggestion.get("potentialSavings"):
-                st.markdown(
-                    f'<div style="display: flex; justify-content: space-between; margin-top: 5px;">'
-                    f'<span style="font-size: 0.9rem;">Potential savings:</span>'
-                    f'<span style="font-weight: 600; color: #43A047;">{format_currency(suggestion["potentialSavings"])}</span>'
-                    f'</div>',
-                    unsafe_allow_html=True
-                )
-            
-            st.markdown('</div>', unsafe_allow_html=True)
+            display_suggestion_card(suggestion, currency)
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+
+def display_suggestion_card(suggestion, currency):
+    """Display a single suggestion."""
+    icon = suggestion.get("icon", "💡")
+    
+    st.markdown(
+        f'<div class="suggestion-card" style="margin-bottom: 15px; padding: 10px; background-color: #f5f5f5; border-radius: 8px;">'
+        f'<div style="display: flex; align-items: center; margin-bottom: 5px;">'
+        f'<span style="font-size: 1.5rem; margin-right: 10px;">{icon}</span>'
+        f'<span style="font-weight: 600;">{suggestion["title"]}</span>'
+        f'</div>'
+        f'<p style="margin: 5px 0 10px 0;">{suggestion["description"]}</p>',
+        unsafe_allow_html=True
+    )
+    
+    if suggestion.get("potentialSavings"):
+        st.markdown(
+            f'<div style="display: flex; justify-content: space-between; margin-top: 5px;">'
+            f'<span style="font-size: 0.9rem;">Potential savings:</span>'
+            f'<span style="font-weight: 600; color: #43A047;">{format_currency(suggestion["potentialSavings"], suggestion.get("currency") or currency)}</span>'
+            f'</div>',
+            unsafe_allow_html=True
+        )
     
     st.markdown('</div>', unsafe_allow_html=True)
+
+def display_ai_suggestions(storage, engine, user_id):
+    """Stream new AI suggestions into the page as each one completes.
+    
+    Only bills and subscriptions that no rule-based suggestion covers are
+    sent to the LLM, and suggestions repeating an active one are skipped.
+    """
+    if not st.button("✨ Get AI Suggestions", key="ai_suggestions", use_container_width=True):
+        return
+    
+    user_data = engine.escalation_data(user_id)
+    if not user_data["bills"] and not user_data["subscriptions"]:
+        st.info("Your current suggestions already cover all of your bills and subscriptions.")
+        return
+    user_data["categories"] = storage.get_categories()
+    
+    # groq is only loaded once suggestions are asked for
+    from ai.groq_service import get_groq_service
+    
+    status = st.empty()
+    status.caption("Thinking...")
+    
+    received = 0
+    count = 0
+    for suggestion in get_groq_service().stream_bill_suggestions(user_data):
+        if received == 0:
+            status.empty()
+        received += 1
+        
+        if engine.is_duplicate(suggestion, user_id):
+            continue
+        
+        suggestion = storage.create_suggestion({
+            "type": suggestion.get("type", "optimization"),
+            "title": suggestion.get("title", "Suggestion"),
+            "description": suggestion.get("description", ""),
+            "userId": user_id,
+            "dismissed": False,
+            "icon": suggestion.get("icon") or "💡",
+            "subscriptionId": suggestion.get("subscriptionId"),
+            "billId": suggestion.get("billId"),
+            "potentialSavings": suggestion.get("potentialSavings"),
+            "currency": user_data["currency"],
+            "source": "ai"
+        })
+        display_suggestion_card(suggestion, user_data["currency"])
+        count += 1
+    
+    if received == 0:
+        status.warning("Could not generate suggestions right now.")
+    elif count == 0:
+        status.info("No new suggestions beyond the ones you already have.")
@@ -1,7 +1,8 @@
 import streamlit as st
-from datetime import datetime
 
-from models.storage import MemStorage
+from models.storage import get_storage
+from utils.currency import SUPPORTED_CURRENCIES
+from components.tabs import lazy_tabs
 
 def show():
     """Display the settings page."""
@@ -18,17 +19,15 @@ def show():
     # Header
     st.markdown('<h1 class="main-header">Settings</h1>', unsafe_allow_html=True)
     
-    # Create tabs for different settings categories
-    tab1, tab2, tab3 = st.tabs(["Profile", "Notifications", "Preferences"])
+    # Create tabs for different settings categories; only the selected one runs
+    tab = lazy_tabs(["Profile", "Notifications", "Preferences"], key="settings_tab")
     
-    with tab1:
+    if tab == "Profile":
         show_profile_settings(user)
-    
-    with tab2:
+    elif tab == "Notifications":
         show_notification_settings(user)
-    
-    with tab3:
-        show_preferences_settings(user)
+    else:
+        show_preferences_settings(storage, user)
 
 def show_profile_settings(user):
     """Display profile settings."""
@@ -127,7 +126,7 @@ def show_notification_settings(user):
             # Mock successful update
             st.success("Notification settings updated successfully!")
 
-def show_preferences_settings(user):
+def show_preferences_settings(storage, user):
     """Display app preferences settings."""
     st.subheader("App Preferences")
     
@@ -140,12 +139,13 @@ def show_preferences_settings(user):
             index=["light", "dark", "system"].index(current_theme)
         )
         
-        # Currency selection
+        # Currency selection; totals are converted to this currency
         current_currency = user["settings"]["currency"]
         currency = st.selectbox(
-            "Currency",
-            options=["USD", "EUR", "GBP", "CAD", "AUD", "INR", "JPY"],
-            index=["USD", "EUR", "GBP", "CAD", "AUD", "INR", "JPY"].index(current_currency) if current_currency in ["USD", "EUR", "GBP", "CAD", "AUD", "INR", "JPY"] else 0
+            "Display Currency",
+            options=SUPPORTED_CURRENCIES,
+            index=SUPPORTED_CURRENCIES.index(current_currency) if current_currency in SUPPORTED_CURRENCIES else 0,
+            help="Bills and subscriptions keep their own currency; totals and charts are converted."
         )
         
         # Dashboard preferences
@@ -168,5 +168,5 @@ def show_preferences_settings(user):
         submit = st.form_submit_button("Save Preferences")
         
         if submit:
-            # Mock successful update
+            storage.update_user_settings(user["id"], {"theme": theme, "currency": currency})
             st.success("Preferences updated successfully!")
@@ -1,17 +1,167 @@
 import streamlit as st
-import json
-from datetime import datetime
+import uuid
+from datetime import datetime, time
+import pandas as pd
 
-from models.storage import MemStorage
-from ai.groq_service import GroqService
-from utils.date_utils import format_currency, format_date
+from models.storage import get_storage
+from models.job_queue import get_job_queue
+from models.inbox import get_inbox
+from ai.groq_service import get_groq_service
+from ai.sms_pipeline import import_messages, import_from_inbox, make_sender_filter, apply_finished_jobs
+from utils.date_utils import format_currency, format_date, render_now
+from utils.sms_backup import detect_format, iter_backup
+from components.tabs import lazy_tabs
+
+# Seconds between history refreshes while analyses are pending
+POLL_INTERVAL = 2
+
+# Import history table
+HISTORY_PAGE_SIZES = [25, 50, 100]
+HISTORY_STATUS_FILTERS = {"All": None, "Bill detected": True, "No bill yet": False}
+
+def get_job_owner():
+    """Get the ID that ties background jobs to this session's storage."""
+    if "job_owner" not in st.session_state:
+        st.session_state.job_owner = uuid.uuid4().hex
+    return st.session_state.job_owner
+
+def submit_analysis(storage, job_queue, sms):
+    """Queue background analysis of an SMS; returns None when the queue is full."""
+    job_id = job_queue.submit(
+        "analyze_sms",
+        {"smsId": sms["id"], "sender": sms["sender"], "content": sms["content"]},
+        get_job_owner()
+    )
+    if job_id:
+        storage.update_sms_message(sms["id"], {"jobId": job_id})
+    return job_id
+
+def display_detected_bill(storage, bill):
+    """Display a card with the bill detected from an SMS."""
+    st.markdown("### Detected Bill Information")
+    
+    # Get category name
+    category = storage.get_category(bill["categoryId"])
+    category_name = category["name"] if category else "Unknown"
+    
+    # Create a card with bill details
+    st.markdown(
+        f"""
+        <div style="background-color: #f0f7ff; padding: 20px; border-radius: 10px; margin-top: 20px;">
+            <h3 style="margin-top: 0;">{bill["title"]}</h3>
+            <p><strong>Amount:</strong> {format_currency(bill["amount"], bill.get("currency"))}</p>
+            <p><strong>Due Date:</strong> {format_date(bill["dueDate"])}</p>
+            <p><strong>Merchant:</strong> {bill["merchantName"] or "N/A"}</p>
+            <p><strong>Category:</strong> {category_name}</p>
+            <p><strong>Description:</strong> {bill["description"] or "N/A"}</p>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
+def show_bulk_import(storage, groq_service, job_queue, user_id):
+    """Import many messages from an exported SMS backup."""
+    st.subheader("Import an SMS Backup")
+    st.markdown(
+        "Upload an **SMS Backup & Restore** XML file, a CSV file, a JSON or JSON lines file or an email (.eml). "
+        "Messages are read one at a time, personal and non-bill messages are skipped, "
+        "and the AI is only used when a bill can't be read directly."
+    )
+    
+    uploaded = st.file_uploader("Backup file", type=["xml", "csv", "jsonl", "ndjson", "json", "eml"])
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        include = st.text_input("Only senders containing (comma-separated)", "")
+    with col2:
+        exclude = st.text_input("Skip senders containing (comma-separated)", "")
+    business_only = st.checkbox("Skip messages from phone numbers", value=True)
+    
+    sender_filter = make_sender_filter(
+        include=[term.strip() for term in include.split(",")],
+        exclude=[term.strip() for term in exclude.split(",")],
+        business_only=business_only
+    )
+    
+    if uploaded and st.button("Import Messages"):
+        backup_format = detect_format(uploaded.name)
+        if not backup_format:
+            st.error("Unsupported file type.")
+            return
+        
+        progress_bar = st.progress(0.0, text="Reading messages...")
+        
+        def show_progress(summary):
+            fraction = min(uploaded.tell() / uploaded.size, 1.0) if uploaded.size else 1.0
+            progress_bar.progress(
+                fraction,
+                text=f"Read {summary['read']:,} messages, {summary['created']:,} bills created"
+            )
+        
+        summary = import_messages(
+            storage,
+            groq_service,
+            iter_backup(uploaded, backup_format),
+            user_id,
+            sender_filter=sender_filter,
+            progress=show_progress,
+            defer=lambda sms: submit_analysis(storage, job_queue, sms)
+        )
+        progress_bar.progress(1.0, text=f"Done: read {summary['read']:,} messages")
+        display_import_summary(summary)
+    
+    show_inbox(storage, groq_service, job_queue, user_id, sender_filter)
+
+def display_import_summary(summary):
+    """Display the counts of an import run."""
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Bills Created", summary["created"])
+    col2.metric("Duplicates", summary["duplicates"])
+    col3.metric("Skipped", summary["filtered"] + summary["notBill"] + summary["skipped"])
+    
+    st.caption(
+        f"{summary['filtered']:,} filtered by sender, {summary['notBill']:,} not bills, "
+        f"{summary['skipped']:,} without bill details. "
+        f"{summary['preParsed']:,} read directly, {summary['llmCalls']:,} sent to the AI, "
+        f"{summary['queued']:,} queued for background analysis."
+    )
+
+def show_inbox(storage, groq_service, job_queue, user_id, sender_filter):
+    """Show the watched inbox backlog and import the collected messages."""
+    inbox = get_inbox()
+    backlog = inbox.get_backlog()
+    if not inbox.directory and not backlog["messages"]:
+        return
+    
+    st.markdown("---")
+    st.subheader("Watched Inbox")
+    if inbox.directory:
+        st.caption(f"New SMS exports and bill emails in `{inbox.directory}` are collected automatically.")
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Messages Waiting", f"{backlog['messages']:,}")
+    col2.metric("Files Pending", f"{backlog['files']:,}")
+    col3.metric("Bytes Pending", f"{backlog['bytes']:,}")
+    
+    if backlog["messages"] and st.button("Import from Inbox"):
+        with st.spinner("Importing inbox messages..."):
+            summary = import_from_inbox(
+                storage,
+                groq_service,
+                inbox,
+                user_id,
+                sender_filter=sender_filter,
+                defer=lambda sms: submit_analysis(storage, job_queue, sms)
+            )
+        display_import_summary(summary)
 
 def show():
     """Display the SMS import page."""
     # Initialize storage and AI service
     storage = get_storage()
 
-    groq_service = GroqService()
+    groq_service = get_groq_service()
+    job_queue = get_job_queue()
     
     # Get user ID (in a real app, this would come from authentication)
     user_id = 1
@@ -26,10 +176,10 @@ def show():
     This feature works best with payment reminder and bill notification messages from utilities, financial services, and subscription providers.
     """)
     
-    # Create tabs
-    tab1, tab2 = st.tabs(["Import SMS", "Import History"])
+    # Create tabs; only the selected one runs
+    tab = lazy_tabs(["Import SMS", "Bulk Import", "Import History"], key="sms_import_tab")
     
-    with tab1:
+    if tab == "Import SMS":
         # Form for SMS input
         with st.form("sms_import_form"):
             st.subheader("Enter SMS Details")
@@ -51,114 +201,221 @@ def show():
                             "sender": sender,
                             "content": content,
                             "userId": user_id,
-                            "receivedAt": datetime.now(),
+                            "receivedAt": render_now(),
                             "processed": False,
                             "billId": None
                         }
                         
                         sms = storage.create_sms_message(sms_data)
                         
-                        # Analyze with AI
-                        bill_data = groq_service.analyze_sms_content(sender, content)
-                        
-                        if bill_data:
-                            # Add userId
-                            bill_data["userId"] = user_id
-                            
-                            # Create bill
-                            bill = storage.create_bill(bill_data)
+                        # A repeat of an already imported SMS links to its bill without another analysis
+                        duplicate_bill = storage.get_duplicate_sms_bill(sms)
+                        if duplicate_bill:
+                            storage.update_sms_message(sms["id"], {
+                                "processed": True,
+                                "billId": duplicate_bill["id"]
+                            })
+                            st.info("This SMS repeats one you already imported, so it was linked to the existing bill.")
+                            display_detected_bill(storage, duplicate_bill)
+                        elif submit_analysis(storage, job_queue, sms):
+                            st.info("SMS queued for analysis. You can keep using the app; the detected bill will appear in Import History.")
+                        else:
+                            # The job queue is full, so analyze inline
+                            bill_data = groq_service.analyze_sms_content(sender, content)
                             
-                            if bill:
-                                # Update SMS record with bill ID
-                                storage.update_sms_message(sms["id"], {
-                                    "processed": True,
-                                    "billId": bill["id"]
-                                })
-                                
-                                # Show success message with detected information
-                                st.success("Successfully detected bill information!")
+                            if bill_data:
+                                # Add userId
+                                bill_data["userId"] = user_id
                                 
-                                # Display detected bill information
-                                st.markdown("### Detected Bill Information")
+                                # Create the bill, or reuse the one this SMS already describes
+                                bill, created = storage.upsert_bill(bill_data)
                                 
-                                # Get category name
-                                category = storage.get_category(bill["categoryId"])
-                                category_name = category["name"] if category else "Unknown"
-                                
-                                # Create a card with bill details
-                                st.markdown(
-                                    f"""
-                                    <div style="background-color: #f0f7ff; padding: 20px; border-radius: 10px; margin-top: 20px;">
-                                        <h3 style="margin-top: 0;">{bill["title"]}</h3>
-                                        <p><strong>Amount:</strong> {format_currency(bill["amount"])}</p>
-                                        <p><strong>Due Date:</strong> {format_date(bill["dueDate"])}</p>
-                                        <p><strong>Merchant:</strong> {bill["merchantName"] or "N/A"}</p>
-                                        <p><strong>Category:</strong> {category_name}</p>
-                                        <p><strong>Description:</strong> {bill["description"] or "N/A"}</p>
-                                    </div>
-                                    """,
-                                    unsafe_allow_html=True
-                                )
+                                if bill:
+                                    # Update SMS record with bill ID
+                                    storage.update_sms_message(sms["id"], {
+                                        "processed": True,
+                                        "billId": bill["id"]
+                                    })
+                                    
+                                    # Show success message with detected information
+                                    if created:
+                                        st.success("Successfully detected bill information!")
+                                    else:
+                                        st.info("This bill was already imported, so the SMS was linked to it.")
+                                    display_detected_bill(storage, bill)
+                                else:
+                                    st.error("Failed to create bill record.")
                             else:
-                                st.error("Failed to create bill record.")
-                        else:
-                            st.warning("Could not detect bill information from this SMS. The message may not be a bill notification.")
+                                st.warning("Could not detect bill information from this SMS. The message may not be a bill notification.")
+    
+    elif tab == "Bulk Import":
+        show_bulk_import(storage, groq_service, job_queue, user_id)
+    
+    else:
+        # Poll for background results only while analyses are pending
+        counts = job_queue.get_counts(get_job_owner())
+        pending = counts["queued"] + counts["running"]
+        history = st.fragment(show_history, run_every=POLL_INTERVAL if pending else None)
+        history(storage, groq_service, job_queue, user_id)
+
+def show_history(storage, groq_service, job_queue, user_id):
+    """Display imported SMS, applying finished background analyses first."""
+    owner = get_job_owner()
+    applied = apply_finished_jobs(storage, job_queue, owner)
+    counts = job_queue.get_counts(owner)
+    pending = counts["queued"] + counts["running"]
+    if applied and not pending:
+        # Everything finished: rerun the whole page to stop polling
+        st.rerun()
+    
+    if pending:
+        st.info(f"Analyzing in the background: {counts['running']} running, {counts['queued']} queued.")
+    
+    st.subheader("SMS Import History")
+    
+    # Filters are applied by storage, which only returns the current page
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        status = st.selectbox("Status", list(HISTORY_STATUS_FILTERS), key="sms_history_status")
+    with col2:
+        sender = st.text_input("Sender contains", "", key="sms_history_sender")
+    with col3:
+        dates = st.date_input("Received between", value=(), key="sms_history_dates")
+    
+    start = datetime.combine(dates[0], time.min) if len(dates) > 0 else None
+    end = datetime.combine(dates[-1], time.max) if len(dates) > 0 else None
+    page_size = st.session_state.get("sms_history_page_size", HISTORY_PAGE_SIZES[0])
+    page = st.session_state.get("sms_history_page", 1)
     
-    with tab2:
-        # Get SMS history
-        sms_messages = storage.get_sms_messages(user_id)
+    query = dict(processed=HISTORY_STATUS_FILTERS[status], sender=sender.strip(), start=start, end=end)
+    sms_messages, total = storage.query_sms_messages(user_id, offset=(page - 1) * page_size, limit=page_size, **query)
+    pages = max(1, -(-total // page_size))
+    if page > pages:
+        # The filters shrank the result set
+        page = pages
+        sms_messages, total = storage.query_sms_messages(user_id, offset=(page - 1) * page_size, limit=page_size, **query)
+    st.session_state.sms_history_page = page
+    
+    if not total:
+        st.info("No SMS import history found.")
+        return
+    
+    # Linked bills and jobs for this page only, fetched in one call each
+    bills = storage.get_bills_by_ids([sms["billId"] for sms in sms_messages if sms["billId"]])
+    jobs = job_queue.get_jobs_by_ids([sms.get("jobId") for sms in sms_messages])
+    
+    rows = []
+    for sms in sms_messages:
+        bill = bills.get(sms["billId"])
+        rows.append({
+            "Received": sms["receivedAt"],
+            "Sender": sms["sender"],
+            "Message": sms["content"],
+            "Status": sms_status(sms, bill, jobs.get(sms.get("jobId"))),
+            "Bill": bill["title"] if bill else None,
+            "Amount": bill["amount"] if bill else None,
+            "Currency": bill.get("currency") if bill else None
+        })
+    
+    event = st.dataframe(
+        pd.DataFrame(rows),
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key=f"sms_history_table_{page}",
+        column_config={
+            "Received": st.column_config.DatetimeColumn(format="MMM D, YYYY HH:mm"),
+            "Message": st.column_config.TextColumn(width="large"),
+            "Amount": st.column_config.NumberColumn(format="%.2f")
+        }
+    )
+    
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        first = (page - 1) * page_size + 1
+        st.caption(f"Showing {first:,}-{first + len(sms_messages) - 1:,} of {total:,} messages")
+    with col2:
+        st.selectbox("Rows per page", HISTORY_PAGE_SIZES, key="sms_history_page_size")
+    with col3:
+        st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, step=1, key="sms_history_page")
+    
+    # A selection can outlive a filter change that shortened the page
+    selected = [row for row in event.selection.rows if row < len(sms_messages)]
+    if selected:
+        sms = sms_messages[selected[0]]
+        show_sms_detail(storage, groq_service, job_queue, user_id, sms, bills.get(sms["billId"]), jobs.get(sms.get("jobId")))
+    else:
+        st.caption("Select a row to see the message details.")
+
+def sms_status(sms, bill, job):
+    """Get the display status of an imported SMS."""
+    if sms["processed"] and bill:
+        return "Bill detected"
+    if job and job["status"] == "queued":
+        return "Queued"
+    if job and job["status"] == "running":
+        return "Analyzing"
+    if job and job["status"] == "failed":
+        return "Analysis failed"
+    return "No bill detected"
+
+def show_sms_detail(storage, groq_service, job_queue, user_id, sms, bill, job):
+    """Display one SMS with its detected bill and actions."""
+    st.markdown(f"#### {sms['sender']} - {sms['receivedAt'].strftime('%b %d, %Y %H:%M')}")
+    st.markdown(f"**Content:** {sms['content']}")
+    
+    if sms["processed"] and bill:
+        st.markdown("**Detected Bill:**")
+        st.markdown(f"- Title: {bill['title']}")
+        st.markdown(f"- Amount: {format_currency(bill['amount'], bill.get('currency'))}")
+        st.markdown(f"- Due Date: {format_date(bill['dueDate'])}")
         
-        if not sms_messages:
-            st.info("No SMS import history found.")
-        else:
-            # Sort by receivedAt (most recent first)
-            sms_messages.sort(key=lambda x: x["receivedAt"], reverse=True)
-            
-            st.subheader("SMS Import History")
+        # Add button to view full bill
+        if st.button("View Full Bill Details", key=f"view_bill_{sms['id']}"):
+            st.session_state.selected_page = "Bills"
+            st.session_state.selected_bill = bill["id"]
+            st.rerun()
+        return
+    
+    if job and job["status"] == "queued":
+        st.markdown("**Status:** Queued for analysis")
+        return
+    if job and job["status"] == "running":
+        st.markdown("**Status:** Analyzing...")
+        return
+    
+    if job and job["status"] == "failed":
+        st.markdown(f"**Status:** Analysis failed ({job['error']})")
+    else:
+        st.markdown("**Status:** No bill information detected")
+    
+    # Add button to retry analysis
+    if st.button("Retry Analysis", key=f"retry_{sms['id']}"):
+        if submit_analysis(storage, job_queue, sms):
+            st.rerun()
+        
+        # The job queue is full, so analyze inline
+        with st.spinner("Analyzing SMS content..."):
+            bill_data = groq_service.analyze_sms_content(sms["sender"], sms["content"])
             
-            # Display each SMS
-            for sms in sms_messages:
-                with st.expander(f"{sms['sender']} - {sms['receivedAt'].strftime('%b %d, %Y %H:%M')}"):
-                    st.markdown(f"**Content:** {sms['content']}")
+            if bill_data:
+                # Add userId
+                bill_data["userId"] = user_id
+                
+                # Create the bill, or reuse the one this SMS already describes
+                bill, _ = storage.upsert_bill(bill_data)
+                
+                if bill:
+                    # Update SMS record with bill ID
+                    storage.update_sms_message(sms["id"], {
+                        "processed": True,
+                        "billId": bill["id"]
+                    })
                     
-                    if sms["processed"] and sms["billId"]:
-                        bill = storage.get_bill(sms["billId"])
-                        if bill:
-                            st.markdown("**Detected Bill:**")
-                            st.markdown(f"- Title: {bill['title']}")
-                            st.markdown(f"- Amount: {format_currency(bill['amount'])}")
-                            st.markdown(f"- Due Date: {format_date(bill['dueDate'])}")
-                            
-                            # Add button to view full bill
-                            if st.button("View Full Bill Details", key=f"view_bill_{sms['id']}"):
-                                st.session_state.selected_page = "Bills"
-                                st.session_state.selected_bill = bill["id"]
-                                st.rerun()
-                    else:
-                        st.markdown("**Status:** No bill information detected")
-                        
-                        # Add button to retry analysis
-                        if st.button("Retry Analysis", key=f"retry_{sms['id']}"):
-                            with st.spinner("Analyzing SMS content..."):
-                                bill_data = groq_service.analyze_sms_content(sms["sender"], sms["content"])
-                                
-                                if bill_data:
-                                    # Add userId
-                                    bill_data["userId"] = user_id
-                                    
-                                    # Create bill
-                                    bill = storage.create_bill(bill_data)
-                                    
-                                    if bill:
-                                        # Update SMS record with bill ID
-                                        storage.update_sms_message(sms["id"], {
-                                            "processed": True,
-                                            "billId": bill["id"]
-                                        })
-                                        
-                                        st.success("Successfully detected bill information!")
-                                        st.rerun()
-                                    else:
-                                        st.error("Failed to create bill record.")
-                                else:
-                                    st.warning("Still could not detect bill information from this SMS.")
+                    st.success("Successfully detected bill information!")
+                    st.rerun()
+                else:
+                    st.error("Failed to create bill record.")
+            else:
+                st.warning("Still could not detect bill information from this SMS.")
@@ -2,20 +2,19 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 
-from models.storage import MemStorage
-from utils.date_utils import format_date, format_currency, format_frequency
+from models.storage import get_storage
+from utils.date_utils import parse_dates, format_date, format_currency, format_frequency, render_today, render_now
+from utils.currency import SUPPORTED_CURRENCIES, DEFAULT_CURRENCY
+from components.grid import selectable_grid
 
 def show():
     """Display the subscriptions page."""
     # Initialize storage
-    storage = MemStorage()
+    storage = get_storage()
     
     # Get user ID (in a real app, this would come from authentication)
     user_id = 1
     
-    # Get subscriptions for the user
-    subscriptions = storage.get_subscriptions(user_id)
-    
     # Get categories
     categories = {category["id"]: category for category in storage.get_categories()}
     
@@ -26,47 +25,8 @@ def show():
     tab1, tab2 = st.tabs(["All Subscriptions", "Add New Subscription"])
     
     with tab1:
-        # Display subscriptions
-        if not subscriptions:
-            st.info("No subscriptions found.")
-        else:
-            # Sort subscriptions by renewal date
-            subscriptions.sort(key=lambda x: x["renewalDate"])
-            
-            for sub in subscriptions:
-                col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
-                
-                # Subscription title and merchant
-                col1.markdown(f"<strong>{sub['title']}</strong><br><small>{sub['merchantName'] or 'N/A'}</small>", unsafe_allow_html=True)
-                
-                # Amount and frequency
-                frequency = format_frequency(sub["frequency"])
-                col2.markdown(f"{format_currency(sub['amount'])}<br><small>{frequency}</small>", unsafe_allow_html=True)
-                
-                # Renewal date
-                col3.write(format_date(sub["renewalDate"]))
-                
-                # Status
-                status_color = "#4CAF50" if sub["active"] else "#9E9E9E"
-                status_text = "Active" if sub["active"] else "Inactive"
-                col4.markdown(
-                    f'<span style="background-color: {status_color}20; color: {status_color}; '
-                    f'padding: 3px 10px; border-radius: 12px; font-size: 0.7rem; font-weight: 500;">'
-                    f'{status_text}</span>',
-                    unsafe_allow_html=True
-                )
-                
-                # Display subscription details in an expander
-                with st.expander("Details", expanded=False):
-                    st.markdown(f"**Description:** {sub['description'] or 'No description'}")
-                    st.markdown(f"**Category:** {categories[sub['categoryId']]['name']}")
-                    st.markdown(f"**Auto-renewal:** {'Yes' if sub['autoPay'] else 'No'}")
-                    
-                    if sub['lastUsed']:
-                        last_used = datetime.strftime(sub['lastUsed'], "%b %d, %Y") if isinstance(sub['lastUsed'], datetime) else sub['lastUsed']
-                        st.markdown(f"**Last used:** {last_used}")
-                
-                st.markdown("<hr>", unsafe_allow_html=True)
+        # A fragment, so selecting rows and batch actions rerun only the list
+        st.fragment(show_subscription_list)(storage, user_id, categories)
     
     with tab2:
         # Form for adding a new subscription
@@ -74,7 +34,17 @@ def show():
         
         # Subscription details
         title = st.text_input("Subscription Name", key="sub_title")
-        amount = st.number_input("Amount", min_value=0.01, value=9.99, step=0.01, key="sub_amount")
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            amount = st.number_input("Amount", min_value=0.01, value=9.99, step=0.01, key="sub_amount")
+        
+        with col2:
+            currency = st.selectbox(
+                "Currency",
+                options=SUPPORTED_CURRENCIES,
+                index=SUPPORTED_CURRENCIES.index(storage.get_display_currency(user_id)),
+                key="sub_currency"
+            )
         
         col1, col2 = st.columns(2)
         with col1:
@@ -85,7 +55,7 @@ def show():
             )
         
         with col2:
-            renewal_date = st.date_input("Next Renewal Date", datetime.now().date(), key="sub_renewal_date")
+            renewal_date = st.date_input("Next Renewal Date", render_today(), key="sub_renewal_date")
         
         col1, col2 = st.columns(2)
         with col1:
@@ -117,6 +87,7 @@ def show():
                 new_sub = {
                     "title": title,
                     "amount": float(amount),
+                    "currency": currency,
                     "frequency": frequency,
                     "renewalDate": renewal_date.strftime("%Y-%m-%d"),
                     "categoryId": category_id,
@@ -125,20 +96,97 @@ def show():
                     "description": description,
                     "merchantName": merchant,
                     "autoPay": auto_pay,
-                    "lastUsed": datetime.now()
+                    "lastUsed": render_now()
                 }
                 
-                # Debug output
-                st.write("Creating subscription with data:", new_sub)
-                
                 # Add to storage
                 sub = storage.create_subscription(new_sub)
                 
-                # Debug output
-                st.write("Created subscription:", sub)
-                
                 if sub:
                     st.success(f"Added new subscription: {title}")
                     # Don't use rerun, just show the success message
                 else:
                     st.error("Failed to add subscription.")
+
+def show_subscription_list(storage, user_id, categories):
+    """Display every subscription in one grid, with details and actions for the selection."""
+    subscriptions = storage.get_subscriptions(user_id)
+    
+    # Display subscriptions
+    if not subscriptions:
+        st.info("No subscriptions found.")
+    else:
+        # Sort subscriptions by renewal date
+        subscriptions.sort(key=lambda x: x["renewalDate"])
+        
+        # One grid for every subscription; selecting rows opens the details and actions
+        rows = [
+            {
+                "Status": "🟢 Active" if sub["active"] else "⚪ Inactive",
+                "Subscription": sub["title"],
+                "Provider": sub["merchantName"] or "N/A",
+                "Amount": sub["amount"],
+                "Currency": sub.get("currency") or DEFAULT_CURRENCY,
+                "Frequency": format_frequency(sub["frequency"]),
+                "Renewal Date": renewal_date,
+                "Auto-renewal": sub["autoPay"]
+            }
+            for sub, renewal_date in zip(subscriptions, parse_dates([sub["renewalDate"] for sub in subscriptions]))
+        ]
+        
+        selected_ids = selectable_grid(
+            pd.DataFrame(rows),
+            [sub["id"] for sub in subscriptions],
+            "subscriptions_table",
+            column_config={
+                "Subscription": st.column_config.TextColumn(width="medium"),
+                "Amount": st.column_config.NumberColumn(format="%.2f"),
+                "Renewal Date": st.column_config.DateColumn(format="MMM DD, YYYY"),
+                "Auto-renewal": st.column_config.CheckboxColumn()
+            }
+        )
+        
+        subscriptions_by_id = {sub["id"]: sub for sub in subscriptions}
+        selected = [subscriptions_by_id[sub_id] for sub_id in selected_ids]
+        if not selected:
+            st.caption("Select subscriptions to see their details or deactivate them.")
+        else:
+            show_subscription_actions(storage, selected, categories)
+
+def show_subscription_actions(storage, selected, categories):
+    """Display the selected subscriptions' details and batch actions."""
+    if len(selected) == 1:
+        sub = selected[0]
+        frequency = format_frequency(sub["frequency"])
+        st.markdown(f"#### {sub['title']} - {format_currency(sub['amount'], sub.get('currency'))} {frequency.lower()}")
+        st.markdown(f"**Renews:** {format_date(sub['renewalDate'])}")
+        st.markdown(f"**Description:** {sub['description'] or 'No description'}")
+        st.markdown(f"**Category:** {categories[sub['categoryId']]['name']}")
+        st.markdown(f"**Auto-renewal:** {'Yes' if sub['autoPay'] else 'No'}")
+        
+        if sub['lastUsed']:
+            last_used = datetime.strftime(sub['lastUsed'], "%b %d, %Y") if isinstance(sub['lastUsed'], datetime) else sub['lastUsed']
+            st.markdown(f"**Last used:** {last_used}")
+    else:
+        st.markdown(f"#### {len(selected)} subscriptions selected")
+    
+    # Batch actions run as callbacks, so the grid redraws with the change
+    sub_ids = [sub["id"] for sub in selected]
+    col1, col2 = st.columns(2)
+    with col1:
+        st.button(
+            "Deactivate",
+            key="subs_deactivate",
+            disabled=not any(sub["active"] for sub in selected),
+            on_click=storage.update_subscriptions,
+            args=(sub_ids, {"active": False})
+        )
+    
+    with col2:
+        st.button(
+            "Activate",
+            key="subs_activate",
+            disabled=all(sub["active"] for sub in selected),
+            on_click=storage.update_subscriptions,
+            args=(sub_ids, {"active": True})
+        )
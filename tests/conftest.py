@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+# Run from any directory: the app imports its packages from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def storage():
+    """A MemStorage on a fresh session holding the demo data."""
+    import streamlit as st
+    from models.storage import MemStorage
+
+    for key in list(st.session_state):
+        del st.session_state[key]
+    return MemStorage()
@@ -0,0 +1,74 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from utils.date_utils import (add_months, days_until, due_date_statuses, format_dates, frozen_clock,
+                              relative_time_strings, render_today, set_render_clock, to_monthly_amount)
+
+TODAY = date(2025, 3, 10)
+
+
+def shifted(*days):
+    return [(TODAY + timedelta(days=d)).isoformat() for d in days]
+
+
+def legacy_status(due_date_str):
+    """The original per-row get_due_date_status, with the clock fixed."""
+    days = (datetime.strptime(due_date_str, "%Y-%m-%d").date() - TODAY).days
+    if days < 0:
+        return "Overdue"
+    if days <= 3:
+        return "Due Soon"
+    if days <= 7:
+        return "Upcoming"
+    return "Scheduled"
+
+
+def test_due_date_statuses_match_the_per_row_rules():
+    dates = shifted(*range(-10, 12))
+    assert [status["label"] for status in due_date_statuses(dates, TODAY)] == [legacy_status(d) for d in dates]
+    assert due_date_statuses(shifted(-1), TODAY)[0] == {"label": "Overdue", "color": "red", "severity": 3}
+
+
+def test_days_until():
+    assert days_until(shifted(-2, 0, 5), TODAY).tolist() == [-2, 0, 5]
+
+
+def test_format_dates():
+    assert format_dates(["2024-01-05", "2025-12-31", "2024-02-29"]) == ["Jan 05, 2024", "Dec 31, 2025", "Feb 29, 2024"]
+
+
+@pytest.mark.parametrize("offset, expected", [
+    (0, "Today"),
+    (1, "Tomorrow"),
+    (-1, "Yesterday"),
+    (-3, "3 days ago"),
+    (5, "in 5 days"),
+    (7, "in 1 week"),
+    (-14, "2 weeks ago"),
+    (45, "in 1 month"),
+    (-400, "1 year ago"),
+    (800, "in 2 years"),
+])
+def test_relative_time_strings(offset, expected):
+    assert relative_time_strings(shifted(offset), TODAY) == [expected]
+
+
+def test_add_months_clamps_the_day():
+    assert add_months(date(2025, 1, 31), 1) == date(2025, 2, 28)
+    assert add_months(date(2024, 3, 31), -1) == date(2024, 2, 29)
+    assert add_months(date(2025, 11, 15), 3) == date(2026, 2, 15)
+    assert add_months(date(2025, 5, 31), -12) == date(2024, 5, 31)
+
+
+def test_to_monthly_amount():
+    assert to_monthly_amount(120, "yearly") == 10
+    assert to_monthly_amount(30, "quarterly") == 10
+    assert to_monthly_amount(10, "weekly") == pytest.approx(43.3)
+    assert to_monthly_amount(10, "monthly") == 10
+
+
+def test_frozen_clock_survives_new_snapshots():
+    with frozen_clock(datetime(2025, 3, 10, 9)):
+        set_render_clock()
+        assert render_today() == TODAY
@@ -0,0 +1,53 @@
+from datetime import date
+
+import pytest
+
+from ai.features import summarize_user_data
+from utils.currency import conversion_factor
+
+TODAY = date(2025, 3, 20)
+
+
+def test_summary_converts_amounts_to_the_user_currency():
+    user_data = {
+        "currency": "USD",
+        "categories": [{"id": 1, "name": "Housing"}],
+        "bills": [
+            {"id": 1, "title": "Rent", "amount": 1000.0, "currency": "USD", "dueDate": "2025-03-01", "categoryId": 1, "paid": False},
+            {"id": 2, "title": "Flat", "amount": 1000.0, "currency": "EUR", "dueDate": "2025-03-05", "categoryId": 1, "paid": False}
+        ],
+        "subscriptions": [
+            {"id": 1, "title": "Music", "amount": 10.0, "currency": "EUR", "frequency": "monthly", "active": True}
+        ]
+    }
+    summary = summarize_user_data(user_data, today=TODAY)
+
+    eur_bill = 1000 * conversion_factor("EUR", "USD", "2025-03-05")
+    assert summary["currency"] == "USD"
+    assert summary["categoryMonthlyTotals"]["Housing"]["2025-03"] == pytest.approx(1000 + eur_bill, abs=0.01)
+    assert summary["overdueTotal"] == pytest.approx(1000 + eur_bill, abs=0.01)
+    assert summary["monthlySubscriptionCost"] == pytest.approx(10 * conversion_factor("EUR", "USD"), abs=0.01)
+
+
+def test_summary_size_does_not_grow_with_bills():
+    bills = [
+        {"id": i, "title": f"Payee {i % 50}", "amount": 10.0 + i % 7, "dueDate": f"2025-0{1 + i % 3}-1{i % 10}", "categoryId": i % 4}
+        for i in range(2000)
+    ]
+    summary = summarize_user_data({"bills": bills, "subscriptions": []}, top_n=5, today=TODAY)
+    assert len(summary["topOverdueBills"]) == 5
+    assert len(summary["priceChanges"]) <= 5
+    assert len(summary["categoryMonthlyTotals"]) == 4
+
+
+def test_bills_without_a_due_date_are_skipped():
+    bills = [
+        {"id": 1, "title": "Power", "amount": 80.0, "dueDate": "2025-03-01", "categoryId": 1, "paid": False},
+        {"id": 2, "title": "Power", "amount": 95.0, "dueDate": None, "categoryId": 1, "paid": False},
+        {"id": 3, "title": "Water", "amount": 20.0, "categoryId": 1, "paid": False},
+        {"id": 4, "title": "Water", "amount": 25.0, "dueDate": "soon", "categoryId": 1, "paid": False}
+    ]
+    summary = summarize_user_data({"bills": bills, "subscriptions": []}, today=TODAY)
+    assert summary["categoryMonthlyTotals"] == {"1": {"2025-03": 80.0}}
+    assert summary["overdueCount"] == 1
+    assert summary["priceChanges"] == []
@@ -0,0 +1,26 @@
+from types import SimpleNamespace
+
+import streamlit as st
+
+from components.grid import remember_selection
+
+
+def select_rows(key, rows):
+    st.session_state[key] = SimpleNamespace(selection=SimpleNamespace(rows=rows))
+    remember_selection(key)
+
+
+def test_selected_rows_map_to_the_ids_they_were_shown_with():
+    st.session_state["grid_ids"] = [7, 3, 9]
+    select_rows("grid", [0, 2])
+    assert st.session_state["grid_selected"] == [7, 9]
+
+    # The data changing later does not move the stored selection
+    st.session_state["grid_ids"] = [1, 7, 3, 9]
+    assert st.session_state["grid_selected"] == [7, 9]
+
+
+def test_rows_past_the_shown_grid_are_dropped():
+    st.session_state["grid_ids"] = [4]
+    select_rows("grid", [0, 3])
+    assert st.session_state["grid_selected"] == [4]
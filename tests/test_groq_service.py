@@ -0,0 +1,154 @@
+import json
+
+import httpx
+import pytest
+
+from ai.groq_service import GroqService
+from ai.resilience import CircuitBreaker, RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def completion(content):
+    return {
+        "id": "chatcmpl-1",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "test",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}]
+    }
+
+
+def make_service(responses, clock=None):
+    """A service whose API answers with ``responses`` in order: (status, body) pairs."""
+    responses = list(responses)
+
+    def handler(request):
+        status, body = responses.pop(0)
+        return httpx.Response(status, json=body)
+
+    service = GroqService(
+        api_key="test",
+        base_url="http://groq.test",
+        http_client=httpx.Client(transport=httpx.MockTransport(handler))
+    )
+    service.cassette = None
+    service.max_retries = 0
+    service.circuit_breaker = CircuitBreaker(failure_threshold=5, reset_timeout=10, clock=clock or FakeClock())
+    service.rate_limiter = RateLimiter(1000, 10 ** 9, sleep=lambda seconds: None)
+    return service
+
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+SERVER_ERROR = (500, {"error": {"message": "boom"}})
+BAD_REQUEST = (400, {"error": {"message": "bad"}})
+
+
+def test_success_returns_content():
+    service = make_service([(200, completion("hi"))])
+    assert service.send_request(MESSAGES) == "hi"
+    assert service.get_metrics()["successes"] == 1
+
+
+def test_server_errors_are_retried(monkeypatch):
+    monkeypatch.setattr("ai.groq_service.time.sleep", lambda seconds: None)
+    service = make_service([SERVER_ERROR, SERVER_ERROR, (200, completion("ok"))])
+    service.max_retries = 2
+    assert service.send_request(MESSAGES) == "ok"
+    assert service.get_metrics()["retries"] == 2
+
+
+def test_every_attempt_goes_through_the_rate_limiter(monkeypatch):
+    monkeypatch.setattr("ai.groq_service.time.sleep", lambda seconds: None)
+    service = make_service([SERVER_ERROR, SERVER_ERROR, (200, completion("ok"))])
+    service.max_retries = 2
+    acquired = []
+    service.rate_limiter.acquire = lambda tokens=0: acquired.append(tokens) or 0.0
+    service.send_request(MESSAGES)
+    assert len(acquired) == 3
+
+
+def test_client_error_is_not_retried():
+    service = make_service([BAD_REQUEST])
+    service.max_retries = 3
+    assert service.send_request(MESSAGES) is None
+    assert service.get_metrics()["requests"] == 1
+
+
+def test_client_error_on_half_open_trial_closes_breaker():
+    clock = FakeClock()
+    service = make_service([SERVER_ERROR] * 5 + [BAD_REQUEST, (200, completion("back"))], clock)
+    for _ in range(5):
+        assert service.send_request(MESSAGES) is None
+    assert service.circuit_breaker.state == "open"
+
+    clock.now = 10
+    assert service.send_request(MESSAGES) is None
+    assert service.circuit_breaker.state == "closed"
+    assert service.send_request(MESSAGES) == "back"
+    assert "circuitRejected" not in service.get_metrics()
+
+
+def test_unexpected_exception_settles_half_open_trial():
+    clock = FakeClock()
+    service = make_service([SERVER_ERROR] * 5, clock)
+    for _ in range(5):
+        service.send_request(MESSAGES)
+    clock.now = 10
+
+    def broken(**kwargs):
+        raise RuntimeError("unexpected")
+
+    create = service.client.chat.completions.create
+    service.client.chat.completions.create = broken
+    with pytest.raises(RuntimeError):
+        service.send_request(MESSAGES)
+    assert not service.circuit_breaker.trial_in_flight
+    assert service.circuit_breaker.state == "open"
+
+    # After the cool-down a new trial is let through again
+    clock.now = 20
+    service.client.chat.completions.create = create
+    assert service.circuit_breaker.allow()
+
+
+def test_open_breaker_rejects_without_calling_the_api():
+    service = make_service([SERVER_ERROR] * 5)
+    for _ in range(5):
+        service.send_request(MESSAGES)
+    assert service.send_request(MESSAGES) is None
+    assert service.get_metrics()["circuitRejected"] == 1
+    assert service.get_metrics()["requests"] == 5
+
+
+def test_sms_bill_without_due_date_is_not_returned():
+    answer = '{"title": "Electricity", "amount": 40, "dueDate": null}'
+    service = make_service([(200, completion(answer))])
+    assert service.analyze_sms_content("AX-POWER", "Your electricity bill of Rs. 400 is generated.") is None
+    assert service.get_metrics()["schemaRejected"] == 1
+
+
+def test_sms_bill_falls_back_to_local_due_date():
+    answer = '{"title": "Electricity", "amount": 40, "dueDate": null}'
+    service = make_service([(200, completion(answer))])
+    bill = service.analyze_sms_content("AX-POWER", "Your electricity bill of Rs. 400 is due on 2025-01-15.")
+    assert bill["dueDate"] == "2025-01-15"
+    assert bill["amount"] == 400.0
+
+
+def test_suggestion_prompt_does_not_serialize_the_raw_data(monkeypatch):
+    dumped = []
+    real_dumps = json.dumps
+    monkeypatch.setattr("ai.groq_service.json.dumps", lambda value, **kwargs: dumped.append(value) or real_dumps(value, **kwargs))
+    service = make_service([])
+    user_data = {"bills": [], "subscriptions": [], "categories": [], "currency": "USD"}
+    messages = service._suggestion_messages(user_data)
+    assert user_data not in dumped
+    assert json.loads(messages[1]["content"])["currency"] == "USD"
+    assert service.get_metrics()["suggestionPromptTokensSent"] > 0
@@ -0,0 +1,82 @@
+import os
+import time
+
+from models.inbox import Inbox
+
+MBOX = b"""From billing@power.example Mon Mar 10 09:00:00 2025
+From: Power Co <billing@power.example>
+Subject: Electricity bill
+Date: Mon, 10 Mar 2025 09:00:00 +0000
+
+Your bill of Rs. 1,200 is due on 18-03-2025.
+From water@city.example Tue Mar 11 09:00:00 2025
+From: City Water <water@city.example>
+Subject: Water bill
+Date: Tue, 11 Mar 2025 09:00:00 +0000
+
+Your bill of Rs. 300 is due on 20-03-2025.
+"""
+
+
+def settle(path):
+    old = time.time() - 60
+    os.utime(path, (old, old))
+
+
+def test_mbox_poll_stopping_after_one_message_does_not_reread_it(tmp_path):
+    directory = tmp_path / "inbox"
+    directory.mkdir()
+    mailbox = directory / "bills.mbox"
+    mailbox.write_bytes(MBOX)
+    inbox = Inbox(directory=str(directory), path=str(tmp_path / "inbox.sqlite3"))
+
+    # Still being written: only the message followed by a "From " line is taken
+    assert inbox.poll() == 1
+    settle(mailbox)
+    assert inbox.poll() == 1
+    assert inbox.poll() == 0
+
+    senders = [message["sender"] for message in inbox.take()]
+    assert senders == ["Power Co", "City Water"]
+
+
+def test_csv_bodies_may_span_lines(tmp_path):
+    directory = tmp_path / "inbox"
+    directory.mkdir()
+    export = directory / "sms.csv"
+    export.write_text(
+        'address,body,date\n'
+        'AD-BESCOM,"Electricity bill of Rs. 1,200\nis due on 05/03/2025",1741564800000\n'
+        'AD-AIRTEL,"Bill of Rs. 499\nis due on 15/03/2025',
+        encoding="utf-8"
+    )
+    inbox = Inbox(directory=str(directory), path=str(tmp_path / "inbox.sqlite3"))
+
+    # The second record is cut off inside its quoted body
+    assert inbox.poll() == 1
+    with open(export, "a", encoding="utf-8") as handle:
+        handle.write('",1741651200000\n')
+    assert inbox.poll() == 1
+
+    messages = inbox.take()
+    assert [message["sender"] for message in messages] == ["AD-BESCOM", "AD-AIRTEL"]
+    assert messages[0]["content"] == "Electricity bill of Rs. 1,200\nis due on 05/03/2025"
+    assert messages[1]["content"] == "Bill of Rs. 499\nis due on 15/03/2025"
+
+
+def test_json_array_exports_are_read_once_settled(tmp_path):
+    directory = tmp_path / "inbox"
+    directory.mkdir()
+    export = directory / "sms.json"
+    export.write_text(
+        '[{"address": "AD-BESCOM", "body": "Electricity bill of Rs. 1,200 is due on 05/03/2025"},\n'
+        ' {"address": "AD-AIRTEL", "body": "Bill of Rs. 499 is due on 15/03/2025"}]\n',
+        encoding="utf-8"
+    )
+    inbox = Inbox(directory=str(directory), path=str(tmp_path / "inbox.sqlite3"))
+
+    assert inbox.poll() == 0
+    settle(export)
+    assert inbox.poll() == 2
+    assert inbox.poll() == 0
+    assert [message["sender"] for message in inbox.take()] == ["AD-BESCOM", "AD-AIRTEL"]
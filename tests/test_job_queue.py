@@ -0,0 +1,59 @@
+import time
+
+from models.job_queue import JobQueue
+
+
+def wait_for(queue, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get_job(job_id)
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_jobs_run_on_workers(tmp_path):
+    queue = JobQueue(path=str(tmp_path / "jobs.sqlite3"), handlers={"double": lambda payload: payload["n"] * 2}, workers=2)
+    queue.start()
+    try:
+        done = wait_for(queue, queue.submit("double", {"n": 21}, "session-a"))
+        failed = wait_for(queue, queue.submit("missing", {}, "session-a"))
+    finally:
+        queue.stop()
+    assert done["status"] == "done" and done["result"] == 42
+    assert failed["status"] == "failed"
+    assert [job["id"] for job in queue.get_jobs("session-a", unapplied_only=True)] == [done["id"], failed["id"]]
+    assert queue.get_jobs("session-b") == []
+
+
+def test_queue_rejects_jobs_when_full(tmp_path):
+    queue = JobQueue(path=str(tmp_path / "jobs.sqlite3"), max_depth=1)
+    assert queue.submit("work", {}, "session-a") is not None
+    assert queue.submit("work", {}, "session-a") is None
+
+
+def test_unfinished_jobs_survive_a_restart(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    queue = JobQueue(path=path, handlers={"work": lambda payload: payload["n"]})
+    queue.start()
+    try:
+        finished = wait_for(queue, queue.submit("work", {"n": 1}, "old-session"))
+    finally:
+        queue.stop()
+    interrupted = queue.submit("work", {"n": 2}, "old-session")
+    queued = queue.submit("work", {"n": 3}, "old-session")
+    with queue.lock:
+        assert queue._claim()["id"] == interrupted
+    assert queue.get_job(interrupted)["status"] == "running"
+
+    # A restart opens the same database
+    restarted = JobQueue(path=path, handlers={"work": lambda payload: payload["n"]})
+    assert restarted.get_job(interrupted)["status"] == "queued"
+    restarted.start()
+    try:
+        results = [wait_for(restarted, job_id)["result"] for job_id in (interrupted, queued)]
+    finally:
+        restarted.stop()
+    assert results == [2, 3]
+    assert [job["id"] for job in restarted.get_jobs("old-session", unapplied_only=True)] == [finished["id"], interrupted, queued]
@@ -0,0 +1,48 @@
+import pytest
+
+from ai.json_stream import IncrementalJsonParser, extract_json, iter_json_values, unwrap_list
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_array_elements_are_yielded_whatever_the_chunking(size):
+    text = 'Here you go:\n```json\n[{"a": 1, "b": [1, 2]}, {"c": "x, y ] }"}, 3]\n```'
+    assert list(iter_json_values(chunked(text, size))) == [{"a": 1, "b": [1, 2]}, {"c": "x, y ] }"}, 3]
+
+
+def test_elements_complete_as_soon_as_their_chunk_arrives():
+    parser = IncrementalJsonParser()
+    assert parser.feed('[{"a": 1}') == []
+    assert parser.feed(', {"b"') == [{"a": 1}]
+    assert parser.feed(': 2}]') == [{"b": 2}]
+    assert parser.done
+
+
+def test_object_members_are_yielded_as_pairs():
+    assert list(iter_json_values(['{"suggestions": [1, 2], ', '"n": "a\\"b"}'])) == [("suggestions", [1, 2]), ("n", 'a"b')]
+
+
+def test_malformed_elements_are_skipped():
+    assert list(iter_json_values(['[{"a": 1}, {oops}, {"b": 2}]'])) == [{"a": 1}, {"b": 2}]
+
+
+def test_text_after_the_container_is_ignored():
+    assert list(iter_json_values(['[1]', ' trailing [2]'])) == [1]
+
+
+def test_extract_json():
+    assert extract_json('{"a": 1}') == ({"a": 1}, True)
+    assert extract_json('Sure!\n```json\n[1, 2]\n```') == ([1, 2], False)
+    assert extract_json('see [not json] then {"b": 2}') == ({"b": 2}, False)
+    with pytest.raises(ValueError):
+        extract_json("no json here")
+
+
+def test_unwrap_list():
+    assert unwrap_list([1]) == [1]
+    assert unwrap_list({"suggestions": [1, 2]}) == [1, 2]
+    assert unwrap_list({"title": "x"}) == [{"title": "x"}]
+    assert unwrap_list("text") == []
@@ -0,0 +1,95 @@
+import pytest
+
+from ai.resilience import CircuitBreaker, RateLimiter, TokenBucket, backoff_delay, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_after_threshold():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=clock)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_breaker_lets_one_trial_through_when_half_open():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_breaker_closes_after_successful_trial():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_breaker_reopens_after_failed_trial():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=10, clock=clock)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now = 10
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock.now = 20
+    assert breaker.allow()
+
+
+def test_token_bucket_reports_wait_and_refills():
+    clock = FakeClock()
+    bucket = TokenBucket(capacity=2, rate=1, clock=clock)
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(1.0)
+    clock.now = 1
+    assert bucket.try_acquire() == 0
+
+
+def test_token_bucket_clamps_oversized_requests():
+    bucket = TokenBucket(capacity=5, rate=1, clock=FakeClock())
+    assert bucket.try_acquire(50) == 0
+    assert bucket.tokens == 0
+
+
+def test_rate_limiter_sleeps_until_quota_frees():
+    sleeps = []
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=600, sleep=sleeps.append)
+    limiter.requests.tokens = 0
+    limiter.requests.try_acquire = lambda amount=1, waits=[1.0, 0.0]: waits.pop(0)
+    assert limiter.acquire() == 1.0
+    assert sleeps == [1.0]
+
+
+def test_backoff_delay_is_capped_and_honors_retry_after():
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, base=0.5, cap=4) <= 4
+    assert backoff_delay(0, base=0.001, retry_after=3) == 3
+    assert backoff_delay(0, cap=2, retry_after=60) <= 2
+
+
+def test_parse_retry_after():
+    assert parse_retry_after({"retry-after": "2.5"}) == 2.5
+    assert parse_retry_after({"Retry-After": "soon"}) is None
+    assert parse_retry_after(None) is None
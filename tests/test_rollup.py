@@ -0,0 +1,150 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+import streamlit as st
+
+from models.rollup import add_to_rollup, build_rollup, compare_rollups, summarize
+from utils.currency import convert_records
+from utils.date_utils import to_monthly_amount
+
+CURRENCIES = ("USD", "EUR", "INR", "JPY")
+FREQUENCIES = ("monthly", "yearly", "quarterly", "weekly")
+
+
+def make_records(seed=7, bill_count=500, subscription_count=30):
+    rng = random.Random(seed)
+    start = date(2023, 1, 1)
+    bills = [
+        {
+            "id": i,
+            "userId": rng.choice((1, 2)),
+            "categoryId": rng.randint(1, 5),
+            "amount": round(rng.uniform(1, 500), 2),
+            "currency": rng.choice(CURRENCIES),
+            "dueDate": (start + timedelta(days=rng.randint(0, 900))).isoformat()
+        }
+        for i in range(bill_count)
+    ]
+    subscriptions = [
+        {
+            "id": i,
+            "userId": rng.choice((1, 2)),
+            "categoryId": rng.randint(1, 5),
+            "amount": round(rng.uniform(1, 50), 2),
+            "currency": rng.choice(CURRENCIES),
+            "frequency": rng.choice(FREQUENCIES),
+            "active": rng.random() < 0.7
+        }
+        for i in range(subscription_count)
+    ]
+    return bills, subscriptions
+
+
+def per_row_summary(bills, subscriptions, user_id, start_month, end_month, currency):
+    """The per-row computation the cube replaced: convert every record, then group."""
+    months, categories, monthly_subscriptions = {}, {}, {}
+    for bill in convert_records([b for b in bills if b["userId"] == user_id], currency, "dueDate"):
+        month = bill["dueDate"][:7]
+        if start_month <= month <= end_month:
+            months[month] = months.get(month, 0) + bill["amount"]
+            categories[bill["categoryId"]] = categories.get(bill["categoryId"], 0) + bill["amount"]
+    active = [s for s in subscriptions if s["userId"] == user_id and s["active"]]
+    for sub in convert_records(active, currency):
+        cost = to_monthly_amount(sub["amount"], sub["frequency"])
+        monthly_subscriptions[sub["categoryId"]] = monthly_subscriptions.get(sub["categoryId"], 0) + cost
+    return {"months": months, "categories": categories, "subscriptions": monthly_subscriptions, "subscriptionCount": len(active)}
+
+
+def assert_summaries_match(found, expected):
+    for field in ("months", "categories", "subscriptions"):
+        assert found[field].keys() == expected[field].keys()
+        for key, amount in expected[field].items():
+            assert found[field][key] == pytest.approx(amount, rel=1e-9)
+    assert found["subscriptionCount"] == expected["subscriptionCount"]
+
+
+@pytest.mark.parametrize("currency", ["USD", "EUR", "GBP", "INR"])
+@pytest.mark.parametrize("start_month, end_month", [("2023-01", "2025-12"), ("2024-02", "2024-07"), ("2024-05", "2024-05")])
+def test_summary_matches_the_per_row_computation(currency, start_month, end_month):
+    bills, subscriptions = make_records()
+    rollup = build_rollup(bills, subscriptions)
+    for user_id in (1, 2):
+        found = summarize(rollup[user_id], start_month, end_month, currency)
+        expected = per_row_summary(bills, subscriptions, user_id, start_month, end_month, currency)
+        assert_summaries_match(found, expected)
+
+
+def test_removing_records_empties_their_cells():
+    bills, subscriptions = make_records(bill_count=50, subscription_count=10)
+    rollup = build_rollup(bills, subscriptions)
+    for bill in bills:
+        add_to_rollup(rollup, bill, "bill", -1)
+    for sub in subscriptions:
+        add_to_rollup(rollup, sub, "subscription", -1)
+    assert all(not cells for cells in rollup.values())
+
+
+def test_compare_rollups_reports_differing_cells():
+    bills, subscriptions = make_records(bill_count=50, subscription_count=10)
+    rollup = build_rollup(bills, subscriptions)
+    assert compare_rollups(rollup, build_rollup(bills, subscriptions)) == []
+    add_to_rollup(rollup, bills[0], "bill")
+    mismatches = compare_rollups(rollup, build_rollup(bills, subscriptions))
+    assert len(mismatches) == 1 and mismatches[0][0] == bills[0]["userId"]
+
+
+def test_storage_keeps_the_cube_in_step_with_mutations(storage):
+    rng = random.Random(3)
+    bill_ids, sub_ids = [], []
+    for _ in range(60):
+        action = rng.random()
+        if action < 0.4 or not bill_ids:
+            bill = storage.create_bill({
+                "userId": 1,
+                "title": "Bill",
+                "categoryId": rng.randint(1, 5),
+                "amount": round(rng.uniform(1, 300), 2),
+                "currency": rng.choice(CURRENCIES),
+                "dueDate": (date(2025, 1, 1) + timedelta(days=rng.randint(0, 365))).isoformat(),
+                "paid": False
+            })
+            bill_ids.append(bill["id"])
+        elif action < 0.6:
+            storage.update_bill(rng.choice(bill_ids), {
+                "amount": round(rng.uniform(1, 300), 2),
+                "dueDate": (date(2025, 1, 1) + timedelta(days=rng.randint(0, 365))).isoformat(),
+                "currency": rng.choice(CURRENCIES)
+            })
+        elif action < 0.7:
+            storage.delete_bill(bill_ids.pop(rng.randrange(len(bill_ids))))
+        elif action < 0.85 or not sub_ids:
+            sub = storage.create_subscription({
+                "userId": 1,
+                "title": "Plan",
+                "categoryId": rng.randint(1, 5),
+                "amount": round(rng.uniform(1, 30), 2),
+                "currency": rng.choice(CURRENCIES),
+                "frequency": rng.choice(FREQUENCIES),
+                "active": True
+            })
+            sub_ids.append(sub["id"])
+        elif action < 0.95:
+            storage.update_subscriptions([rng.choice(sub_ids)], {"active": rng.random() < 0.5, "frequency": rng.choice(FREQUENCIES)})
+        else:
+            storage.delete_subscription(sub_ids.pop(rng.randrange(len(sub_ids))))
+
+    assert storage.check_rollup() == []
+    found = storage.get_spending_rollup(1, "2025-01", "2025-12")
+    expected = per_row_summary(
+        list(st.session_state.bills.values()), list(st.session_state.subscriptions.values()), 1, "2025-01", "2025-12", found["currency"]
+    )
+    assert_summaries_match(found, expected)
+
+
+def test_check_rollup_repairs_a_corrupted_cube(storage):
+    version = storage.get_data_version()
+    st.session_state.rollup[1][("2020-01", 1, "bill")] = [10.0, 1]
+    assert len(storage.check_rollup(repair=True)) == 1
+    assert storage.check_rollup() == []
+    assert storage.get_data_version() > version
@@ -0,0 +1,67 @@
+from datetime import datetime
+
+from ai.schemas import (SMS_BILL_SCHEMA, SUGGESTION_SCHEMA, coerce_amount, coerce_currency, coerce_date,
+                        coerce_id, validate_record, validate_records)
+
+
+def test_coerce_amount():
+    assert coerce_amount(12) == 12.0
+    assert coerce_amount("$1,234.50") == 1234.5
+    assert coerce_amount("Rs. 499") == 499.0
+    assert coerce_amount(True) is None
+    assert coerce_amount("free") is None
+
+
+def test_coerce_currency():
+    assert coerce_currency("inr") == "INR"
+    assert coerce_currency("₹") == "INR"
+    assert coerce_currency("XYZ") is None
+    assert coerce_currency("") is None
+
+
+def test_coerce_date():
+    assert coerce_date("2025-01-15") == "2025-01-15"
+    assert coerce_date("2025-01-15T10:30:00Z") == "2025-01-15"
+    assert coerce_date(datetime(2025, 3, 2, 8)) == "2025-03-02"
+    assert coerce_date("not a date") is None
+    assert coerce_date(None) is None
+
+
+def test_coerce_id():
+    assert coerce_id("7") == 7
+    assert coerce_id(3.0) == 3
+    assert coerce_id(3.5) is None
+    assert coerce_id(False) is None
+
+
+def test_validate_record_coerces_and_keeps_only_schema_fields():
+    record = validate_record(
+        {"title": " Electricity ", "amount": "1,200", "currency": "usd", "dueDate": "2025-01-15", "extra": 1},
+        SMS_BILL_SCHEMA
+    )
+    assert record == {
+        "title": "Electricity",
+        "amount": 1200.0,
+        "currency": "USD",
+        "dueDate": "2025-01-15",
+        "merchantName": None,
+        "description": None,
+        "categoryId": None
+    }
+
+
+def test_sms_bill_requires_a_valid_due_date():
+    bill = {"title": "Electricity", "amount": 10}
+    assert validate_record(bill, SMS_BILL_SCHEMA) is None
+    assert validate_record(dict(bill, dueDate=None), SMS_BILL_SCHEMA) is None
+    assert validate_record(dict(bill, dueDate="soon"), SMS_BILL_SCHEMA) is None
+
+
+def test_validate_records_drops_invalid_entries():
+    suggestions = [
+        {"type": "Savings", "title": "Cancel", "description": "Save money"},
+        {"type": "unknown", "title": "Bad", "description": "Dropped"},
+        "not a dict"
+    ]
+    assert [s["type"] for s in validate_records(suggestions, SUGGESTION_SCHEMA)] == ["savings"]
+    assert validate_records({"type": "savings"}, SUGGESTION_SCHEMA) == []
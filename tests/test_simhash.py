@@ -0,0 +1,52 @@
+import random
+
+from ai.simhash import BITS, SimHashIndex, hamming_distance, simhash
+
+
+def flip(fingerprint, bits):
+    for bit in bits:
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+def test_reminders_stay_close_to_the_original():
+    original = simhash("Your Power Co bill of Rs 1200.50 for account 44120 is due on 5 Mar.")
+    reminder = simhash("Final reminder: Your Power Co bill of Rs 1200.50 for account 44120 is due on 5 Mar.")
+    other = simhash("Your Power Co bill of Rs 980.00 for account 51877 is due on 9 Apr.")
+    assert hamming_distance(original, reminder) <= 5
+    assert hamming_distance(original, other) > 5
+
+
+def test_every_fingerprint_within_max_distance_is_found():
+    rng = random.Random(11)
+    index = SimHashIndex(max_distance=5)
+    for i in range(200):
+        fingerprint = rng.getrandbits(BITS)
+        index.add("user", fingerprint, 0, i)
+        near = flip(fingerprint, rng.sample(range(BITS), rng.randint(0, 5)))
+        assert i in [payload for _, payload in index.query("user", near, 0)]
+        far = flip(fingerprint, rng.sample(range(BITS), 12))
+        assert i not in [payload for _, payload in index.query("user", far, 0)]
+
+
+def test_matches_are_limited_to_their_scope_and_nearest_first():
+    index = SimHashIndex(max_distance=5)
+    index.add("a", 0b1111, 0, "three")
+    index.add("a", 0b0001, 0, "one")
+    index.add("b", 0, 0, "other scope")
+    assert index.query("a", 0, 0) == [(1, "one"), (4, "three")]
+
+
+def test_entries_expire_behind_the_newest_timestamp():
+    index = SimHashIndex(window=100)
+    index.add("user", 1, 0, "old")
+    index.add("user", 1, 90, "recent")
+    assert [payload for _, payload in index.query("user", 1, 95)] == ["old", "recent"]
+
+    index.add("user", 2, 150, "newest")
+    assert len(index) == 2
+    # A late message with an older timestamp neither revives expired entries
+    # nor matches entries further away than the window
+    assert [payload for _, payload in index.query("user", 1, 20)] == ["recent"]
+    assert [payload for _, payload in index.query("user", 1, 200)] == ["newest"]
+    assert len(index) == 1
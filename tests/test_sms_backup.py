@@ -0,0 +1,34 @@
+import io
+import json
+
+from utils import sms_backup
+from utils.sms_backup import detect_format, iter_backup
+
+MESSAGES = [
+    {"address": "AD-BESCOM", "body": "Electricity bill of Rs. 1,200 is due on 05/03/2025", "date": 1741564800000},
+    {"address": "AD-AIRTEL", "body": "Bill of Rs. 499, \"final\" notice [due 15/03/2025]", "date": 1741651200000},
+    {"address": "AD-EMPTY", "body": ""},
+]
+
+
+def read(data, backup_format):
+    return list(iter_backup(io.BytesIO(data), backup_format))
+
+
+def test_json_exports_are_read_as_arrays():
+    assert detect_format("backup.json") == "json"
+    assert detect_format("backup.ndjson") == "jsonl"
+
+
+def test_json_array_is_streamed_in_chunks(monkeypatch):
+    monkeypatch.setattr(sms_backup, "JSON_CHUNK_SIZE", 7)
+    data = ("\ufeff\n  " + json.dumps(MESSAGES, indent=2)).encode("utf-8")
+    messages = read(data, "json")
+    assert [message["sender"] for message in messages] == ["AD-BESCOM", "AD-AIRTEL"]
+    assert messages[1]["content"] == MESSAGES[1]["body"]
+
+
+def test_json_lines_with_a_json_extension_still_import(monkeypatch):
+    monkeypatch.setattr(sms_backup, "JSON_CHUNK_SIZE", 10)
+    data = "\n".join(json.dumps(message) for message in MESSAGES).encode("utf-8")
+    assert [message["sender"] for message in read(data, "json")] == ["AD-BESCOM", "AD-AIRTEL"]
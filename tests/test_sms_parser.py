@@ -0,0 +1,57 @@
+from datetime import date
+
+import pytest
+
+from ai.sms_parser import (extract_amount, extract_currency, extract_due_date, looks_like_bill,
+                           merchant_from_sender, parse_bill_sms, parse_date)
+
+TODAY = date(2025, 3, 10)
+
+
+def test_looks_like_bill():
+    assert looks_like_bill("AX-AIRTEL", "Your bill of Rs. 499 is due on 15-03-2025.")
+    assert not looks_like_bill("AX-HDFCBK", "Your OTP is 123456. Amount Rs. 10.")
+    assert not looks_like_bill("AX-SHOP", "Your bill is ready.")
+
+
+def test_extract_amount_and_currency():
+    assert extract_amount("Amount due: Rs. 1,499.50 by 5th April") == 1499.5
+    assert extract_currency("Amount due: Rs. 1,499.50") == "INR"
+    assert extract_amount("Pay 25.00 EUR today") == 25.0
+    assert extract_currency("Pay 25.00 EUR today") == "EUR"
+    assert extract_amount("Total due 300 by Friday") == 300.0
+    assert extract_currency("Total due 300 by Friday") is None
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2025-04-05", "2025-04-05"),
+    ("05/04/2025", "2025-04-05"),
+    ("5th April 2025", "2025-04-05"),
+    ("Apr 5, 2025", "2025-04-05"),
+    ("5 Apr", "2025-04-05"),
+    ("5 Mar", "2026-03-05"),
+    ("someday", None),
+])
+def test_parse_date(value, expected):
+    assert parse_date(value, TODAY) == expected
+
+
+def test_extract_due_date_prefers_the_due_marker():
+    content = "Statement dated 01/03/2025. Amount Rs. 500 due by 20/03/2025."
+    assert extract_due_date(content, TODAY) == "2025-03-20"
+    assert extract_due_date("Pay Rs. 500 soon", TODAY) is None
+
+
+def test_merchant_from_sender():
+    assert merchant_from_sender("VM-AIRTEL") == "AIRTEL"
+    assert merchant_from_sender("+919876543210") is None
+
+
+def test_parse_bill_sms():
+    bill = parse_bill_sms("AD-BESCOM", "Electricity bill of Rs. 1,200 is due on 18-03-2025.", TODAY)
+    assert bill["title"] == "BESCOM Bill"
+    assert bill["amount"] == 1200.0
+    assert bill["currency"] == "INR"
+    assert bill["dueDate"] == "2025-03-18"
+    assert bill["merchantName"] == "BESCOM"
+    assert parse_bill_sms("AD-BANK", "Your OTP is 4321", TODAY) is None
@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+import streamlit as st
+
+from models.suggestion_engine import SuggestionEngine
+from utils.currency import conversion_factor
+from utils.date_utils import format_currency, render_now
+
+
+def make_subscription(storage, title, last_used_days_ago):
+    return storage.create_subscription({
+        "userId": 1,
+        "title": title,
+        "amount": 5.0,
+        "currency": "USD",
+        "frequency": "monthly",
+        "categoryId": 5,
+        "active": True,
+        "renewalDate": (render_now() + timedelta(days=10)).strftime("%Y-%m-%d"),
+        "lastUsed": render_now() - timedelta(days=last_used_days_ago)
+    })
+
+
+def test_rules_on_the_same_subscription_keep_separate_suggestions(storage):
+    engine = SuggestionEngine(storage)
+    engine.sync()
+    first = make_subscription(storage, "Acme Cloud", 40)
+    second = make_subscription(storage, "Acme Cloud", 1)
+    engine.sync()
+
+    rules = engine.state["rule_suggestions"]
+    unused = rules[("unused_subscription", "subscription", first["id"])]
+    duplicate = rules[("duplicate_service", "service", (1, "acme cloud"))]
+    assert unused != duplicate
+    assert st.session_state.suggestions[duplicate]["subscriptionId"] == first["id"]
+
+    # Resolving the duplicate leaves the unused suggestion alone
+    storage.delete_subscription(second["id"])
+    engine.sync()
+    assert unused in st.session_state.suggestions
+    assert not st.session_state.suggestions[unused]["dismissed"]
+    assert ("duplicate_service", "service", (1, "acme cloud")) not in rules
+
+
+def test_engine_state_is_created_for_a_new_session(storage):
+    assert "suggestion_engine" not in st.session_state
+    SuggestionEngine(storage).sync()
+    assert st.session_state.suggestion_engine["version"] == storage.get_data_version()
+
+
+def test_week_cluster_totals_bills_in_the_display_currency(storage):
+    engine = SuggestionEngine(storage)
+    engine.sync()
+    # A Wednesday far enough ahead that the demo bills are in other weeks
+    due = render_now().date() + timedelta(days=60)
+    due -= timedelta(days=due.weekday() - 2)
+    amounts = [(100.0, "USD"), (100.0, "EUR"), (50.0, "USD")]
+    for amount, currency in amounts:
+        storage.create_bill({
+            "userId": 1,
+            "title": f"Bill {currency} {amount}",
+            "amount": amount,
+            "currency": currency,
+            "dueDate": due.isoformat(),
+            "categoryId": 2,
+            "paid": False
+        })
+    engine.sync()
+
+    year, week, _ = due.isocalendar()
+    suggestion_id = engine.state["rule_suggestions"][("due_date_cluster", "week", (1, f"{year}-W{week:02d}"))]
+    total = 150 + 100 * conversion_factor("EUR", "USD", due.isoformat())
+    assert format_currency(total, "USD") in st.session_state.suggestions[suggestion_id]["description"]
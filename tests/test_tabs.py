@@ -0,0 +1,33 @@
+import threading
+
+from components import tabs
+from components.tabs import cached_tab, prefetch_tabs
+
+
+def counting_builder(stamp, calls, name):
+    def load():
+        calls.append(name)
+        return (name,)
+    return (stamp, lambda value: value.upper(), load)
+
+
+def test_cached_tab_only_loads_inputs_on_a_rebuild():
+    cache, calls = {}, []
+    assert cached_tab(cache, "a", counting_builder(1, calls, "a")) == "A"
+    assert cached_tab(cache, "a", counting_builder(1, calls, "a")) == "A"
+    assert calls == ["a"]
+    assert cached_tab(cache, "a", counting_builder(2, calls, "a")) == "A"
+    assert calls == ["a", "a"]
+
+
+def test_prefetch_loads_only_stale_neighbours(monkeypatch):
+    monkeypatch.setattr(tabs, "PREFETCH_DELAY", 0)
+    started = []
+    monkeypatch.setattr(threading.Thread, "start", lambda thread: started.append(thread) or thread.run())
+    cache, calls = {"a": (1, "A")}, []
+    builders = {name: counting_builder(1, calls, name) for name in ("a", "b", "c", "d")}
+
+    prefetch_tabs(cache, ["a", "b", "c", "d"], "b", builders)
+    assert calls == ["c"]
+    assert cache["c"] == (1, "C") and "d" not in cache
+    assert len(started) == 1
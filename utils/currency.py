@@ -0,0 +1,179 @@
+"""Currencies, offline exchange rates and cached amount formatting.
+
+Rates come from a local, dated table (``fx_rates.csv`` next to this module,
+or the file in FX_RATES_PATH) holding units of each currency per US dollar.
+An amount converts at the most recent rate on or before its own date, so
+an old bill keeps the value it had when it was due.
+"""
+import csv
+import os
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+SUPPORTED_CURRENCIES = ("USD", "EUR", "GBP", "CAD", "AUD", "INR", "JPY")
+DEFAULT_CURRENCY = "USD"
+
+# Currency the rate table is quoted against
+BASE_CURRENCY = "USD"
+
+FX_RATES_PATH = os.getenv("FX_RATES_PATH", os.path.join(os.path.dirname(__file__), "fx_rates.csv"))
+
+# Conversion factors kept per (from, to, date)
+FACTOR_CACHE_SIZE = 8192
+
+# currency -> (symbol, symbol after the amount, decimals, group separator,
+# decimal separator, Indian lakh/crore grouping), following each currency's
+# home locale
+CURRENCY_FORMATS = {
+    "USD": ("$", False, 2, ",", ".", False),
+    "EUR": ("€", True, 2, ".", ",", False),
+    "GBP": ("£", False, 2, ",", ".", False),
+    "CAD": ("CA$", False, 2, ",", ".", False),
+    "AUD": ("A$", False, 2, ",", ".", False),
+    "INR": ("₹", False, 2, ",", ".", True),
+    "JPY": ("¥", False, 0, ",", ".", False),
+}
+
+_rates = None
+_rates_lock = threading.Lock()
+
+
+class FxRates:
+    """Dated exchange rate table, as units of each currency per BASE_CURRENCY."""
+
+    def __init__(self, path=None):
+        """Load the rate table from a ``date,currency,rate`` CSV file."""
+        rows = {}
+        try:
+            with open(path or FX_RATES_PATH, newline="") as handle:
+                lines = (line for line in handle if line.strip() and not line.startswith("#"))
+                for row in csv.DictReader(lines):
+                    rows.setdefault(row["currency"].upper(), []).append((row["date"], float(row["rate"])))
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Error loading exchange rates: {e}")
+
+        self.dates = {}
+        self.rates = {}
+        for currency, entries in rows.items():
+            entries.sort()
+            self.dates[currency] = np.array([date for date, _ in entries], dtype="datetime64[D]")
+            self.rates[currency] = np.array([rate for _, rate in entries])
+
+    def rate(self, currency, on=None):
+        """Get the rate in effect on a date ("%Y-%m-%d"), or the latest if None.
+
+        Dates before the table starts use its earliest rate. Returns None
+        for a currency without rates.
+        """
+        if currency == BASE_CURRENCY:
+            return 1.0
+        dates = self.dates.get(currency)
+        if dates is None or not len(dates):
+            return None
+        if on is None:
+            return float(self.rates[currency][-1])
+        i = np.searchsorted(dates, np.datetime64(on, "D"), side="right") - 1
+        return float(self.rates[currency][max(i, 0)])
+
+
+def get_fx_rates():
+    """Get the process-wide rate table, loading it on first use."""
+    global _rates
+    if _rates is None:
+        with _rates_lock:
+            if _rates is None:
+                _rates = FxRates()
+    return _rates
+
+
+@lru_cache(maxsize=FACTOR_CACHE_SIZE)
+def conversion_factor(from_currency, to_currency, on=None):
+    """Get the factor converting ``from_currency`` amounts to ``to_currency`` on a date."""
+    if from_currency == to_currency:
+        return 1.0
+    rates = get_fx_rates()
+    from_rate = rates.rate(from_currency, on)
+    to_rate = rates.rate(to_currency, on)
+    if not from_rate or not to_rate:
+        print(f"No exchange rate from {from_currency} to {to_currency}; amounts are not converted")
+        return 1.0
+    return to_rate / from_rate
+
+
+def convert_amounts(amounts, currencies, dates, to_currency):
+    """Convert many amounts to one currency.
+
+    ``currencies`` and ``dates`` ("%Y-%m-%d", or None for the latest rate)
+    run parallel to ``amounts``; a missing currency is DEFAULT_CURRENCY.
+    Factors are looked up once per distinct (currency, date) and applied
+    as one array multiplication. Returns a float array.
+    """
+    amounts = np.asarray(amounts, dtype=float)
+    if not len(amounts):
+        return amounts
+
+    pairs = {}
+    index = np.fromiter(
+        (pairs.setdefault((currency or DEFAULT_CURRENCY, str(date)[:10] if date else None), len(pairs))
+         for currency, date in zip(currencies, dates)),
+        dtype=np.int64,
+        count=len(amounts)
+    )
+    factors = np.array([conversion_factor(currency, to_currency, date) for currency, date in pairs])
+    return amounts * factors[index]
+
+
+def convert_records(records, to_currency, date_field=None):
+    """Get bills or subscriptions with ``amount`` in ``to_currency``.
+
+    Records already in that currency are returned as they are; the others
+    are copied with the converted amount and ``currency`` set. The rate is
+    taken on each record's ``date_field``, or the latest rate without one.
+    """
+    if all((record.get("currency") or DEFAULT_CURRENCY) == to_currency for record in records):
+        return records
+
+    converted = convert_amounts(
+        [record["amount"] for record in records],
+        [record.get("currency") for record in records],
+        [record.get(date_field) if date_field else None for record in records],
+        to_currency
+    )
+    return [
+        dict(record, amount=amount, currency=to_currency)
+        for record, amount in zip(records, converted.tolist())
+    ]
+
+
+def _group_indian(whole):
+    """Group digits as 12,34,567 (thousands, then pairs)."""
+    if len(whole) <= 3:
+        return whole
+    head, tail = whole[:-3], whole[-3:]
+    pairs = []
+    while len(head) > 2:
+        pairs.insert(0, head[-2:])
+        head = head[:-2]
+    return ",".join([head] + pairs + [tail])
+
+
+@lru_cache(maxsize=None)
+def get_formatter(currency):
+    """Get a function formatting amounts in a currency, e.g. "₹1,23,456.00"."""
+    symbol, suffix, decimals, group, point, indian = CURRENCY_FORMATS.get(
+        currency, (f"{currency} ", False, 2, ",", ".", False)
+    )
+
+    def format_amount(amount):
+        number = f"{abs(amount):.{decimals}f}"
+        whole, _, fraction = number.partition(".")
+        whole = _group_indian(whole) if indian else f"{int(whole):,}"
+        if group != ",":
+            whole = whole.replace(",", group)
+        number = f"{whole}{point}{fraction}" if fraction else whole
+        sign = "-" if round(amount, decimals) < 0 else ""
+        return f"{sign}{number} {symbol}" if suffix else f"{sign}{symbol}{number}"
+
+    return format_amount
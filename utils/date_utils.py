@@ -1,93 +1,161 @@
-from datetime import datetime, timedelta
+import calendar
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime
+from functools import lru_cache
+
+import numpy as np
+
+from utils.currency import DEFAULT_CURRENCY, get_formatter
+
+# Clock snapshot for the current Streamlit run, so one render agrees with itself
+_render_clock = ContextVar("render_clock", default=None)
+_frozen_clock = ContextVar("frozen_clock", default=None)
+
+# Distinct date strings kept parsed; bills share a small set of due dates
+PARSE_CACHE_SIZE = 4096
+
+# Due date statuses by severity
+DUE_DATE_STATUSES = (
+    {"label": "Scheduled", "color": "blue", "severity": 0},
+    {"label": "Upcoming", "color": "green", "severity": 1},
+    {"label": "Due Soon", "color": "orange", "severity": 2},
+    {"label": "Overdue", "color": "red", "severity": 3}
+)
+
+MONTH_ABBREVIATIONS = np.array(calendar.month_abbr[1:])
+
+# Units of relative time strings, smallest first
+TIME_UNITS = ("day", "week", "month", "year")
+
+def set_render_clock(moment=None):
+    """Snapshot the clock (or ``moment``) for the rest of the current run."""
+    return _render_clock.set(moment or _frozen_clock.get() or datetime.now())
+
+@contextmanager
+def frozen_clock(moment):
+    """Run a block with ``render_now()`` fixed at ``moment``, even across new snapshots."""
+    frozen_token = _frozen_clock.set(moment)
+    token = _render_clock.set(moment)
+    try:
+        yield moment
+    finally:
+        _render_clock.reset(token)
+        _frozen_clock.reset(frozen_token)
+
+def render_now():
+    """Get the current run's clock snapshot, or the live time if none was taken."""
+    return _render_clock.get() or datetime.now()
+
+def render_today():
+    """Get the current run's date."""
+    return render_now().date()
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_date(date_str):
+    """Parse a "%Y-%m-%d" string to a date, memoized."""
+    return date.fromisoformat(date_str)
+
+def _today(today=None):
+    """Get ``today`` (a date, or the run's date if None) as a day-precision datetime64."""
+    return np.datetime64(today or render_today(), "D")
+
+def add_months(day, months):
+    """Move a date by whole months, clamping the day to the target month's length."""
+    year, month = divmod(day.year * 12 + day.month - 1 + months, 12)
+    month += 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+def parse_dates(date_strs):
+    """Parse "%Y-%m-%d" strings into a datetime64[D] array in one pass."""
+    return np.asarray(date_strs, dtype="datetime64[D]")
+
+def days_until(date_strs, today=None):
+    """Get the number of days from today to each date (negative if past)."""
+    return (parse_dates(date_strs) - _today(today)).astype(np.int64)
+
+def format_dates(date_strs):
+    """Format "%Y-%m-%d" strings as "Jan 05, 2024"."""
+    dates = parse_dates(date_strs)
+    months = dates.astype("datetime64[M]")
+    years = months.astype("datetime64[Y]").astype(np.int64) + 1970
+    month_names = MONTH_ABBREVIATIONS[months.astype(np.int64) % 12]
+    days = (dates - months).astype(np.int64) + 1
+    return [f"{month} {day:02d}, {year}" for month, day, year in zip(month_names, days.tolist(), years.tolist())]
+
+def _plural(count, unit):
+    return f"{count} {unit}{'s' if count > 1 else ''}"
+
+def relative_time_strings(date_strs, today=None):
+    """Get relative time strings (e.g., "3 days ago", "in 2 months") for many dates."""
+    diffs = days_until(date_strs, today)
+    distance = np.abs(diffs)
+    # Largest unit that fits: days under a week, weeks under a month, and so on
+    units = np.select([distance < 7, distance < 30, distance < 365], [0, 1, 2], 3)
+    counts = distance // np.array([1, 7, 30, 365])[units]
+    
+    strings = []
+    for diff, unit, count in zip(diffs.tolist(), units.tolist(), counts.tolist()):
+        if diff == 0:
+            strings.append("Today")
+        elif diff == 1:
+            strings.append("Tomorrow")
+        elif diff == -1:
+            strings.append("Yesterday")
+        elif diff < 0:
+            # Past days are always plural ("2 days ago")
+            strings.append(f"{count} days ago" if unit == 0 else f"{_plural(count, TIME_UNITS[unit])} ago")
+        else:
+            strings.append(f"in {_plural(count, TIME_UNITS[unit])}")
+    return strings
+
+def due_date_statuses(date_strs, today=None):
+    """Get the due date status label, color and severity for many dates.
+    
+    Overdue if past, "Due Soon" within 3 days, "Upcoming" within 7 days and
+    "Scheduled" otherwise.
+    """
+    diffs = days_until(date_strs, today)
+    severities = np.select([diffs < 0, diffs <= 3, diffs <= 7], [3, 2, 1], 0)
+    return [dict(DUE_DATE_STATUSES[severity]) for severity in severities.tolist()]
 
 def format_date(date_str):
     """Format a date string to a human-readable format."""
-    date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-    return date_obj.strftime("%b %d, %Y")
+    return format_dates([date_str])[0]
 
 def get_relative_time_string(date_str):
     """Get a relative time string (e.g., "3 days ago", "in 2 months")."""
-    date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-    today = datetime.now().date()
-    date_value = date_obj.date()
-    
-    diff = (date_value - today).days
-    
-    if diff == 0:
-        return "Today"
-    elif diff == 1:
-        return "Tomorrow"
-    elif diff == -1:
-        return "Yesterday"
-    elif diff < 0:
-        if diff > -7:
-            return f"{abs(diff)} days ago"
-        elif diff > -30:
-            weeks = abs(diff) // 7
-            return f"{weeks} week{'s' if weeks > 1 else ''} ago"
-        elif diff > -365:
-            months = abs(diff) // 30
-            return f"{months} month{'s' if months > 1 else ''} ago"
-        else:
-            years = abs(diff) // 365
-            return f"{years} year{'s' if years > 1 else ''} ago"
-    else:
-        if diff < 7:
-            return f"in {diff} day{'s' if diff > 1 else ''}"
-        elif diff < 30:
-            weeks = diff // 7
-            return f"in {weeks} week{'s' if weeks > 1 else ''}"
-        elif diff < 365:
-            months = diff // 30
-            return f"in {months} month{'s' if months > 1 else ''}"
-        else:
-            years = diff // 365
-            return f"in {years} year{'s' if years > 1 else ''}"
+    return relative_time_strings([date_str])[0]
 
 def is_due_soon(due_date_str, days=7):
     """Check if a bill is due soon (within specified days)."""
-    due_date = datetime.strptime(due_date_str, "%Y-%m-%d").date()
-    today = datetime.now().date()
-    
-    return 0 <= (due_date - today).days <= days
+    return bool(0 <= days_until([due_date_str])[0] <= days)
 
 def is_overdue(due_date_str):
     """Check if a bill is overdue."""
-    due_date = datetime.strptime(due_date_str, "%Y-%m-%d").date()
-    today = datetime.now().date()
-    
-    return due_date < today
+    return bool(days_until([due_date_str])[0] < 0)
 
 def get_due_date_status(due_date_str):
     """Get the due date status label and color."""
-    if is_overdue(due_date_str):
-        return {
-            "label": "Overdue",
-            "color": "red",
-            "severity": 3
-        }
-    elif is_due_soon(due_date_str, 3):
-        return {
-            "label": "Due Soon",
-            "color": "orange",
-            "severity": 2
-        }
-    elif is_due_soon(due_date_str, 7):
-        return {
-            "label": "Upcoming",
-            "color": "green",
-            "severity": 1
-        }
-    else:
-        return {
-            "label": "Scheduled",
-            "color": "blue",
-            "severity": 0
-        }
+    return due_date_statuses([due_date_str])[0]
 
-def format_currency(amount):
+def format_currency(amount, currency=DEFAULT_CURRENCY):
     """Format currency amount."""
-    return f"${amount:,.2f}"
+    return get_formatter(currency or DEFAULT_CURRENCY)(amount)
+
+# Multipliers that convert a billing frequency into a monthly amount
+MONTHLY_FACTORS = {
+    "daily": 30.44,
+    "weekly": 4.33,  # Average weeks per month
+    "biweekly": 2.17,
+    "monthly": 1,
+    "quarterly": 1 / 3,
+    "yearly": 1 / 12
+}
+
+def to_monthly_amount(amount, frequency):
+    """Normalize an amount billed at the given frequency to a monthly amount."""
+    return amount * MONTHLY_FACTORS.get(frequency, 1)
 
 def format_frequency(frequency):
     """Format a frequency (e.g., "monthly", "yearly") as a readable string."""
@@ -0,0 +1,214 @@
+"""Streaming readers for exported SMS backups.
+
+Every reader takes a binary file object and yields one message at a time
+as ``{"sender", "content", "receivedAt"}``, so even a very large backup is
+never held in memory at once. Supported formats:
+
+- "SMS Backup & Restore" XML (``<smses><sms address=... body=... date=.../>``)
+- CSV with a header row
+- JSON lines, one message object per line
+- A JSON array of message objects
+- Emails (``.eml``), whose text body is treated like an SMS
+"""
+import codecs
+import csv
+import email
+import html
+import itertools
+import json
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from email import policy
+from email.utils import parseaddr, parsedate_to_datetime
+
+from ai.json_stream import iter_json_values
+from utils.date_utils import render_now
+
+# Accepted column / field names for each message field
+SENDER_FIELDS = ("sender", "address", "from", "number", "phone")
+CONTENT_FIELDS = ("content", "body", "message", "text", "msg")
+DATE_FIELDS = ("receivedAt", "date", "timestamp", "time", "received_at", "datetime")
+
+HTML_HIDDEN = re.compile(r"<(script|style)\b.*?</\1>", re.IGNORECASE | re.DOTALL)
+HTML_TAG = re.compile(r"<[^>]+>")
+
+# SMS Backup & Restore message types: 1 is received, 2 is sent
+XML_RECEIVED_TYPE = "1"
+
+# Bytes read at a time from a JSON array export
+JSON_CHUNK_SIZE = 64 * 1024
+
+# Bytes that may come before a JSON document's first bracket
+JSON_LEADING = codecs.BOM_UTF8 + b" \t\r\n"
+
+FORMATS = {
+    "xml": "xml",
+    "csv": "csv",
+    "jsonl": "jsonl",
+    "ndjson": "jsonl",
+    "json": "json",
+    "eml": "eml",
+}
+
+
+def detect_format(filename):
+    """Get the backup format from a file name, or None if unsupported."""
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    return FORMATS.get(extension)
+
+
+def parse_timestamp(value):
+    """Parse epoch seconds/milliseconds or an ISO date string to a datetime."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)) or str(value).strip().isdigit():
+        number = float(value)
+        # Backups store milliseconds; anything this large is not seconds
+        if number > 1e11:
+            number /= 1000
+        return datetime.fromtimestamp(number)
+    try:
+        return datetime.fromisoformat(str(value).strip().replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def _pick(record, fields):
+    for field in fields:
+        value = record.get(field)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def normalize_message(record):
+    """Normalize a parsed record, or return None if it has no content."""
+    content = _pick(record, CONTENT_FIELDS)
+    if not content:
+        return None
+    return {
+        "sender": str(_pick(record, SENDER_FIELDS) or "Unknown"),
+        "content": str(content),
+        "receivedAt": parse_timestamp(_pick(record, DATE_FIELDS)) or render_now()
+    }
+
+
+def iter_xml(fileobj):
+    """Stream received messages from an SMS Backup & Restore XML file."""
+    context = ET.iterparse(fileobj, events=("start", "end"))
+    _, root = next(context)
+    for event, element in context:
+        if event != "end" or element.tag not in ("sms", "mms"):
+            continue
+        if element.tag == "sms" and element.get("type", XML_RECEIVED_TYPE) == XML_RECEIVED_TYPE:
+            message = normalize_message(dict(element.attrib))
+            if message:
+                yield message
+        # Drop parsed elements so the tree never grows
+        root.clear()
+
+
+def iter_csv(fileobj):
+    """Stream messages from a CSV export with a header row."""
+    lines = codecs.iterdecode(fileobj, "utf-8-sig")
+    for row in csv.DictReader(lines):
+        message = normalize_message(row)
+        if message:
+            yield message
+
+
+def iter_jsonl(fileobj):
+    """Stream messages from a JSON lines export."""
+    for line in codecs.iterdecode(fileobj, "utf-8-sig"):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(record, dict):
+            message = normalize_message(record)
+            if message:
+                yield message
+
+
+def html_to_text(markup):
+    """Reduce an HTML email body to plain text."""
+    text = HTML_TAG.sub(" ", HTML_HIDDEN.sub(" ", markup))
+    return " ".join(html.unescape(text).split())
+
+
+def message_from_email(raw):
+    """Turn raw email bytes into a message, using the text body as content."""
+    mail = email.message_from_bytes(raw, policy=policy.default)
+    body = mail.get_body(preferencelist=("plain", "html"))
+    if body is None:
+        return None
+    try:
+        text = body.get_content()
+    except (LookupError, UnicodeDecodeError):
+        text = body.get_payload(decode=True).decode("utf-8", errors="replace")
+    if body.get_content_type() == "text/html":
+        text = html_to_text(text)
+
+    name, address = parseaddr(str(mail.get("From", "")))
+    try:
+        received_at = parsedate_to_datetime(mail["Date"]).replace(tzinfo=None) if mail["Date"] else None
+    except (TypeError, ValueError):
+        received_at = None
+
+    subject = str(mail.get("Subject", "")).strip()
+    return normalize_message({
+        "sender": name or address,
+        "content": f"{subject}. {' '.join(text.split())}" if subject else " ".join(text.split()),
+        "receivedAt": received_at.isoformat() if received_at else None
+    })
+
+
+def iter_json(fileobj):
+    """Stream messages from a JSON array of message objects.
+
+    Some exporters write JSON lines with a .json extension, so a file that
+    does not open with ``[`` is read as JSON lines instead.
+    """
+    chunks = iter(lambda: fileobj.read(JSON_CHUNK_SIZE), b"")
+    head = b""
+    for chunk in chunks:
+        head += chunk
+        if head.lstrip(JSON_LEADING):
+            break
+
+    if not head.lstrip(JSON_LEADING).startswith(b"["):
+        # Finish the partial last line so the JSON lines reader gets whole lines
+        head += fileobj.readline()
+        yield from iter_jsonl(itertools.chain(head.splitlines(keepends=True), fileobj))
+        return
+
+    for record in iter_json_values(codecs.iterdecode(itertools.chain([head], chunks), "utf-8-sig")):
+        if isinstance(record, dict):
+            message = normalize_message(record)
+            if message:
+                yield message
+
+
+def iter_eml(fileobj):
+    """Read the single message in an .eml file."""
+    message = message_from_email(fileobj.read())
+    if message:
+        yield message
+
+
+READERS = {
+    "xml": iter_xml,
+    "csv": iter_csv,
+    "jsonl": iter_jsonl,
+    "json": iter_json,
+    "eml": iter_eml,
+}
+
+
+def iter_backup(fileobj, backup_format):
+    """Stream messages from a backup in the given format."""
+    return READERS[backup_format](fileobj)